@@ -1,6 +1,12 @@
 from abc import ABC, abstractmethod
+import aiohttp
 from core.exceptions import LocalStorageError, DiskFullError, StoragePermissionError
-from core.utils import dump_json_to_file, load_json_from_file
+from core.utils import (
+    dump_json_to_file,
+    load_json_from_file,
+    handle_http_error,
+    iter_json_pairs,
+)
 from core.logger import logger
 
 
@@ -10,6 +16,7 @@ class ExchangeAPI(ABC):
         self.spot_data = None
         self.tickers_list = None
         self.tickers_dict = None
+        self.tickers_book = None
         self.session = None
 
     @abstractmethod
@@ -20,6 +27,10 @@ class ExchangeAPI(ABC):
     async def request_spot_data(self):
         pass
 
+    @abstractmethod
+    async def stream_spot_data(self):
+        pass
+
     @abstractmethod
     async def request_ticker_data(self, ticker):
         pass
@@ -40,12 +51,63 @@ class ExchangeAPI(ABC):
     async def get_price_from_request(self, ticker):
         pass
 
-    async def save_spot_data(self, filename):
+    async def stream_api_request(
+        self, endpoint, params, items_prefix, symbol_field, price_field
+    ):
+        """
+        Потоковый запрос: тело ответа разбирается по мере загрузки,
+        наружу отдаются только пары (тикер, цена).
+        """
+        url = f"{self._base_url}{endpoint}"
+        try:
+            async with self.session.get(url, params=params) as response:
+                response.raise_for_status()
+                async for symbol, price in iter_json_pairs(
+                    response.content, items_prefix, symbol_field, price_field
+                ):
+                    yield symbol, price
+        except aiohttp.ClientResponseError as http_error:
+            logger.error(
+                f"❌ HTTP ошибка при запросе к {url} - статус: {http_error.status}"
+            )
+            handle_http_error(http_error.status)
+        except aiohttp.ClientConnectionError as error:
+            logger.error(f"❌ Ошибка соединения: {error}")
+        except aiohttp.ClientPayloadError as error:
+            logger.error(f"❌ Ошибка обработки данных: {error}")
+        except aiohttp.ClientError as error:
+            logger.error(f"❌ Ошибка при запросе: {error}")
+
+    async def fill_tickers_book(self, pairs, exchange_name):
+        tickers_book = {}
+        async for symbol, price in pairs:
+            try:
+                tickers_book[symbol] = float(price)
+            except (TypeError, ValueError):
+                logger.error(f"❌ Неверный формат цены для тикера {symbol}: {price}")
+        if not tickers_book:
+            return False
+        self.tickers_book = tickers_book
+        logger.info(
+            f"✅ Потоково получили {len(tickers_book)} цен SPOT рынка биржи {exchange_name}."
+        )
+        return True
+
+    def get_price_from_book(self, ticker):
+        if self.tickers_book is None:
+            logger.error("❌ Книга тикеров пуста, сначала вызовите stream_spot_data.")
+            raise ValueError("Tickers book is not loaded.")
+        if ticker in self.tickers_book:
+            return self.tickers_book[ticker]
+        logger.error(f"❌ Тикер {ticker} не найден.")
+        return None
+
+    async def save_spot_data(self, filename, file_format=None):
         if self.spot_data is None:
             await self.request_spot_data()
 
         try:
-            result = await dump_json_to_file(self.spot_data, filename)
+            result = await dump_json_to_file(self.spot_data, filename, file_format)
             return result
         except StoragePermissionError as e:
             logger.error(f"❌ Ошибка прав доступа при сохранении файла: {e}")
@@ -58,9 +120,9 @@ class ExchangeAPI(ABC):
 
         return False
 
-    async def load_spot_data(self, file_path):
+    async def load_spot_data(self, file_path, file_format=None):
         try:
-            data = await load_json_from_file(file_path)
+            data = await load_json_from_file(file_path, file_format)
             logger.info(f"✅ SPOT данные успешно загружены из файла {file_path}")
             return data
         except Exception as e:
@@ -71,3 +133,4 @@ class ExchangeAPI(ABC):
         self.spot_data = None
         self.tickers_list = None
         self.tickers_dict = None
+        self.tickers_book = None
@@ -44,6 +44,11 @@ class BinanceAPI(ExchangeAPI):
             return True
         return False
 
+    async def stream_spot_data(self):
+        endpoint = "/ticker/price"
+        pairs = self.stream_api_request(endpoint, None, "item", "symbol", "price")
+        return await self.fill_tickers_book(pairs, "Binance")
+
     async def request_ticker_data(self, ticker):
         endpoint = "/market/ticker"
         params = {"instId": ticker}
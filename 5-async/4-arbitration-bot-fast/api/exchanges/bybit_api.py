@@ -45,6 +45,14 @@ class BybitAPI(ExchangeAPI):
             return True
         return False
 
+    async def stream_spot_data(self):
+        endpoint = "/market/tickers"
+        params = {"category": "spot"}
+        pairs = self.stream_api_request(
+            endpoint, params, "result.list.item", "symbol", "lastPrice"
+        )
+        return await self.fill_tickers_book(pairs, "Bybit")
+
     async def request_ticker_data(self, ticker):
         endpoint = "/market/ticker"
         params = {"instId": ticker}
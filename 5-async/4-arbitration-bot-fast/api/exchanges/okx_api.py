@@ -46,6 +46,14 @@ class OkxAPI(ExchangeAPI):
             return True
         return False
 
+    async def stream_spot_data(self):
+        endpoint = "/market/tickers"
+        params = {"instType": "SPOT"}
+        pairs = self.stream_api_request(endpoint, params, "data.item", "instId", "last")
+        return await self.fill_tickers_book(
+            ((normalize_ticker(symbol), price) async for symbol, price in pairs), "OKX"
+        )
+
     async def request_ticker_data(self, ticker):
         endpoint = "/market/ticker"
         params = {"instId": ticker}
@@ -1,11 +1,20 @@
 from . import exceptions
 from .logger import logger
-from .utils import dump_json_to_file, handle_http_error, load_json_from_file
+from .storage import load_json, save_json
+from .utils import (
+    dump_json_to_file,
+    handle_http_error,
+    iter_json_pairs,
+    load_json_from_file,
+)
 
 __all__ = [
     "exceptions",
     "logger",
     "dump_json_to_file",
     "handle_http_error",
+    "iter_json_pairs",
     "load_json_from_file",
+    "load_json",
+    "save_json",
 ]
@@ -0,0 +1,99 @@
+import asyncio
+import gzip
+import json
+import os
+import tempfile
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+from core.exceptions import LocalStorageError
+
+# pretty - читаемый json с отступами, compact - без пробелов, gzip/zstd - сжатый compact
+FILE_FORMATS = ("pretty", "compact", "gzip", "zstd")
+
+
+def detect_file_format(filename):
+    if filename.endswith(".gz"):
+        return "gzip"
+    if filename.endswith(".zst"):
+        return "zstd"
+    return "pretty"
+
+
+def _check_file_format(file_format):
+    if file_format not in FILE_FORMATS:
+        raise LocalStorageError(
+            f"Неизвестный формат файла {file_format}. Доступны: {', '.join(FILE_FORMATS)}"
+        )
+    if file_format == "zstd" and zstandard is None:
+        raise LocalStorageError("Для формата zstd установите пакет zstandard.")
+
+
+def _encode(json_data, file_format):
+    if file_format == "pretty":
+        return json.dumps(json_data, ensure_ascii=False, indent=4).encode("utf-8")
+    payload = json.dumps(json_data, ensure_ascii=False, separators=(",", ":")).encode(
+        "utf-8"
+    )
+    if file_format == "gzip":
+        return gzip.compress(payload, compresslevel=6)
+    if file_format == "zstd":
+        return zstandard.ZstdCompressor(level=3).compress(payload)
+    return payload
+
+
+def _decode(raw, file_format):
+    if file_format == "gzip":
+        raw = gzip.decompress(raw)
+    elif file_format == "zstd":
+        raw = zstandard.ZstdDecompressor().decompress(raw)
+    return json.loads(raw)
+
+
+def _write_atomic(filename, payload):
+    """
+    Пишем во временный файл рядом с целевым и подменяем его через os.replace,
+    поэтому читатель видит либо старый файл целиком, либо новый целиком.
+    """
+    directory = os.path.dirname(os.path.abspath(filename))
+    fd, tmp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{os.path.basename(filename)}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as file:
+            file.write(payload)
+            file.flush()
+            os.fsync(file.fileno())
+        os.replace(tmp_path, filename)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+        raise
+
+
+def _save_json_sync(json_data, filename, file_format):
+    _write_atomic(filename, _encode(json_data, file_format))
+    return True
+
+
+def _load_json_sync(filename, file_format):
+    with open(filename, "rb") as file:
+        return _decode(file.read(), file_format)
+
+
+async def save_json(json_data, filename, file_format=None):
+    """
+    Сериализация и запись выполняются в пуле потоков и не блокируют event loop.
+    """
+    file_format = file_format or detect_file_format(filename)
+    _check_file_format(file_format)
+    return await asyncio.to_thread(_save_json_sync, json_data, filename, file_format)
+
+
+async def load_json(filename, file_format=None):
+    file_format = file_format or detect_file_format(filename)
+    _check_file_format(file_format)
+    return await asyncio.to_thread(_load_json_sync, filename, file_format)
@@ -1,14 +1,14 @@
-import json
-import aiofiles
+import ijson
 from core.exceptions import LocalStorageError, DiskFullError, StoragePermissionError
 from core.logger import logger
+from core.storage import load_json, save_json
 
 
-async def dump_json_to_file(json_data, filename):
+async def dump_json_to_file(json_data, filename, file_format=None):
     try:
-        async with aiofiles.open(filename, "w", encoding="utf-8") as file:
-            await file.write(json.dumps(json_data, ensure_ascii=False, indent=4))
-            return True
+        return await save_json(json_data, filename, file_format)
+    except LocalStorageError:
+        raise
     except PermissionError as error:
         raise StoragePermissionError(
             f"Нет прав для записи в файл {filename}"
@@ -27,10 +27,11 @@ async def dump_json_to_file(json_data, filename):
         ) from error
 
 
-async def load_json_from_file(filename):
+async def load_json_from_file(filename, file_format=None):
     try:
-        with open(filename, "r", encoding="utf-8") as file:
-            return json.load(file)
+        return await load_json(filename, file_format)
+    except LocalStorageError:
+        raise
     except PermissionError as error:
         raise StoragePermissionError(
             f"Нет прав для чтения из файл {filename}"
@@ -59,3 +60,23 @@ def handle_http_error(status_code):
     }
     error_message = errors.get(status_code, f"HTTP ошибка с кодом {status_code}.")
     logger.error(error_message)
+
+
+async def iter_json_pairs(stream, items_prefix, key_field, value_field):
+    """
+    Потоково разбирает JSON массив объектов и отдаёт только пары (key, value).
+    Объекты целиком не собираются, поэтому память не растёт вместе с размером ответа.
+    """
+    key_prefix = f"{items_prefix}.{key_field}"
+    value_prefix = f"{items_prefix}.{value_field}"
+    key = value = None
+    async for prefix, event, data in ijson.parse_async(stream):
+        if prefix == items_prefix and event == "start_map":
+            key = value = None
+        elif prefix == key_prefix:
+            key = data
+        elif prefix == value_prefix:
+            value = data
+        elif prefix == items_prefix and event == "end_map":
+            if key is not None and value is not None:
+                yield key, value
@@ -49,12 +49,39 @@ async def load_and_find_common_tickers(okx_api, binance_api, bybit_api):
     return common_tickers
 
 
-async def create_spreads_data(okx_api, binance_api, bybit_api, common_tickers):
+async def stream_and_find_common_tickers(okx_api, binance_api, bybit_api):
+    tasks = [
+        okx_api.stream_spot_data(),
+        binance_api.stream_spot_data(),
+        bybit_api.stream_spot_data(),
+    ]
+    if not all(await asyncio.gather(*tasks)):
+        logger.error("❌ Не удалось потоково получить цены со всех бирж.")
+        return set()
+    common_tickers = (
+        okx_api.tickers_book.keys()
+        & binance_api.tickers_book.keys()
+        & bybit_api.tickers_book.keys()
+    )
+    logger.info(
+        f"📣 Найдено {len(common_tickers)} общих тикеров. Попробуем найти среди них лучшие сделки..."
+    )
+    return common_tickers
+
+
+async def create_spreads_data(
+    okx_api, binance_api, bybit_api, common_tickers, use_book=False
+):
     spreads_data = []
     for ticker in common_tickers:
-        okx_price = okx_api.get_price_from_dict(ticker)
-        binance_price = binance_api.get_price_from_dict(ticker)
-        bybit_price = bybit_api.get_price_from_dict(ticker)
+        if use_book:
+            okx_price = okx_api.get_price_from_book(ticker)
+            binance_price = binance_api.get_price_from_book(ticker)
+            bybit_price = bybit_api.get_price_from_book(ticker)
+        else:
+            okx_price = okx_api.get_price_from_dict(ticker)
+            binance_price = binance_api.get_price_from_dict(ticker)
+            bybit_price = bybit_api.get_price_from_dict(ticker)
 
         prices = {"OKX": okx_price, "Binance": binance_price, "Bybit": bybit_price}
 
@@ -132,20 +159,28 @@ def print_profitable_tickers(spreads_data, spread_threshold):
 async def main():
     # значение спреда в % выше которого будет выводиться тикер
     spread_threshold = 0.5
+    # потоковый режим: цены разбираются прямо из ответа биржи, без сохранения SPOT данных в файлы
+    stream_mode = True
     logger.info(
         f"🚀 Программа найдёт общие тикеры, посчитает спред и выведет тикеры со спредом выше {spread_threshold}%."
     )
 
     async with OkxAPI() as okx_api, BinanceAPI() as binance_api, BybitAPI() as bybit_api:
-        # асинхронно получаем и сохраняем данные
-        await fetch_and_save_all_exchanges(okx_api, binance_api, bybit_api)
-        # асинхронно загружаем данные и находим общие тикеры
-        common_tickers = await load_and_find_common_tickers(
-            okx_api, binance_api, bybit_api
-        )
+        if stream_mode:
+            # асинхронно и потоково получаем цены и находим общие тикеры
+            common_tickers = await stream_and_find_common_tickers(
+                okx_api, binance_api, bybit_api
+            )
+        else:
+            # асинхронно получаем и сохраняем данные
+            await fetch_and_save_all_exchanges(okx_api, binance_api, bybit_api)
+            # асинхронно загружаем данные и находим общие тикеры
+            common_tickers = await load_and_find_common_tickers(
+                okx_api, binance_api, bybit_api
+            )
         # создадим список спредов, отфильтруем нулевые и некоторые фиатные пары к национальным валютам
         spreads_data = await create_spreads_data(
-            okx_api, binance_api, bybit_api, common_tickers
+            okx_api, binance_api, bybit_api, common_tickers, use_book=stream_mode
         )
         # ранжируем список от большего к меньшему
         ranked_spreads_data = rank_spreads_data(spreads_data)
@@ -1,6 +1,7 @@
 import asyncio
 from web3 import AsyncWeb3
 from web3.providers.async_rpc import AsyncHTTPProvider
+from wallet_state import get_wallet_state_cache
 
 
 async def check_connection(w3_async_client):
@@ -16,19 +17,29 @@ def is_valid_erc20_address(w3_async_client, address):
 async def main():
 
     w3_async = AsyncWeb3(AsyncHTTPProvider("https://1rpc.io/linea"))
-    address = input("📣 Введите ERC20 адрес: ")
-    while not is_valid_erc20_address(w3_async, address):
-        address = input("⚠️ Введите корректный ERC20(0x...) адрес: ")
-    if await check_connection(w3_async):
-        checksum_address = w3_async.to_checksum_address(address)
-        balance = await w3_async.eth.get_balance(checksum_address)
-        eth_balance = w3_async.from_wei(balance, "ether")
-        nonce = await w3_async.eth.get_transaction_count(checksum_address)
+    await check_addresses(w3_async)
+
+
+async def check_addresses(w3_async):
+    if not await check_connection(w3_async):
+        print("❌ Не удалось подключиться к провайдеру. Проверьте соединение.")
+        return
+    # баланс и nonce запрашиваются на одном блоке, повторный адрес в том же блоке - из кэша
+    wallet_states = get_wallet_state_cache(await w3_async.eth.chain_id)
+
+    while True:
+        address = input("📣 Введите ERC20 адрес (пустая строка - выход): ").strip()
+        if not address:
+            break
+        if not is_valid_erc20_address(w3_async, address):
+            print("⚠️ Введите корректный ERC20(0x...) адрес.")
+            continue
+        state = await wallet_states.get(w3_async, address)
+        eth_balance = w3_async.from_wei(state.balance, "ether")
         print(
-            f"💲 Баланс данного адреса: {eth_balance:.4f} 🇪🇹🇭\n🧮 Количество транзакций: {nonce}"
+            f"💲 Баланс данного адреса: {eth_balance:.4f} 🇪🇹🇭\n🧮 Количество транзакций: {state.nonce}"
+            f"\n🧱 Блок: {state.block}"
         )
-    else:
-        print("❌ Не удалось подключиться к провайдеру. Проверьте соединение.")
 
 
 if __name__ == "__main__":
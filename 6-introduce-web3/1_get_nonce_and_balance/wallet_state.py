@@ -0,0 +1,62 @@
+import asyncio
+import time
+
+
+class WalletState:
+    """Баланс (wei) и nonce адреса на блоке block."""
+
+    __slots__ = ("address", "balance", "nonce", "block")
+
+    def __init__(self, address, balance, nonce, block):
+        self.address = address
+        self.balance = balance
+        self.nonce = nonce
+        self.block = block
+
+
+class WalletStateCache:
+    """
+    Кэш балансов и nonce по (адрес, блок) для одной сети. Номер блока проверяется не чаще
+    раза в block_time секунд, баланс и nonce адреса запрашиваются параллельно на этом блоке
+    и до следующего блока берутся из кэша.
+    """
+
+    def __init__(self, chain_id, block_time=1.0):
+        self.chain_id = chain_id
+        self.block_time = block_time
+        self._states = {}
+        self._block = None
+        self._block_checked_at = 0
+        self._block_lock = asyncio.Lock()
+
+    async def _current_block(self, w3):
+        if time.monotonic() - self._block_checked_at < self.block_time:
+            return self._block
+        async with self._block_lock:
+            if time.monotonic() - self._block_checked_at >= self.block_time:
+                block = await w3.eth.block_number
+                # узлы за балансировщиком могут ответить блоком старше уже виденного
+                self._block = block if self._block is None else max(self._block, block)
+                self._block_checked_at = time.monotonic()
+        return self._block
+
+    async def get(self, w3, address):
+        address = w3.to_checksum_address(address)
+        block = await self._current_block(w3)
+        state = self._states.get(address)
+        if state is None or state.block < block:
+            balance, nonce = await asyncio.gather(
+                w3.eth.get_balance(address, block), w3.eth.get_transaction_count(address, block)
+            )
+            state = self._states[address] = WalletState(address, balance, nonce, block)
+        return state
+
+
+_caches = {}
+
+
+def get_wallet_state_cache(chain_id):
+    cache = _caches.get(chain_id)
+    if cache is None:
+        cache = _caches[chain_id] = WalletStateCache(chain_id)
+    return cache
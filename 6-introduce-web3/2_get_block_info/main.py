@@ -20,9 +20,9 @@ def convert_hash_to_hex(hash_bytes):
 
 
 async def input_valid_block_number(w3_async):
+    latest_block_number = await w3_async.eth.block_number
     while True:
         try:
-            latest_block_number = await w3_async.eth.block_number
             block_number = int(input("📣 Введите номер блока сети Ethereum: "))
             if 0 < block_number < latest_block_number:
                 return block_number
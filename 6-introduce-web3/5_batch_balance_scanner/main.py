@@ -0,0 +1,57 @@
+import asyncio
+import os
+from scanner import BalanceScanner, RpcEndpoint, prepare_addresses, scan_to_file
+from rpc_stub import LocalRpcStub
+
+
+def read_addresses(filename):
+    with open(filename, "r", encoding="utf-8") as file:
+        return [line for line in file if line.strip()]
+
+
+def generate_demo_addresses(count):
+    return [f"0x{index:040x}" for index in range(1, count + 1)]
+
+
+async def main():
+    addresses_file = "addresses.txt"
+    output_file = "balances.csv"  # или balances.parquet
+    rpc_urls = [
+        "https://eth.llamarpc.com",
+        "https://rpc.ankr.com/eth",
+        "https://1rpc.io/eth",
+    ]
+    # количество одновременных batch запросов к каждому RPC
+    max_concurrency = 4
+    batch_size = 100
+    # запуск на локальной заглушке RPC, без сети
+    use_local_stub = not os.path.exists(addresses_file)
+
+    if use_local_stub:
+        print("ℹ️ Файл с адресами не найден, сканируем демо адреса на локальной заглушке RPC.")
+        addresses = prepare_addresses(generate_demo_addresses(20_000))
+        stubs = [LocalRpcStub(port=18545 + index, latency=0.05) for index in range(3)]
+        for stub in stubs:
+            await stub.start()
+        rpc_urls = [stub.url for stub in stubs]
+    else:
+        addresses = prepare_addresses(read_addresses(addresses_file))
+        stubs = []
+
+    endpoints = [RpcEndpoint(url, max_concurrency) for url in rpc_urls]
+    scanner = BalanceScanner(endpoints, batch_size=batch_size)
+    try:
+        rows_count, elapsed = await scan_to_file(scanner, addresses, output_file)
+    finally:
+        for stub in stubs:
+            await stub.stop()
+
+    print(f"✅ Получено {rows_count} балансов за {elapsed:.2f} сек. Результат в {output_file}")
+    for endpoint in endpoints:
+        print(
+            f"ℹ️ {endpoint.url}: batch запросов {endpoint.batches_done}, ошибок {endpoint.errors}"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+import asyncio
+from aiohttp import web
+
+
+class LocalRpcStub:
+    """
+    Локальная замена RPC для проверки сканера без сети.
+    Отвечает на одиночные и batch JSON-RPC запросы eth_getBalance / eth_getTransactionCount
+    детерминированными значениями, умеет добавлять задержку. Ответы можно переопределить
+    через results: {метод: значение или функция(params)}, например мусором для проверки ошибок.
+    """
+
+    def __init__(self, port=8545, latency=0.0, results=None):
+        self.port = port
+        self.latency = latency
+        self.requests_count = 0
+        self.results = {
+            "eth_getBalance": lambda params: hex(self.balance_of(params[0])),
+            "eth_getTransactionCount": lambda params: hex(self.nonce_of(params[0])),
+        }
+        self.results.update(results or {})
+        self._runner = None
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    @staticmethod
+    def balance_of(address):
+        return int(address, 16) % 10**20
+
+    @staticmethod
+    def nonce_of(address):
+        return int(address, 16) % 1000
+
+    def _answer(self, request):
+        method, params = request.get("method"), request.get("params", [])
+        if method not in self.results:
+            return {
+                "jsonrpc": "2.0",
+                "id": request.get("id"),
+                "error": {"code": -32601, "message": f"Method {method} not found"},
+            }
+        result = self.results[method]
+        if callable(result):
+            result = result(params)
+        return {"jsonrpc": "2.0", "id": request.get("id"), "result": result}
+
+    async def _handle(self, http_request):
+        self.requests_count += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+        payload = await http_request.json()
+        if isinstance(payload, list):
+            return web.json_response([self._answer(request) for request in payload])
+        return web.json_response(self._answer(payload))
+
+    async def start(self):
+        app = web.Application(client_max_size=64 * 1024**2)
+        app.router.add_post("/", self._handle)
+        self._runner = web.AppRunner(app)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, "127.0.0.1", self.port).start()
+        return self
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.stop()
@@ -0,0 +1,236 @@
+import asyncio
+import csv
+import time
+import aiohttp
+from address_validator import validate_addresses
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+
+class RpcBatchError(Exception):
+    """Ошибка при выполнении JSON-RPC batch запроса."""
+    pass
+
+
+class RpcEndpoint:
+    def __init__(self, url, max_concurrency=4):
+        self.url = url
+        self.max_concurrency = max_concurrency
+        self.batches_done = 0
+        self.errors = 0
+
+    async def call_batch(self, session, calls):
+        """
+        Отправляет список вызовов (method, params) одним JSON-RPC batch запросом.
+        Ответы возвращаются в том же порядке, что и вызовы.
+        """
+        payload = [
+            {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+            for request_id, (method, params) in enumerate(calls)
+        ]
+        async with session.post(self.url, json=payload) as response:
+            response.raise_for_status()
+            answers = await response.json(content_type=None)
+        if not isinstance(answers, list):
+            raise RpcBatchError(f"{self.url} не поддерживает batch запросы: {answers}")
+
+        results = [None] * len(calls)
+        for answer in answers:
+            if "error" in answer:
+                raise RpcBatchError(f"{self.url} вернул ошибку: {answer['error']}")
+            results[answer["id"]] = answer["result"]
+        if any(result is None for result in results):
+            raise RpcBatchError(f"{self.url} вернул неполный ответ на batch запрос")
+        return results
+
+
+def prepare_addresses(addresses):
+    """
+    Приводит адреса к checksum формату, некорректные и повторяющиеся отбрасывает.
+    """
+    addresses = [
+        f"0x{address:040x}" if isinstance(address, int)
+        else address.strip() if isinstance(address, str)
+        else address
+        for address in addresses
+    ]
+    checksum_addresses = []
+    seen = set()
+    skipped = 0
+    for address in validate_addresses(addresses):
+        if address is None:
+            skipped += 1
+            continue
+        if address not in seen:
+            seen.add(address)
+            checksum_addresses.append(address)
+    if skipped:
+        print(f"⚠️ Пропущено {skipped} некорректных адресов.")
+    return checksum_addresses
+
+
+class BalanceScanner:
+    """
+    Сканер балансов: адреса упаковываются в JSON-RPC batch запросы
+    (eth_getBalance + eth_getTransactionCount на каждый адрес),
+    batch'и распределяются по пулу RPC с ограничением параллельности на каждый RPC.
+    """
+
+    def __init__(self, endpoints, batch_size=100, max_attempts=3, request_timeout=30):
+        self.endpoints = endpoints
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.request_timeout = request_timeout
+
+    def _make_calls(self, addresses, block):
+        calls = []
+        for address in addresses:
+            calls.append(("eth_getBalance", [address, block]))
+            calls.append(("eth_getTransactionCount", [address, block]))
+        return calls
+
+    async def _worker(self, endpoint, session, batches, results):
+        while True:
+            item = await batches.get()
+            if item is None:
+                batches.task_done()
+                return
+            addresses, block, attempt = item
+            try:
+                answers = await endpoint.call_batch(
+                    session, self._make_calls(addresses, block)
+                )
+                endpoint.batches_done += 1
+                rows = [
+                    (address, int(answers[2 * i], 16), int(answers[2 * i + 1], 16))
+                    for i, address in enumerate(addresses)
+                ]
+                await results.put(rows)
+            except Exception as error:
+                # любой сбой batch (сеть, ошибка RPC, мусор в ответе) - повтор или пустой результат:
+                # scan() ждёт ровно один результат на каждый batch
+                endpoint.errors += 1
+                if attempt + 1 < self.max_attempts:
+                    # отдаём batch обратно в очередь, его заберёт любой свободный RPC
+                    batches.put_nowait((addresses, block, attempt + 1))
+                    # уступаем ход: иначе этот же worker сразу заберёт batch обратно раньше ожидающих
+                    await asyncio.sleep(0)
+                else:
+                    print(f"❌ Batch из {len(addresses)} адресов не получен: {error}")
+                    await results.put([])
+            finally:
+                batches.task_done()
+
+    async def scan(self, addresses, block="latest"):
+        """
+        Асинхронный генератор: отдаёт строки (address, balance_wei, nonce)
+        по мере получения batch'ей, порядок адресов не сохраняется.
+        """
+        batches = asyncio.Queue()
+        results = asyncio.Queue()
+        batches_count = 0
+        for start in range(0, len(addresses), self.batch_size):
+            batches.put_nowait((addresses[start : start + self.batch_size], block, 0))
+            batches_count += 1
+
+        timeout = aiohttp.ClientTimeout(total=self.request_timeout)
+        connector = aiohttp.TCPConnector(
+            limit=sum(endpoint.max_concurrency for endpoint in self.endpoints)
+        )
+        async with aiohttp.ClientSession(timeout=timeout, connector=connector) as session:
+            workers = [
+                asyncio.create_task(self._worker(endpoint, session, batches, results))
+                for endpoint in self.endpoints
+                for _ in range(endpoint.max_concurrency)
+            ]
+            try:
+                for _ in range(batches_count):
+                    for row in await results.get():
+                        yield row
+            finally:
+                for _ in workers:
+                    batches.put_nowait(None)
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+
+
+class CsvBalanceWriter:
+    def __init__(self, filename):
+        self._file = open(filename, "w", newline="", encoding="utf-8")
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(["address", "balance_wei", "nonce"])
+
+    def write_rows(self, rows):
+        self._writer.writerows(rows)
+
+    def close(self):
+        self._file.close()
+
+
+class ParquetBalanceWriter:
+    """
+    Пишет строки в parquet группами по row_group_size, чтобы не держать весь результат в памяти.
+    balance_wei хранится строкой, так как uint256 не помещается в int64.
+    """
+
+    def __init__(self, filename, row_group_size=10_000):
+        if pyarrow is None:
+            raise RuntimeError("Для записи в parquet установите пакет pyarrow.")
+        self._schema = pyarrow.schema(
+            [
+                ("address", pyarrow.string()),
+                ("balance_wei", pyarrow.string()),
+                ("nonce", pyarrow.int64()),
+            ]
+        )
+        self._writer = pyarrow.parquet.ParquetWriter(filename, self._schema)
+        self._row_group_size = row_group_size
+        self._buffer = []
+
+    def write_rows(self, rows):
+        self._buffer.extend(rows)
+        if len(self._buffer) >= self._row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._buffer:
+            return
+        addresses, balances, nonces = zip(*self._buffer)
+        table = pyarrow.table(
+            [list(addresses), [str(balance) for balance in balances], list(nonces)],
+            schema=self._schema,
+        )
+        self._writer.write_table(table)
+        self._buffer = []
+
+    def close(self):
+        self._flush()
+        self._writer.close()
+
+
+def open_balance_writer(filename):
+    if filename.endswith(".parquet"):
+        return ParquetBalanceWriter(filename)
+    return CsvBalanceWriter(filename)
+
+
+async def scan_to_file(scanner, addresses, filename, block="latest"):
+    """
+    Сканирует балансы и потоково пишет их в CSV или Parquet (по расширению файла).
+    Возвращает (количество строк, время в секундах).
+    """
+    writer = open_balance_writer(filename)
+    rows_count = 0
+    start_time = time.perf_counter()
+    try:
+        async for row in scanner.scan(addresses, block):
+            writer.write_rows([row])
+            rows_count += 1
+    finally:
+        writer.close()
+    return rows_count, time.perf_counter() - start_time
@@ -0,0 +1,42 @@
+import asyncio
+from scanner import BalanceScanner, RpcEndpoint, prepare_addresses
+from rpc_stub import LocalRpcStub
+
+ADDRESSES = [f"0x{index:040x}" for index in range(1, 251)]
+
+
+async def scan(scanner):
+    return [row async for row in scanner.scan(ADDRESSES)]
+
+
+def test_garbage_answers_do_not_hang_scan():
+    async def main():
+        async with LocalRpcStub(18950, results={"eth_getBalance": "not a number"}) as stub:
+            scanner = BalanceScanner([RpcEndpoint(stub.url, 2)], batch_size=100, max_attempts=2)
+            rows = await asyncio.wait_for(scan(scanner), 10)
+        assert rows == []
+        # 3 batch'а по 2 попытки
+        assert stub.requests_count == 6
+
+    asyncio.run(main())
+
+
+def test_failed_batches_are_retried_on_another_endpoint():
+    async def main():
+        async with LocalRpcStub(18951, latency=0.05, results={"eth_getTransactionCount": {"bad": "answer"}}) as bad, \
+                LocalRpcStub(18952) as good:
+            scanner = BalanceScanner([RpcEndpoint(bad.url, 1), RpcEndpoint(good.url, 1)], batch_size=50)
+            rows = await asyncio.wait_for(scan(scanner), 10)
+        assert sorted(rows) == sorted(
+            (address, LocalRpcStub.balance_of(address), LocalRpcStub.nonce_of(address)) for address in ADDRESSES
+        )
+        assert bad.requests_count > 0
+
+    asyncio.run(main())
+
+
+def test_prepare_addresses_skips_malformed_input():
+    checksum = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+    assert prepare_addresses([f" {checksum.lower()} ", ["0x1"], {"a": 1}, None, 1, checksum]) == [
+        checksum, "0x0000000000000000000000000000000000000001"
+    ]
@@ -0,0 +1,63 @@
+import asyncio
+import os
+import sys
+from web3 import AsyncWeb3
+from web3.providers.async_rpc import AsyncHTTPProvider
+
+# Агрегатор Multicall3 общий с W3Client из урока 7-transactions
+sys.path.append(
+    os.path.abspath(
+        os.path.join(
+            os.path.dirname(__file__),
+            "..",
+            "..",
+            "7-transactions",
+            "1-transfere-native-token",
+            "core",
+        )
+    )
+)
+from multicall import MulticallAggregator, NATIVE_TOKEN, get_multicall_address
+
+
+async def check_connection(w3_async_client):
+    return await w3_async_client.is_connected()
+
+
+def print_balances(balances, token_symbols):
+    for (address, token), balance in balances.items():
+        symbol = token_symbols.get(token, token)
+        if balance is None:
+            print(f"⚠️ Не удалось получить баланс {symbol} адреса {address}")
+        else:
+            print(f"💲 Баланс адреса {address}: {balance} wei {symbol}")
+
+
+async def main():
+
+    address_list = (
+        "0x21F25E0507F363B0311F880277A23F9BB0E677A8",
+        "0xA9D1E08C7793AF67E9D92FE308D5697FB81D3E43",
+        "0x787BAA623798F149CD6B65CCF3B8E3F49F17503B",
+    )
+    token_symbols = {
+        NATIVE_TOKEN: "ETH",
+        "0xdAC17F958D2ee523a2206206994597C13D831ec7": "USDT",
+        "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48": "USDC",
+    }
+
+    w3_async = AsyncWeb3(AsyncHTTPProvider("https://eth.llamarpc.com"))
+
+    if await check_connection(w3_async):
+        aggregator = MulticallAggregator(w3_async, get_multicall_address(await w3_async.eth.chain_id))
+        pairs = [
+            (address, token) for address in address_list for token in token_symbols
+        ]
+        balances = await aggregator.get_balances(pairs)
+        print_balances(balances, token_symbols)
+    else:
+        print("❌ Не удалось подключиться к провайдеру. Проверьте соединение и RPC.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
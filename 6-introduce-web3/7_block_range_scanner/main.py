@@ -0,0 +1,39 @@
+import asyncio
+from web3 import AsyncWeb3
+from web3.providers.async_rpc import AsyncHTTPProvider
+from scanner import BlockRangeScanner
+
+
+async def check_connection(w3_async_client):
+    return await w3_async_client.is_connected()
+
+
+async def main():
+    rpc_url = "https://eth.llamarpc.com"
+    output_dir = "blocks"
+    # сколько последних блоков сканировать
+    blocks_count = 5000
+    workers = 16
+    full_transactions = False
+
+    w3_async = AsyncWeb3(AsyncHTTPProvider(rpc_url))
+
+    if await check_connection(w3_async):
+        latest_block_number = await w3_async.eth.block_number
+        start_block = latest_block_number - blocks_count + 1
+        scanner = BlockRangeScanner(
+            w3_async, workers=workers, full_transactions=full_transactions
+        )
+        print(f"📣 Сканируем блоки {start_block} - {latest_block_number}")
+        processed, blocks_per_second = await scanner.scan_to_dir(
+            start_block, latest_block_number, output_dir
+        )
+        print(
+            f"✅ Обработано {processed} блоков, {blocks_per_second:.1f} блоков/сек. Результат в {output_dir}"
+        )
+    else:
+        print("❌ Не удалось подключиться к провайдеру. Проверьте соединение и RPC.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,200 @@
+import asyncio
+import csv
+import json
+import os
+import time
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+SUMMARY_FIELDS = ("number", "timestamp", "hash", "tx_count", "gas_used")
+
+
+def summarize_block(block):
+    return {
+        "number": block["number"],
+        "timestamp": block["timestamp"],
+        "hash": "0x" + bytes(block["hash"]).hex(),
+        "tx_count": len(block["transactions"]),
+        "gas_used": block["gasUsed"],
+    }
+
+
+def write_atomic(filename, write):
+    tmp_filename = f"{filename}.tmp"
+    write(tmp_filename)
+    os.replace(tmp_filename, filename)
+
+
+class Checkpoint:
+    """
+    Номер следующего блока для обработки. Сохраняется только после того,
+    как все предыдущие блоки записаны на диск, поэтому после сбоя продолжаем без пропусков.
+    """
+
+    def __init__(self, filename):
+        self.filename = filename
+
+    def load(self):
+        if not os.path.exists(self.filename):
+            return None
+        with open(self.filename, "r", encoding="utf-8") as file:
+            return json.load(file)["next_block"]
+
+    def save(self, next_block):
+        def write(tmp_filename):
+            with open(tmp_filename, "w", encoding="utf-8") as file:
+                json.dump({"next_block": next_block}, file)
+
+        write_atomic(self.filename, write)
+
+
+class BlockSummaryWriter:
+    """
+    Пишет сводки блоков частями: каждая часть - отдельный файл blocks_<от>_<до>.parquet
+    (или .csv без pyarrow), записанный атомарно. Папка читается как один набор данных,
+    например pyarrow.dataset.dataset(output_dir).
+    """
+
+    def __init__(self, output_dir, rows_per_file=1000):
+        self.output_dir = output_dir
+        self.rows_per_file = rows_per_file
+        self.extension = "parquet" if pyarrow is not None else "csv"
+        self._rows = []
+        os.makedirs(output_dir, exist_ok=True)
+
+    def add(self, summary):
+        self._rows.append(summary)
+        return len(self._rows) >= self.rows_per_file
+
+    def flush(self):
+        if not self._rows:
+            return None
+        rows, self._rows = self._rows, []
+        filename = os.path.join(
+            self.output_dir,
+            f"blocks_{rows[0]['number']}_{rows[-1]['number']}.{self.extension}",
+        )
+        if self.extension == "parquet":
+            table = pyarrow.table(
+                {
+                    "number": [row["number"] for row in rows],
+                    "timestamp": [row["timestamp"] for row in rows],
+                    "hash": [row["hash"] for row in rows],
+                    "tx_count": [row["tx_count"] for row in rows],
+                    "gas_used": [row["gas_used"] for row in rows],
+                }
+            )
+            write_atomic(
+                filename, lambda tmp: pyarrow.parquet.write_table(table, tmp)
+            )
+        else:
+
+            def write(tmp_filename):
+                with open(tmp_filename, "w", newline="", encoding="utf-8") as file:
+                    writer = csv.DictWriter(file, fieldnames=SUMMARY_FIELDS)
+                    writer.writeheader()
+                    writer.writerows(rows)
+
+            write_atomic(filename, write)
+        return rows[-1]["number"]
+
+
+class BlockRangeScanner:
+    """
+    Загружает диапазон блоков пулом воркеров и отдаёт их строго по порядку номеров.
+    Число блоков "в работе" ограничено окном max_in_flight, чтобы медленный блок
+    не заставлял копить в памяти весь остальной диапазон.
+    """
+
+    def __init__(
+        self, w3, workers=16, max_in_flight=256, full_transactions=False, max_retries=3
+    ):
+        self.w3 = w3
+        self.workers = workers
+        self.max_in_flight = max(max_in_flight, workers)
+        self.full_transactions = full_transactions
+        self.max_retries = max_retries
+
+    async def _fetch_block(self, block_number):
+        for attempt in range(1, self.max_retries + 1):
+            try:
+                return await self.w3.eth.get_block(
+                    block_number, full_transactions=self.full_transactions
+                )
+            except Exception as error:
+                if attempt == self.max_retries:
+                    raise
+                print(f"⚠️ Блок {block_number}: {error}. Попытка {attempt} из {self.max_retries}")
+                await asyncio.sleep(0.5 * 2**attempt)
+
+    async def iter_blocks(self, start_block, end_block):
+        """Асинхронный генератор блоков от start_block до end_block включительно, по порядку."""
+        numbers = asyncio.Queue()
+        window = asyncio.Semaphore(self.max_in_flight)
+        fetched = {}
+        block_ready = asyncio.Event()
+
+        async def produce():
+            for block_number in range(start_block, end_block + 1):
+                await window.acquire()
+                await numbers.put(block_number)
+
+        async def work():
+            while True:
+                block_number = await numbers.get()
+                try:
+                    fetched[block_number] = await self._fetch_block(block_number)
+                except Exception as error:
+                    fetched[block_number] = error
+                block_ready.set()
+
+        tasks = [asyncio.create_task(produce())]
+        tasks += [asyncio.create_task(work()) for _ in range(self.workers)]
+        try:
+            for block_number in range(start_block, end_block + 1):
+                while block_number not in fetched:
+                    block_ready.clear()
+                    await block_ready.wait()
+                block = fetched.pop(block_number)
+                window.release()
+                if isinstance(block, Exception):
+                    raise block
+                yield block
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def scan_to_dir(self, start_block, end_block, output_dir, report_every=1000):
+        """
+        Сканирует диапазон с продолжением с контрольной точки и пишет сводки блоков в output_dir.
+        Возвращает (количество обработанных блоков, блоков в секунду).
+        """
+        checkpoint = Checkpoint(f"{output_dir.rstrip(os.sep)}.checkpoint.json")
+        writer = BlockSummaryWriter(output_dir)
+        next_block = checkpoint.load()
+        if next_block is not None and next_block > start_block:
+            print(f"ℹ️ Продолжаем с контрольной точки: блок {next_block}")
+            start_block = next_block
+        if start_block > end_block:
+            return 0, 0.0
+
+        processed = 0
+        start_time = time.perf_counter()
+        async for block in self.iter_blocks(start_block, end_block):
+            if writer.add(summarize_block(block)):
+                checkpoint.save(writer.flush() + 1)
+            processed += 1
+            if processed % report_every == 0:
+                elapsed = time.perf_counter() - start_time
+                print(f"ℹ️ Обработано {processed} блоков, {processed / elapsed:.1f} блоков/сек")
+        last_block = writer.flush()
+        if last_block is not None:
+            checkpoint.save(last_block + 1)
+
+        elapsed = time.perf_counter() - start_time
+        return processed, processed / elapsed if elapsed else 0.0
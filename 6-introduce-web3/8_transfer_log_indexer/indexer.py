@@ -0,0 +1,252 @@
+import asyncio
+import sqlite3
+import time
+from eth_utils import keccak, to_checksum_address
+
+TRANSFER_TOPIC = "0x" + keccak(text="Transfer(address,address,uint256)").hex()
+
+# Фрагменты ошибок, которыми RPC отказывают в слишком большом диапазоне или ответе eth_getLogs.
+# Только тексты про диапазон и размер ответа: код -32005 и "limit exceeded" у многих RPC означают
+# и обычный лимит запросов, который лечится паузой, а не разбиением диапазона
+RANGE_TOO_LARGE_MESSAGES = (
+    "query returned more than",
+    "block range",
+    "range is too large",
+    "range too large",
+    "response size",
+    "too many results",
+    "max results",
+    "is limited to a",
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS transfers (
+    block INTEGER NOT NULL,
+    log_index INTEGER NOT NULL,
+    tx_hash TEXT NOT NULL,
+    token TEXT NOT NULL,
+    sender TEXT NOT NULL,
+    recipient TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (block, log_index)
+);
+CREATE INDEX IF NOT EXISTS transfers_sender ON transfers (sender, block);
+CREATE INDEX IF NOT EXISTS transfers_recipient ON transfers (recipient, block);
+CREATE INDEX IF NOT EXISTS transfers_token ON transfers (token, block);
+CREATE TABLE IF NOT EXISTS checkpoints (
+    name TEXT PRIMARY KEY,
+    next_block INTEGER NOT NULL
+);
+"""
+
+
+class RangeTooLargeError(Exception):
+    """RPC отказался вернуть логи за диапазон: его нужно разбить."""
+    pass
+
+
+def decode_transfer_logs(logs):
+    """
+    Декодирует пачку сырых логов Transfer (ответ eth_getLogs) без ABI и web3 форматтеров:
+    адреса берутся из последних 20 байт topics[1] и topics[2], сумма - из data.
+    Логи без трёх topics (например, Transfer у ERC-721) пропускаются.
+    """
+    rows = []
+    for log in logs:
+        topics = log["topics"]
+        if len(topics) != 3 or log.get("removed"):
+            continue
+        rows.append((
+            int(log["blockNumber"], 16),
+            int(log["logIndex"], 16),
+            log["transactionHash"],
+            log["address"].lower(),
+            "0x" + topics[1][-40:],
+            "0x" + topics[2][-40:],
+            # uint256 не помещается в INTEGER SQLite, храним десятичной строкой
+            str(int(log["data"], 16) if log["data"] not in ("0x", "") else 0),
+        ))
+    return rows
+
+
+class TransferStore:
+    """
+    Локальное хранилище переводов в SQLite (WAL) с индексами по отправителю, получателю и токену.
+    Повторная запись того же лога игнорируется, поэтому диапазоны можно перекачивать после сбоя.
+    """
+
+    def __init__(self, filename):
+        self.connection = sqlite3.connect(filename)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def add_transfers(self, rows):
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+            )
+
+    def load_checkpoint(self, name):
+        row = self.connection.execute(
+            "SELECT next_block FROM checkpoints WHERE name = ?", (name,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def save_checkpoint(self, name, next_block):
+        with self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO checkpoints VALUES (?, ?)", (name, next_block)
+            )
+
+    def wallet_history(self, address, token=None, limit=100):
+        """Последние переводы кошелька (входящие и исходящие) из локальной базы, без запросов к RPC."""
+        address = address.lower()
+        query = (
+            "SELECT * FROM ("
+            " SELECT * FROM transfers WHERE sender = :address"
+            " UNION SELECT * FROM transfers WHERE recipient = :address"
+            ")"
+        )
+        params = {"address": address, "limit": limit}
+        if token is not None:
+            query += " WHERE token = :token"
+            params["token"] = token.lower()
+        query += " ORDER BY block DESC, log_index DESC LIMIT :limit"
+        return [
+            {
+                "block": block,
+                "log_index": log_index,
+                "tx_hash": tx_hash,
+                "token": to_checksum_address(token_address),
+                "from": to_checksum_address(sender),
+                "to": to_checksum_address(recipient),
+                "value": int(value),
+                "direction": "out" if sender == address else "in",
+            }
+            for block, log_index, tx_hash, token_address, sender, recipient, value
+            in self.connection.execute(query, params)
+        ]
+
+    def count(self):
+        return self.connection.execute("SELECT COUNT(*) FROM transfers").fetchone()[0]
+
+
+class TransferLogIndexer:
+    """
+    Индексатор логов ERC-20 Transfer по списку контрактов.
+    Диапазон делится на куски по span блоков, куски загружаются параллельно (workers).
+    Если RPC отказывает из-за размера ответа, кусок делится пополам рекурсивно, а span
+    для следующих кусков уменьшается; после успешных запросов span снова растёт до max_span.
+    Контрольная точка сдвигается только по непрерывно записанному префиксу диапазона.
+    """
+
+    def __init__(self, w3, store, tokens, span=2000, max_span=10000, min_span=1, workers=8, max_retries=3):
+        self.w3 = w3
+        self.store = store
+        self.tokens = [to_checksum_address(token) for token in tokens]
+        self.span = span
+        self.max_span = max_span
+        self.min_span = min_span
+        self.workers = workers
+        self.max_retries = max_retries
+        self.requests = 0
+        self.splits = 0
+
+    @property
+    def checkpoint_name(self):
+        return "transfers:" + ",".join(sorted(token.lower() for token in self.tokens))
+
+    async def _get_logs(self, from_block, to_block):
+        params = {
+            "fromBlock": hex(from_block),
+            "toBlock": hex(to_block),
+            "address": self.tokens,
+            "topics": [TRANSFER_TOPIC],
+        }
+        for attempt in range(1, self.max_retries + 1):
+            self.requests += 1
+            try:
+                # сырой ответ без web3 форматтеров: логи декодируются пачкой в decode_transfer_logs
+                response = await self.w3.provider.make_request("eth_getLogs", [params])
+                if "error" in response:
+                    # ошибка JSON-RPC (лимит запросов, сбой узла) повторяется так же, как ошибка сети
+                    raise ValueError(response["error"])
+                return response["result"]
+            except Exception as error:
+                if any(message in str(error).lower() for message in RANGE_TOO_LARGE_MESSAGES):
+                    raise RangeTooLargeError(str(error))
+                if attempt == self.max_retries:
+                    raise
+                print(f"⚠️ Логи {from_block}-{to_block}: {error}. Попытка {attempt} из {self.max_retries}")
+                await asyncio.sleep(0.5 * 2**attempt)
+
+    async def _fetch_range(self, from_block, to_block):
+        try:
+            return await self._get_logs(from_block, to_block)
+        except RangeTooLargeError:
+            if from_block == to_block:
+                raise
+        self.splits += 1
+        middle = (from_block + to_block) // 2
+        # следующие куски сразу берём меньше, чтобы не повторять отказ
+        self.span = max(self.min_span, min(self.span, (to_block - from_block + 1) // 2))
+        left, right = await asyncio.gather(
+            self._fetch_range(from_block, middle), self._fetch_range(middle + 1, to_block)
+        )
+        return left + right
+
+    async def index(self, start_block, end_block, report_every=10):
+        """
+        Индексирует блоки start_block..end_block включительно с продолжением с контрольной точки.
+        Возвращает (количество записанных переводов, блоков в секунду).
+        """
+        next_block = self.store.load_checkpoint(self.checkpoint_name)
+        if next_block is not None and next_block > start_block:
+            print(f"ℹ️ Продолжаем с контрольной точки: блок {next_block}")
+            start_block = next_block
+        if start_block > end_block:
+            return 0, 0.0
+
+        position = start_block
+        finished = {}
+        checkpoint_block = start_block
+        written = 0
+        ranges_done = 0
+        start_time = time.perf_counter()
+
+        async def work():
+            nonlocal position, checkpoint_block, written, ranges_done
+            while position <= end_block:
+                from_block = position
+                to_block = min(end_block, from_block + self.span - 1)
+                position = to_block + 1
+                rows = decode_transfer_logs(await self._fetch_range(from_block, to_block))
+                self.store.add_transfers(rows)
+                written += len(rows)
+                if to_block - from_block + 1 >= self.span:
+                    self.span = min(self.max_span, int(self.span * 1.25) + 1)
+                finished[from_block] = to_block
+                while checkpoint_block in finished:
+                    checkpoint_block = finished.pop(checkpoint_block) + 1
+                self.store.save_checkpoint(self.checkpoint_name, checkpoint_block)
+                ranges_done += 1
+                if ranges_done % report_every == 0:
+                    print(
+                        f"ℹ️ Проиндексировано до блока {checkpoint_block - 1}, "
+                        f"переводов: {written}, размер диапазона: {self.span}"
+                    )
+
+        tasks = [asyncio.create_task(work()) for _ in range(self.workers)]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+        elapsed = time.perf_counter() - start_time
+        blocks = end_block - start_block + 1
+        return written, blocks / elapsed if elapsed else 0.0
@@ -0,0 +1,55 @@
+import asyncio
+from web3 import AsyncWeb3
+from web3.providers.async_rpc import AsyncHTTPProvider
+from indexer import TransferLogIndexer, TransferStore
+
+
+async def check_connection(w3_async_client):
+    return await w3_async_client.is_connected()
+
+
+async def main():
+    rpc_url = "https://eth.llamarpc.com"
+    database_file = "transfers.sqlite"
+    tokens = [
+        "0xA0b86991c6218b36c1d19D4a2e9Eb0cE3606eB48",  # USDC
+        "0xdAC17F958D2ee523a2206206994597C13D831ec7",  # USDT
+    ]
+    # сколько последних блоков индексировать
+    blocks_count = 2000
+    workers = 8
+    # кошелёк, историю которого показать из локальной базы после индексации
+    wallet = None
+
+    w3_async = AsyncWeb3(AsyncHTTPProvider(rpc_url))
+
+    if not await check_connection(w3_async):
+        print("❌ Не удалось подключиться к провайдеру. Проверьте соединение и RPC.")
+        return
+
+    store = TransferStore(database_file)
+    try:
+        latest_block_number = await w3_async.eth.block_number
+        start_block = latest_block_number - blocks_count + 1
+        indexer = TransferLogIndexer(w3_async, store, tokens, span=100, workers=workers)
+        print(f"📣 Индексируем переводы токенов в блоках {start_block} - {latest_block_number}")
+        written, blocks_per_second = await indexer.index(start_block, latest_block_number)
+        print(
+            f"✅ Записано {written} переводов, {blocks_per_second:.1f} блоков/сек, "
+            f"запросов eth_getLogs: {indexer.requests}, разбиений диапазона: {indexer.splits}. "
+            f"Всего в базе {store.count()} переводов."
+        )
+
+        if wallet:
+            for transfer in store.wallet_history(wallet, limit=20):
+                arrow = "⬅️" if transfer["direction"] == "in" else "➡️"
+                print(
+                    f"{arrow} блок {transfer['block']} {transfer['token']} {transfer['value']} "
+                    f"{transfer['from']} -> {transfer['to']}"
+                )
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
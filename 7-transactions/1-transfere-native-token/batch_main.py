@@ -0,0 +1,62 @@
+import sys
+import os
+import asyncio
+import getpass
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'core')))
+from core import W3Client, BatchSender, KeyStore, read_payouts, logger
+from core import BatchValidationError, BatchInsufficientFundsError
+from main import set_client_address, set_client_private_key
+
+
+async def main():
+    base_url = "https://arbitrum.llamarpc.com"
+    explorer_url = "https://arbiscan.io"
+    proxy = None
+    eip_1559 = True
+
+    # CSV со строками recipient,amount (сумма в eth)
+    payouts_file = "payouts.csv"
+    # журнал выплат: при повторном запуске отправка продолжится с места остановки
+    journal_file = "payouts.journal.sqlite"
+    max_concurrency = 10
+    # процессы для подписи транзакций, None - по числу ядер
+    signing_workers = None
+    # каталог зашифрованных keystore файлов: ключ отправителя берётся из него вместо ввода
+    keystore_dir = None
+
+    payouts = read_payouts(payouts_file)
+    logger.info(f"ℹ️ Прочитано {len(payouts)} выплат из {payouts_file}")
+
+    async with W3Client(base_url, explorer_url, proxy, "Sender", eip_1559) as sender:
+        set_client_address(sender, "📢 Введите адрес отправителя :")
+        if keystore_dir:
+            with KeyStore(keystore_dir, getpass.getpass("📢 Введите пароль keystore :")) as keystore:
+                sender.set_private_key(await keystore.get_private_key(sender.address))
+        else:
+            set_client_private_key(sender, "📢 Введите приватный ключ отправителя (⚠️ ввод будет скрыт, после ввода нажмите Enter) :")
+
+        await sender.start_signer(signing_workers)
+        batch_sender = BatchSender(sender, journal_file, max_concurrency)
+        try:
+            summary = await batch_sender.run(payouts)
+        except BatchValidationError as e:
+            logger.error(f"❌ Выплаты не отправлены, исправьте файл {payouts_file}: {e}")
+            return
+        except BatchInsufficientFundsError as e:
+            logger.error(f"❌ Недостаточно средств для всех выплат: {e}")
+            return
+
+        logger.success(
+            f"✅ Подтверждено: {summary['confirmed']}, с ошибкой: {summary['failed']}, "
+            f"уже были отправлены: {summary['skipped']}"
+        )
+        if summary['unfinished']:
+            logger.warning(
+                f"⚠️ {summary['unfinished']} выплат не подтверждены. Запустите скрипт повторно, "
+                f"чтобы продолжить по журналу {journal_file}."
+            )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,241 @@
+import sys
+import os
+import re
+import json
+import time
+import shutil
+import asyncio
+import subprocess
+import threading
+from statistics import median
+from eth_account import Account
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'core')))
+from core import W3Client, RpcRecorder, redundancy_report, logger
+
+STAGES = ("connect", "prepare_tx", "sign_and_send_tx", "wait_tx")
+
+
+class LocalNode:
+    """
+    Локальная EVM сеть для замеров: anvil в отдельном процессе, если он установлен (foundry),
+    иначе eth-tester в этом же процессе. keys - приватные ключи аккаунтов с балансом.
+    """
+
+    def __init__(self, port=8545, accounts=20, block_time=None):
+        self.port = port
+        self.accounts = accounts
+        self.block_time = block_time
+        self.keys = []
+        self.kind = None
+        self._process = None
+        self._tester_provider = None
+        self.requires_nonce_order = False
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def _start_anvil(self):
+        command = ["anvil", "--port", str(self.port), "--accounts", str(self.accounts), "--balance", "1000000"]
+        if self.block_time:
+            command += ["--block-time", str(self.block_time)]
+        self._process = subprocess.Popen(command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        # anvil печатает приватные ключи аккаунтов строками "(0) 0x..." до строки "Listening on"
+        for line in self._process.stdout:
+            match = re.search(r"\(\d+\) (0x[0-9a-fA-F]{64})\b", line)
+            if match:
+                self.keys.append(match.group(1))
+            if "Listening on" in line:
+                break
+        else:
+            raise RuntimeError(f"anvil завершился до запуска, код {self._process.wait()}")
+        # anvil пишет лог каждого запроса: вычитываем его, иначе заполненный pipe остановит узел
+        threading.Thread(target=self._process.stdout.read, daemon=True).start()
+        self.kind = "anvil"
+
+    def _start_tester(self):
+        from web3.providers.eth_tester import AsyncEthereumTesterProvider
+        self._tester_provider = AsyncEthereumTesterProvider()
+        backend = self._tester_provider.ethereum_tester.backend
+        self.keys = [key.to_hex() for key in backend.account_keys]
+        self.kind = "eth-tester"
+        # eth-tester не ставит в очередь транзакции с пропуском nonce, как пул узла, а отклоняет их
+        self.requires_nonce_order = True
+
+    def start(self):
+        if shutil.which("anvil"):
+            self._start_anvil()
+        else:
+            logger.warning("⚠️ anvil не найден, замер на eth-tester: без HTTP и в одном процессе с клиентом.")
+            self._start_tester()
+        return self
+
+    def stop(self):
+        if self._process is not None:
+            self._process.terminate()
+            self._process.wait()
+            self._process = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.stop()
+
+    async def connect(self, client):
+        """Подключить W3Client к узлу. Для eth-tester клиент получает общий провайдер в процессе."""
+        if self._tester_provider is None:
+            await client.open_connection()
+        else:
+            from web3 import AsyncWeb3
+            client.w3 = AsyncWeb3(self._tester_provider)
+            if client.rpc_cache:
+                client.enable_rpc_cache()
+            await client.is_connect()
+
+
+def percentile(values, fraction):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * fraction))] if values else 0.0
+
+
+async def run_level(node, private_key, concurrency, tx_count, record_file=None, rpc_cache=True):
+    """tx_count переводов с одного кошелька, не больше concurrency одновременно."""
+    timings = {stage: [] for stage in STAGES}
+    recorder = RpcRecorder(record_file)
+    client = W3Client(node.url, "http://localhost", None, f"bench-{concurrency}", True, rpc_cache=rpc_cache)
+    started = time.perf_counter()
+    await node.connect(client)
+    timings["connect"].append(time.perf_counter() - started)
+    recorder.attach(client.w3)
+    client.set_address(Account.from_key(private_key).address)
+    client.set_private_key(private_key)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    failed = 0
+    next_nonce = None
+    nonce_turn = asyncio.Condition()
+
+    async def timed(stage, coroutine):
+        stage_started = time.perf_counter()
+        result = await coroutine
+        timings[stage].append(time.perf_counter() - stage_started)
+        return result
+
+    async def send_in_nonce_order(transaction):
+        nonlocal next_nonce
+        async with nonce_turn:
+            await nonce_turn.wait_for(lambda: next_nonce is None or next_nonce == transaction['nonce'])
+            tx_hash = await client.sign_and_send_tx(transaction)
+            next_nonce = transaction['nonce'] + 1
+            nonce_turn.notify_all()
+        return tx_hash
+
+    async def send_one(index):
+        nonlocal failed
+        with recorder.segment(f"tx:{index}"):
+            async with semaphore:
+                transaction = await timed("prepare_tx", client.prepare_tx(Account.create().address, 0.0001))
+                send = send_in_nonce_order if node.requires_nonce_order else client.sign_and_send_tx
+                tx_hash = await timed("sign_and_send_tx", send(transaction))
+                if not await timed("wait_tx", client.wait_tx(tx_hash)):
+                    failed += 1
+
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(send_one(index) for index in range(tx_count)))
+    finally:
+        elapsed = time.perf_counter() - started
+        await client.close_session()
+        recorder.close()
+
+    # вызовы вне сегментов (фоновые обновления кэшей) делятся на все транзакции уровня
+    rpc_calls = redundancy_report([record for record in recorder.records if record["segment"]])
+    background = len([record for record in recorder.records if not record["segment"]])
+
+    return {
+        "concurrency": concurrency,
+        "tx_count": tx_count,
+        "failed": failed,
+        "tx_per_second": tx_count / elapsed,
+        "stages": {
+            stage: {"p50_ms": median(values) * 1000, "p95_ms": percentile(values, 0.95) * 1000}
+            for stage, values in timings.items() if values
+        },
+        "rpc_per_tx": len(recorder.records) / tx_count,
+        "rpc_background_per_tx": background / tx_count,
+        "rpc_methods": {row["method"]: row["calls_per_segment"] for row in rpc_calls},
+        "rpc_redundant": {row["method"]: row["redundant_per_segment"] for row in rpc_calls if row["redundant_per_segment"]},
+    }
+
+
+def set_log_level(level):
+    logger.remove()
+    logger.add(sys.stdout, format="<green>{time:HH:mm:ss}</green> | <level>{level}</level> | <level>{message}</level>",
+               level=level, colorize=True)
+
+
+def report(results, baseline=None):
+    baseline = {result["concurrency"]: result for result in (baseline or [])}
+    for result in results:
+        line = (
+            f"ℹ️ concurrency {result['concurrency']:>3}: {result['tx_per_second']:7.1f} tx/сек, "
+            f"RPC на транзакцию {result['rpc_per_tx']:5.1f}, ошибок {result['failed']}"
+        )
+        previous = baseline.get(result["concurrency"])
+        if previous:
+            change = (result["tx_per_second"] / previous["tx_per_second"] - 1) * 100
+            line += f" ({change:+.1f}% к базовому замеру, RPC было {previous['rpc_per_tx']:.1f})"
+        logger.info(line)
+        for stage, stats in result["stages"].items():
+            logger.info(f"ℹ️     {stage:<17} p50 {stats['p50_ms']:8.1f} мс, p95 {stats['p95_ms']:8.1f} мс")
+        methods = ", ".join(
+            f"{method} {count:.2f}" for method, count in result["rpc_methods"].items() if count >= 0.01
+        )
+        logger.info(f"ℹ️     RPC на транзакцию: {methods}, вне транзакций {result['rpc_background_per_tx']:.2f}")
+        if result["rpc_redundant"]:
+            redundant = ", ".join(f"{method} {count:.2f}" for method, count in result["rpc_redundant"].items())
+            logger.info(f"ℹ️     Повторные вызовы на транзакцию: {redundant}")
+
+
+async def main():
+    concurrency_levels = [1, 2, 4, 8, 16, 32]
+    tx_per_level = 64
+    # anvil без --block-time добывает блок на каждую транзакцию
+    block_time = None
+    results_file = "bench_send.json"
+    # результаты, с которыми сравниваем: скопируйте сюда bench_send.json до оптимизации
+    baseline_file = "bench_send.baseline.json"
+    # запись всех JSON-RPC вызовов уровня в bench_send.c<concurrency>.rpc.gz для ReplayProvider и разбора
+    record_rpc = False
+    # False - замер без RpcCacheMiddleware, для сравнения
+    rpc_cache = True
+
+    # лог каждой транзакции на сотнях отправок мешает читать отчёт
+    set_log_level("WARNING")
+
+    results = []
+    with LocalNode(accounts=len(concurrency_levels), block_time=block_time) as node:
+        if len(node.keys) < len(concurrency_levels):
+            raise RuntimeError(f"Узел {node.kind} выдал {len(node.keys)} аккаунтов, нужно {len(concurrency_levels)}")
+        # на каждый уровень свой кошелёк: nonce и квитанции прошлых уровней не влияют на замер
+        for private_key, concurrency in zip(node.keys, concurrency_levels):
+            record_file = f"bench_send.c{concurrency}.rpc.gz" if record_rpc else None
+            results.append(await run_level(node, private_key, concurrency, tx_per_level, record_file, rpc_cache))
+
+    set_log_level("INFO")
+    logger.info(f"ℹ️ Отправка {tx_per_level} переводов на уровень, узел {node.kind}:")
+    baseline = None
+    if os.path.exists(baseline_file):
+        with open(baseline_file, "r", encoding="utf-8") as file:
+            baseline = json.load(file)["results"]
+    report(results, baseline)
+
+    with open(results_file, "w", encoding="utf-8") as file:
+        json.dump({"node": node.kind, "tx_per_level": tx_per_level, "results": results}, file, indent=2)
+    logger.info(f"ℹ️ Результаты записаны в {results_file}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
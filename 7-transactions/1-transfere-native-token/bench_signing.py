@@ -0,0 +1,63 @@
+import sys
+import os
+import time
+import asyncio
+from eth_account import Account
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'core')))
+from core import SigningService, logger
+
+
+def make_transactions(sender, count):
+    """Переводы со случайного кошелька: подписи не нужна сеть, поэтому замер не зависит от RPC."""
+    return [
+        {
+            'chainId': 42161,
+            'nonce': nonce,
+            'from': sender,
+            'to': Account.create().address,
+            'value': 10 ** 15,
+            'gas': 21000,
+            'maxFeePerGas': 2 * 10 ** 8,
+            'maxPriorityFeePerGas': 10 ** 6,
+            'type': '0x2',
+        }
+        for nonce in range(count)
+    ]
+
+
+async def bench_event_loop(account, transactions):
+    start_time = time.perf_counter()
+    for transaction in transactions:
+        account.sign_transaction(transaction)
+    return len(transactions) / (time.perf_counter() - start_time)
+
+
+async def bench_service(private_key, transactions, workers, use_processes):
+    async with SigningService(private_key, workers, use_processes) as signer:
+        start_time = time.perf_counter()
+        signed = await signer.sign_many(transactions)
+        elapsed = time.perf_counter() - start_time
+    return len(signed) / elapsed
+
+
+async def main():
+    tx_count = 2000
+    max_workers = os.cpu_count() or 1
+
+    account = Account.create()
+    transactions = make_transactions(account.address, tx_count)
+    private_key = account.key.hex()
+
+    results = [("event loop", await bench_event_loop(account, transactions))]
+    for workers in sorted({1, max_workers}):
+        results.append((f"{workers} потоков", await bench_service(private_key, transactions, workers, False)))
+        results.append((f"{workers} процессов", await bench_service(private_key, transactions, workers, True)))
+
+    logger.info(f"ℹ️ Подпись {tx_count} транзакций:")
+    for name, tx_per_second in results:
+        logger.info(f"ℹ️ {name:<14} {tx_per_second:8.1f} tx/сек")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -1,6 +1,25 @@
-from w3_client import W3Client
+from w3_client import W3Client, create_rpc_session
+from wallet_pool import WalletPool
 from logger import logger
 from utils import is_value_valid, wait_until_confirm
+from address_validator import validate_addresses, to_checksum_address, is_address
+from decorators import retry, get_retry_metrics, retry_budget, RetryBudget, RETRY_CLASSIFIERS
+from nonce_manager import NonceManager, bump_transaction_fees
+from receipt_tracker import ReceiptTracker, get_receipt_tracker, release_receipt_tracker
+from fee_oracle import FeeOracle, get_fee_oracle, FEE_PRESETS
+from gas_estimator import GasEstimator, get_gas_estimator
+from rpc_pool import PooledAsyncHTTPProvider
+from signer import SigningService
+from pending_tx import PendingTxManager, ReplacementPolicy, PendingTransfer
+from keystore import KeyStore
+from journal import TxJournal
+from rpc_batch import rpc_batch, rpc_batch_calls
+from rpc_cache import RpcCacheMiddleware
+from rpc_recorder import RpcRecorder, ReplayProvider, load_recording, redundant_calls, redundancy_report
+from wallet_state import WalletStateCache, WalletState, get_wallet_state_cache
+from chains import Chain, CHAINS, get_chain, ChainClientManager
+from batch_sender import BatchSender, read_payouts
+from multicall import MulticallAggregator, NATIVE_TOKEN, MULTICALL3_ADDRESS, get_multicall_address
 from exceptions import (
     W3UnknownError,
     ERC20AddressIncorrect,
@@ -17,4 +36,7 @@ from exceptions import (
     W3TransactionSendError,
     W3TransactionReceiptError,
     W3TransactionTimeoutError,
+    BatchValidationError,
+    BatchInsufficientFundsError,
+    JournalStateError,
 )
\ No newline at end of file
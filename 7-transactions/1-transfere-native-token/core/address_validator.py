@@ -0,0 +1,147 @@
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    # safe-pysha3: keccak на C без обёрток, в несколько раз быстрее eth_hash
+    from sha3 import keccak_256
+
+    def _keccak_hex(data):
+        return keccak_256(data).hexdigest().encode()
+except ImportError:
+    from eth_hash.auto import keccak
+
+    def _keccak_hex(data):
+        return keccak(data).hex().encode()
+
+HEX_DIGITS = b"0123456789abcdef"
+# ниббл хэша 8-f - символ адреса в верхнем регистре (EIP-55), разница регистров в ASCII - 0x20
+_HASH_TO_CASE_MASK = bytes.maketrans(HEX_DIGITS, b"\x00" * 8 + b"\x20" * 8)
+# регистр меняется только у букв a-f
+_ADDRESS_TO_LETTER_MASK = bytes.maketrans(HEX_DIGITS, b"\x00" * 10 + b"\x20" * 6)
+
+
+def _checksum_lower(lower):
+    """
+    EIP-55 для 40 hex символов в нижнем регистре (bytes): буквы в верхний регистр переводятся
+    одним вычитанием маски над целыми числами, без цикла по символам.
+    """
+    case_mask = int.from_bytes(_keccak_hex(lower)[:40].translate(_HASH_TO_CASE_MASK), "big")
+    letter_mask = int.from_bytes(lower.translate(_ADDRESS_TO_LETTER_MASK), "big")
+    return "0x" + (int.from_bytes(lower, "big") - (case_mask & letter_mask)).to_bytes(40, "big").decode()
+
+
+def _checksum_or_none(address):
+    """
+    Checksum адрес или None, если это не адрес. Адрес в смешанном регистре должен совпадать
+    со своей контрольной суммой EIP-55 (eth_utils.is_checksum_address), иначе это опечатка.
+    """
+    if isinstance(address, bytes) and len(address) == 20:
+        address = address.hex()
+    if not isinstance(address, str):
+        return None
+    body = address[2:] if address[:2] in ("0x", "0X") else address
+    if len(body) != 40:
+        return None
+    lower = body.lower()
+    try:
+        lower_bytes = lower.encode("ascii")
+    except UnicodeEncodeError:
+        return None
+    if lower_bytes.translate(None, HEX_DIGITS):
+        return None
+    checksum = _checksum_lower(lower_bytes)
+    if body != lower and body != body.upper() and body != checksum[2:]:
+        return None
+    return checksum
+
+
+def _checksum_chunk(addresses):
+    return [_checksum_or_none(address) for address in addresses]
+
+
+class ChecksumCache:
+    """LRU кэш адрес -> checksum адрес (None для некорректных)."""
+
+    def __init__(self, maxsize=200_000):
+        self.maxsize = maxsize
+        self._data = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, address, default=None):
+        try:
+            value = self._data[address]
+        except KeyError:
+            self.misses += 1
+            return default
+        self._data.move_to_end(address)
+        self.hits += 1
+        return value
+
+    def put(self, address, checksum):
+        self._data[address] = checksum
+        self._data.move_to_end(address)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def clear(self):
+        self._data.clear()
+
+
+_cache = ChecksumCache()
+_MISSING = object()
+# адресом может быть только строка или 20 байт; остальное (list, dict, число) в кэш не попадает,
+# иначе словарь кэша падает на нехэшируемых значениях с TypeError
+ADDRESS_TYPES = (str, bytes)
+
+
+def checksum_or_none(address):
+    if not isinstance(address, ADDRESS_TYPES):
+        return None
+    checksum = _cache.get(address, _MISSING)
+    if checksum is _MISSING:
+        checksum = _checksum_or_none(address)
+        _cache.put(address, checksum)
+    return checksum
+
+
+def to_checksum_address(address):
+    """Как eth_utils.to_checksum_address, но с кэшем: повторные адреса не хэшируются заново."""
+    checksum = checksum_or_none(address)
+    if checksum is None:
+        raise ValueError(f"Некорректный адрес: {address}")
+    return checksum
+
+
+def is_address(address):
+    return checksum_or_none(address) is not None
+
+
+def validate_addresses(addresses, workers=None, parallel_threshold=50_000, chunk_size=10_000):
+    """
+    Проверка и checksum списка адресов. Возвращает список той же длины: checksum адрес или None.
+    Повторы и адреса из кэша не считаются заново; если новых адресов больше parallel_threshold
+    и доступно несколько ядер, хэши считаются в пуле процессов.
+    """
+    addresses = list(addresses)
+    results = {}
+    misses = []
+    for address in dict.fromkeys(address for address in addresses if isinstance(address, ADDRESS_TYPES)):
+        checksum = _cache.get(address, _MISSING)
+        if checksum is _MISSING:
+            misses.append(address)
+        else:
+            results[address] = checksum
+
+    workers = workers or os.cpu_count() or 1
+    if len(misses) > parallel_threshold and workers > 1:
+        chunks = [misses[start:start + chunk_size] for start in range(0, len(misses), chunk_size)]
+        with ProcessPoolExecutor(workers) as executor:
+            checksums = [checksum for chunk in executor.map(_checksum_chunk, chunks) for checksum in chunk]
+    else:
+        checksums = _checksum_chunk(misses)
+    for address, checksum in zip(misses, checksums):
+        _cache.put(address, checksum)
+        results[address] = checksum
+    return [results[address] if isinstance(address, ADDRESS_TYPES) else None for address in addresses]
@@ -0,0 +1,212 @@
+import asyncio
+import csv
+from logger import logger
+from journal import TxJournal, STATE_SIGNED, STATE_BROADCAST, STATE_INCLUDED, STATE_DROPPED
+from address_validator import validate_addresses
+from utils import is_value_valid
+from exceptions import BatchValidationError, BatchInsufficientFundsError
+
+
+def read_payouts(filename):
+    """
+    Читает CSV со строками recipient,amount. Заголовок необязателен.
+    Ключ выплаты - получатель, сумма и номер повтора такой же пары в файле,
+    поэтому вставка других строк в файл не меняет ключи уже отправленных выплат.
+    """
+    payouts = []
+    occurrences = {}
+    with open(filename, "r", newline="", encoding="utf-8") as file:
+        for line_number, row in enumerate(csv.reader(file), start=1):
+            if not row or not row[0].strip() or row[0].strip().lower() == "recipient":
+                continue
+            recipient = row[0].strip()
+            amount = row[1].strip() if len(row) > 1 else ""
+            pair = (recipient.lower(), amount)
+            occurrences[pair] = occurrences.get(pair, 0) + 1
+            payouts.append({
+                "key": f"{recipient.lower()}:{amount}:{occurrences[pair]}",
+                "line": line_number,
+                "recipient": recipient,
+                "amount": amount,
+            })
+    return payouts
+
+
+class BatchSender:
+    """
+    Пакетная отправка нативного токена с одного кошелька многим получателям.
+    Все строки проверяются заранее, транзакции подписываются пачкой с локальными nonce,
+    отправляются с ограниченной параллельностью, а состояние каждой выплаты ведётся в журнале.
+    Повторный запуск с тем же журналом продолжает работу и не отправляет выплату дважды.
+    """
+
+    def __init__(self, client, journal_filename, max_concurrency=10, receipt_timeout=300):
+        self.client = client
+        self.journal = TxJournal(journal_filename)
+        self.max_concurrency = max_concurrency
+        self.receipt_timeout = receipt_timeout
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def validate(self, payouts):
+        errors = []
+        checksums = validate_addresses(payout["recipient"] for payout in payouts)
+        for payout, checksum in zip(payouts, checksums):
+            if checksum is None:
+                errors.append(f"строка {payout['line']}: некорректный адрес {payout['recipient']}")
+            elif not is_value_valid(payout["amount"]):
+                errors.append(f"строка {payout['line']}: некорректная сумма {payout['amount']}")
+            else:
+                payout["recipient"] = checksum
+        if errors:
+            raise BatchValidationError("; ".join(errors))
+        return payouts
+
+    async def _estimate_gas(self, transaction):
+        async with self._semaphore:
+            return await self.client.estimate_gas(transaction)
+
+    async def _check_balance(self, transactions):
+        balance = await self.client.w3.eth.get_balance(self.client.address)
+        total = sum(
+            transaction["value"]
+            + transaction["gas"] * transaction.get("maxFeePerGas", transaction.get("gasPrice", 0))
+            for transaction in transactions
+        )
+        if total > balance:
+            raise BatchInsufficientFundsError(
+                f"Нужно {self.client.w3.from_wei(total, 'ether')} eth, "
+                f"на балансе {self.client.w3.from_wei(balance, 'ether')} eth"
+            )
+
+    async def _broadcast(self, record):
+        async with self._semaphore:
+            try:
+                await self.client.w3.eth.send_raw_transaction(record["raw_tx"])
+            except Exception as e:
+                if "already known" not in str(e) and "nonce too low" not in str(e):
+                    # состояние остаётся signed: при повторном запуске транзакция будет проверена в сети
+                    logger.error(f"❌ Выплата {record['key']} не отправлена: {e}")
+                    return False
+        self.client.nonce_manager.mark_sent(record["nonce"])
+        self.journal.record(record["key"], STATE_BROADCAST)
+        return True
+
+    async def _wait_receipt(self, record):
+        """Статус квитанции: 1 - выплата прошла, 0 - транзакция откатилась, None - подтверждения нет."""
+        try:
+            tracker = await self.client.get_receipt_tracker()
+            receipt = await tracker.wait(record["tx_hash"], self.receipt_timeout)
+        except Exception as e:
+            logger.warning(f"⚠️ Нет подтверждения выплаты {record['key']}: {e}")
+            return None
+        self.journal.record(
+            record["key"], STATE_INCLUDED, block=receipt["blockNumber"], status=receipt["status"]
+        )
+        return receipt["status"]
+
+    async def _send_and_wait(self, record):
+        if not await self._broadcast(record):
+            return None
+        return await self._wait_receipt(record)
+
+    async def _resume(self, records):
+        """
+        Разбор незавершённых выплат из журнала: сверка с сетью пачками квитанций.
+        Возвращает (к переотправке, ключи выплат к отправке заново, статусы уже завершённых в сети).
+        """
+        if not records:
+            return [], [], []
+        in_flight = {record["key"] for record in await self.journal.reconcile(self.client.w3, self.client.address)}
+        to_rebroadcast, to_resend, resolved = [], [], []
+        for record in records:
+            current = self.journal.get(record["key"])
+            if current["key"] in in_flight:
+                to_rebroadcast.append(current)
+            elif current["state"] == STATE_DROPPED:
+                to_resend.append(current["key"])
+            else:
+                resolved.append(current["status"])
+        if to_rebroadcast:
+            await self.client.nonce_manager.skip_to(
+                max(record["nonce"] for record in to_rebroadcast) + 1
+            )
+        return to_rebroadcast, to_resend, resolved
+
+    async def _sign_new(self, payouts):
+        """
+        Подготовка и подпись новых выплат. Записи отдаются по мере подписи,
+        чтобы отправка первых транзакций шла параллельно с подписью остальных.
+        """
+        chain_id, fees = await asyncio.gather(self.client.get_chain_id(), self.client.get_fees())
+        # код всех получателей одним batch eth_getCode: оценкам газа не нужен запрос на каждый адрес
+        estimator = await self.client.get_gas_estimator()
+        await estimator.prime_code_cache(payout["recipient"] for payout in payouts)
+        transactions = [
+            self.client.build_tx(payout["recipient"], payout["amount"], None, chain_id, fees)
+            for payout in payouts
+        ]
+        gas_limits = await asyncio.gather(
+            *(self._estimate_gas(transaction) for transaction in transactions)
+        )
+        for transaction, gas in zip(transactions, gas_limits):
+            transaction["gas"] = gas
+        await self._check_balance(transactions)
+
+        for transaction in transactions:
+            transaction["nonce"] = await self.client.nonce_manager.reserve()
+
+        signed_count = 0
+        async for signed in self.client.iter_signed_txs(transactions):
+            payout, transaction = payouts[signed_count], transactions[signed_count]
+            signed_count += 1
+            record = {
+                "key": payout["key"],
+                "recipient": payout["recipient"],
+                "amount": payout["amount"],
+                "nonce": transaction["nonce"],
+                "tx_hash": self.client.w3.to_hex(signed.hash),
+                "raw_tx": self.client.w3.to_hex(signed.rawTransaction),
+            }
+            # сначала журнал, потом сеть: подписанная транзакция не потеряется при сбое
+            self.journal.record(state=STATE_SIGNED, address=self.client.address, **record)
+            yield record
+        logger.info(f"ℹ️ Подписано {signed_count} транзакций.")
+
+    async def run(self, payouts):
+        payouts = self.validate(payouts)
+        journal_records = self.journal.load()
+
+        unfinished, new_payouts, finished = [], [], 0
+        for payout in payouts:
+            record = journal_records.get(payout["key"])
+            if record is None or record["state"] == STATE_DROPPED:
+                new_payouts.append(payout)
+            elif record["state"] in (STATE_SIGNED, STATE_BROADCAST):
+                unfinished.append(record)
+            else:
+                finished += 1
+        if finished:
+            logger.info(f"ℹ️ {finished} выплат уже завершены по журналу, пропускаем.")
+
+        try:
+            to_rebroadcast, to_resend, resolved = await self._resume(unfinished)
+            payouts_by_key = {payout["key"]: payout for payout in payouts}
+            new_payouts += [payouts_by_key[key] for key in to_resend]
+            tasks = [asyncio.create_task(self._send_and_wait(record)) for record in to_rebroadcast]
+            try:
+                if new_payouts:
+                    async for record in self._sign_new(new_payouts):
+                        tasks.append(asyncio.create_task(self._send_and_wait(record)))
+            finally:
+                # уже подписанные выплаты дожидаемся и при ошибке подписи остальных
+                statuses = resolved + list(await asyncio.gather(*tasks))
+        finally:
+            self.journal.close()
+
+        summary = {
+            "confirmed": statuses.count(1),
+            "failed": statuses.count(0),
+            "unfinished": statuses.count(None),
+            "skipped": finished,
+        }
+        return summary
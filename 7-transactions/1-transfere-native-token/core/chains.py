@@ -0,0 +1,166 @@
+import asyncio
+import time
+from logger import logger
+from w3_client import W3Client, create_rpc_session
+from wallet_state import get_wallet_state_cache
+
+
+class Chain:
+    """Описание сети: RPC (один url или несколько для пула), обозреватель, символ нативной монеты."""
+
+    def __init__(self, name, chain_id, rpc_urls, explorer_url, symbol="ETH", eip_1559=True):
+        self.name = name
+        self.chain_id = chain_id
+        self.rpc_urls = list(rpc_urls) if isinstance(rpc_urls, (list, tuple)) else [rpc_urls]
+        self.explorer_url = explorer_url
+        self.symbol = symbol
+        self.eip_1559 = eip_1559
+
+    def __repr__(self):
+        return f"Chain({self.name}, chain_id={self.chain_id})"
+
+
+CHAINS = {
+    chain.name: chain
+    for chain in (
+        Chain("ethereum", 1, ["https://eth.llamarpc.com", "https://1rpc.io/eth", "https://rpc.ankr.com/eth"],
+              "https://etherscan.io"),
+        Chain("arbitrum", 42161, ["https://arbitrum.llamarpc.com", "https://1rpc.io/arb"], "https://arbiscan.io"),
+        Chain("optimism", 10, ["https://optimism.llamarpc.com", "https://1rpc.io/op"],
+              "https://optimistic.etherscan.io"),
+        Chain("base", 8453, ["https://base.llamarpc.com", "https://1rpc.io/base"], "https://basescan.org"),
+        Chain("linea", 59144, ["https://1rpc.io/linea", "https://rpc.linea.build"], "https://lineascan.build"),
+        Chain("polygon", 137, ["https://polygon.llamarpc.com", "https://1rpc.io/matic"], "https://polygonscan.com",
+              symbol="POL"),
+        Chain("bsc", 56, ["https://binance.llamarpc.com", "https://1rpc.io/bnb"], "https://bscscan.com",
+              symbol="BNB", eip_1559=False),
+        Chain("avalanche", 43114, ["https://1rpc.io/avax/c", "https://api.avax.network/ext/bc/C/rpc"],
+              "https://snowtrace.io", symbol="AVAX"),
+        Chain("zksync", 324, ["https://mainnet.era.zksync.io", "https://1rpc.io/zksync2-era"],
+              "https://explorer.zksync.io"),
+        Chain("scroll", 534352, ["https://rpc.scroll.io", "https://1rpc.io/scroll"], "https://scrollscan.com"),
+    )
+}
+
+
+def get_chain(name):
+    try:
+        return CHAINS[name]
+    except KeyError:
+        raise KeyError(f"Неизвестная сеть {name}. Доступные сети: {', '.join(CHAINS)}") from None
+
+
+class ChainClientManager:
+    """
+    Прогретый W3Client на каждую сеть: одна общая HTTP сессия (пул keep-alive соединений),
+    chain_id и FeeOracle запрашиваются один раз при подключении и дальше берутся из кэша.
+    run выполняет одну операцию во всех сетях параллельно, поэтому проход по 10 сетям
+    длится примерно как самая медленная из них, а не сумма всех.
+    """
+
+    def __init__(self, chains=None, proxy=None, session=None, timeout=15):
+        chains = chains or list(CHAINS)
+        self.chains = [chain if isinstance(chain, Chain) else get_chain(chain) for chain in chains]
+        self.proxy = proxy
+        self.timeout = timeout
+        self._session = session
+        self._owns_session = False
+        self.clients = {}
+
+    async def _connect(self, chain):
+        # несколько url - PooledAsyncHTTPProvider с переключением между RPC одной сети
+        base_url = chain.rpc_urls if len(chain.rpc_urls) > 1 else chain.rpc_urls[0]
+        client = W3Client(base_url, chain.explorer_url, self.proxy, chain.name, chain.eip_1559, session=self._session)
+        try:
+            await asyncio.wait_for(client.open_connection(), self.timeout)
+            chain_id = await asyncio.wait_for(client.get_chain_id(), self.timeout)
+            if chain_id != chain.chain_id:
+                raise ValueError(f"RPC сети {chain.name} вернул chain_id {chain_id}, ожидался {chain.chain_id}")
+            # первый запрос комиссий прогревает общий FeeOracle сети
+            await asyncio.wait_for(client.get_fees(), self.timeout)
+        except BaseException:
+            # любая ошибка после создания клиента (таймаут, сбой RPC, отмена) - клиент закрывается
+            await client.__aexit__(None, None, None)
+            raise
+        return client
+
+    async def start(self):
+        """Подключиться ко всем сетям параллельно. Сети, к которым подключиться не удалось, пропускаются."""
+        if self._session is None:
+            self._session = create_rpc_session()
+            self._owns_session = True
+        results = await asyncio.gather(*(self._connect(chain) for chain in self.chains), return_exceptions=True)
+        for chain, result in zip(self.chains, results):
+            if isinstance(result, Exception):
+                logger.warning(f"⚠️ Сеть {chain.name} недоступна и будет пропущена: {result!r}")
+            else:
+                self.clients[chain.name] = result
+        logger.info(f"ℹ️ Подключено сетей: {len(self.clients)} из {len(self.chains)}.")
+        return self
+
+    async def close(self):
+        await asyncio.gather(
+            *(client.__aexit__(None, None, None) for client in self.clients.values()), return_exceptions=True
+        )
+        self.clients = {}
+        if self._session is not None and self._owns_session:
+            await self._session.close()
+        self._session = None
+        self._owns_session = False
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def get(self, name):
+        try:
+            return self.clients[name]
+        except KeyError:
+            raise KeyError(f"Нет подключения к сети {name}") from None
+
+    async def run(self, operation, chains=None, timeout=None):
+        """
+        Выполнить operation(client, chain) во всех подключённых сетях (или в chains) параллельно.
+        Возвращает {имя сети: результат}; ошибка или таймаут сети - исключение вместо результата,
+        остальные сети при этом не прерываются.
+        """
+        timeout = timeout or self.timeout
+        names = [name for name in (chains or self.clients) if name in self.clients]
+        chains_by_name = {chain.name: chain for chain in self.chains}
+
+        async def run_one(name):
+            started = time.perf_counter()
+            try:
+                return await asyncio.wait_for(operation(self.clients[name], chains_by_name[name]), timeout)
+            finally:
+                logger.debug(f"Сеть {name}: {time.perf_counter() - started:.2f} сек")
+
+        results = await asyncio.gather(*(run_one(name) for name in names), return_exceptions=True)
+        return dict(zip(names, results))
+
+    async def get_balances(self, addresses, chains=None):
+        """Нативные балансы адресов во всех сетях: {имя сети: {адрес: баланс в wei}} или исключение."""
+
+        async def balances(client, chain):
+            # кэш напрямую, без w3_error_handler клиента: ошибка одной сети не должна завершать программу
+            states = await get_wallet_state_cache(chain.chain_id).get_many(client.w3, addresses)
+            return {address: state.balance for address, state in states.items()}
+
+        return await self.run(balances, chains)
+
+    async def get_block_info(self, chains=None):
+        """Последний блок каждой сети: номер, время, число транзакций и base fee (если есть)."""
+
+        async def block_info(client, chain):
+            block = await client.w3.eth.get_block("latest")
+            return {
+                "number": block["number"],
+                "timestamp": block["timestamp"],
+                "transactions": len(block["transactions"]),
+                "base_fee": block.get("baseFeePerGas"),
+                "next_base_fee": (await client.get_fee_oracle()).next_base_fee,
+            }
+
+        return await self.run(block_info, chains)
@@ -1,5 +1,8 @@
 import time
+import random
 import asyncio
+import functools
+import aiohttp
 from logger import logger
 from exceptions import (
     W3UnknownError,
@@ -19,46 +22,208 @@ from exceptions import (
     W3TransactionTimeoutError,
 )
 
-def retry(max_retries=3, retry_delay=1):
+
+# Сетевые ошибки, после которых запрос имеет смысл повторить
+RETRYABLE_EXCEPTIONS = (ConnectionError, TimeoutError, asyncio.TimeoutError, aiohttp.ClientConnectionError)
+RETRYABLE_HTTP_STATUSES = {429, 500, 502, 503, 504}
+# Фрагменты текста ошибок RPC, которые означают временную проблему узла, а не ошибку в запросе
+RETRYABLE_RPC_MESSAGES = ("rate limit", "too many requests", "-32005", "header not found", "timeout")
+
+
+def is_retryable_error(error):
+    """Классификация по умолчанию: сетевые ошибки, перегрузка узла и лимиты запросов."""
+    if isinstance(error, RETRYABLE_EXCEPTIONS):
+        return True
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_HTTP_STATUSES
+    if isinstance(error, ValueError):
+        message = str(error).lower()
+        return any(fragment in message for fragment in RETRYABLE_RPC_MESSAGES)
+    return False
+
+
+def is_retryable_send_error(error):
     """
-    Декоратор для повторных запросов к RPC с обработкой исключений и задержкой между попытками.
+    Для отправки транзакции повторяем только сетевые ошибки: ошибка узла вида
+    "nonce too low" или "insufficient funds" не исправится повтором.
+    """
+    if isinstance(error, aiohttp.ClientResponseError):
+        return error.status in RETRYABLE_HTTP_STATUSES
+    return isinstance(error, RETRYABLE_EXCEPTIONS)
+
+
+# Классификация ошибок по методам: имя функции или RPC метода -> функция(ошибка) -> повторять ли
+RETRY_CLASSIFIERS = {
+    "sign_and_send_tx": is_retryable_send_error,
+    "eth_sendRawTransaction": is_retryable_send_error,
+}
+
+
+class RetryBudget:
     """
+    Общий бюджет повторов на всё приложение (token bucket): каждый повтор тратит токен,
+    каждый успешный вызов возвращает ratio токена. Когда узел лежит, повторы быстро
+    заканчиваются и не превращаются в лавину запросов.
+    """
+
+    def __init__(self, ratio=0.1, max_tokens=20):
+        self.ratio = ratio
+        self.max_tokens = max_tokens
+        self.tokens = max_tokens
+
+    def try_spend(self):
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True
+        return False
+
+    def record_success(self):
+        self.tokens = min(self.max_tokens, self.tokens + self.ratio)
+
+
+class RetryMetrics:
+    """Счётчики попыток и задержек по методам."""
+
+    def __init__(self):
+        self._metrics = {}
+
+    def _get(self, name):
+        if name not in self._metrics:
+            self._metrics[name] = {
+                "calls": 0, "attempts": 0, "retries": 0, "successes": 0, "failures": 0,
+                "budget_exhausted": 0, "total_latency": 0.0, "max_latency": 0.0,
+            }
+        return self._metrics[name]
+
+    def record_attempt(self, name):
+        self._get(name)["attempts"] += 1
+
+    def record_retry(self, name):
+        self._get(name)["retries"] += 1
+
+    def record_budget_exhausted(self, name):
+        self._get(name)["budget_exhausted"] += 1
+
+    def record_result(self, name, success, latency):
+        metrics = self._get(name)
+        metrics["calls"] += 1
+        metrics["successes" if success else "failures"] += 1
+        metrics["total_latency"] += latency
+        metrics["max_latency"] = max(metrics["max_latency"], latency)
+
+    def snapshot(self):
+        return {name: dict(metrics) for name, metrics in self._metrics.items()}
+
+    def reset(self):
+        self._metrics.clear()
+
+
+retry_budget = RetryBudget()
+retry_metrics = RetryMetrics()
+
+
+def get_retry_metrics():
+    return retry_metrics.snapshot()
+
+
+def backoff_delay(attempt, retry_delay, max_delay):
+    """Экспоненциальная задержка с полным джиттером: случайно от 0 до retry_delay * 2^attempt."""
+    return random.uniform(0, min(max_delay, retry_delay * 2 ** attempt))
+
+
+def retry(max_retries=3, retry_delay=1, max_delay=30, deadline=None, method=None, classifier=None,
+          budget=None, attempt_timeout=None):
+    """
+    Декоратор для повторных запросов к RPC с экспоненциальной задержкой и джиттером.
+    deadline - общее время на вызов со всеми повторами, в секундах.
+    У асинхронной функции каждая попытка ограничена остатком deadline и attempt_timeout:
+    зависшая попытка прерывается и считается повторяемой ошибкой (timeout).
+    Ошибка повторяется, если её одобряет classifier, либо классификатор метода из RETRY_CLASSIFIERS,
+    либо is_retryable_error. Повторы расходуют общий RetryBudget.
+    """
+    budget = budget or retry_budget
+
     def decorator(func):
+        name = method or func.__name__
+        is_retryable = classifier or RETRY_CLASSIFIERS.get(name, is_retryable_error)
+
+        def next_delay(error, attempt, start_time):
+            """Задержка перед следующей попыткой или None, если повторять нельзя."""
+            if attempt >= max_retries:
+                return None
+            # timeout попытки повторяем при любом классификаторе
+            if not (is_retryable(error) or isinstance(error, asyncio.TimeoutError)):
+                return None
+            delay = backoff_delay(attempt, retry_delay, max_delay)
+            if deadline is not None:
+                remaining = deadline - (time.monotonic() - start_time)
+                if remaining <= 0:
+                    return None
+                delay = min(delay, remaining)
+            if not budget.try_spend():
+                retry_metrics.record_budget_exhausted(name)
+                logger.error(f"⚠️ Бюджет повторных попыток исчерпан, {name} не повторяем.")
+                return None
+            retry_metrics.record_retry(name)
+            logger.error(f"⚠️ Ошибка соединения: {error}"
+                         f"\n⚠️ Повторная попытка через {delay:.2f} секунд"
+                         f"\n⚠️ Попытка {attempt} из {max_retries}")
+            return delay
+
         if asyncio.iscoroutinefunction(func):  # Проверяем, является ли функция асинхронной
+            @functools.wraps(func)
             async def wrapper(*args, **kwargs):
-                retries = 0
-                while retries < max_retries:
+                start_time = time.monotonic()
+                attempt = 0
+                while True:
+                    attempt += 1
+                    retry_metrics.record_attempt(name)
                     try:
-                        return await func(*args, **kwargs)
-                    except (ConnectionError, TimeoutError) as e:
-                        retries += 1
-                        logger.error(f"⚠️ Ошибка соединения: {e}"
-                                     f"\n⚠️ Повторная попытка через {retry_delay} секунд"
-                                     f"\n⚠️ Попытка {retries} из {max_retries}")
-                        if retries < max_retries:
-                            await asyncio.sleep(retry_delay)
-                            continue
-                        raise e  # Если попытки исчерпаны, пробрасываем исключение
+                        timeout = attempt_timeout
+                        if deadline is not None:
+                            remaining = max(deadline - (time.monotonic() - start_time), 0)
+                            timeout = remaining if timeout is None else min(timeout, remaining)
+                        if timeout is None:
+                            result = await func(*args, **kwargs)
+                        else:
+                            result = await asyncio.wait_for(func(*args, **kwargs), timeout)
                     except Exception as e:
-                        raise e  # Пробрасываем остальные исключения
+                        delay = next_delay(e, attempt, start_time)
+                        if delay is None:
+                            retry_metrics.record_result(name, False, time.monotonic() - start_time)
+                            raise e  # Если попытки исчерпаны, пробрасываем исключение
+                        await asyncio.sleep(delay)
+                        continue
+                    budget.record_success()
+                    retry_metrics.record_result(name, True, time.monotonic() - start_time)
+                    return result
             return wrapper
         else:
+            @functools.wraps(func)
             def wrapper(*args, **kwargs):  # Для синхронных функций
-                retries = 0
-                while retries < max_retries:
+                try:
+                    asyncio.get_running_loop()
+                    # внутри event loop time.sleep остановит всю сеть - делаем одну попытку без ожидания
+                    in_event_loop = True
+                except RuntimeError:
+                    in_event_loop = False
+                start_time = time.monotonic()
+                attempt = 0
+                while True:
+                    attempt += 1
+                    retry_metrics.record_attempt(name)
                     try:
-                        return func(*args, **kwargs)
-                    except (ConnectionError, TimeoutError) as e:
-                        retries += 1
-                        logger.error(f"⚠️ Ошибка соединения: {e}"
-                                     f"\n⚠️ Повторная попытка через {retry_delay} секунд"
-                                     f"\n⚠️ Попытка {retries} из {max_retries}")
-                        if retries < max_retries:
-                            time.sleep(retry_delay)
-                            continue
-                        raise e  # Если попытки исчерпаны, пробрасываем исключение
+                        result = func(*args, **kwargs)
                     except Exception as e:
-                        raise e  # Пробрасываем остальные исключения
+                        delay = None if in_event_loop else next_delay(e, attempt, start_time)
+                        if delay is None:
+                            retry_metrics.record_result(name, False, time.monotonic() - start_time)
+                            raise e
+                        time.sleep(delay)
+                        continue
+                    budget.record_success()
+                    retry_metrics.record_result(name, True, time.monotonic() - start_time)
+                    return result
             return wrapper
     return decorator
 
@@ -60,4 +60,16 @@ class W3TransactionReceiptError(Exception):
 
 class W3TransactionTimeoutError(Exception):
     """Ошибка: превышено время ожидания подтверждения транзакции."""
-    pass
\ No newline at end of file
+    pass
+
+class BatchValidationError(Exception):
+    """Ошибка: в файле выплат есть некорректные строки."""
+    pass
+
+class BatchInsufficientFundsError(Exception):
+    """Ошибка: баланса отправителя не хватает на все выплаты и газ."""
+    pass
+
+class JournalStateError(Exception):
+    """Ошибка: недопустимый переход состояния транзакции в журнале."""
+    pass
@@ -0,0 +1,128 @@
+import asyncio
+import time
+import weakref
+from statistics import median
+from exceptions import W3EmptyFeeHistoryError, W3PriorityFeeError
+
+# Перцентили приоритетной комиссии из eth_feeHistory и на сколько блоков вперёд закладываем рост base fee.
+# За один полный блок base fee может вырасти максимум на 12.5%.
+FEE_PRESETS = {
+    "slow": {"percentile": 10, "blocks_ahead": 1},
+    "normal": {"percentile": 50, "blocks_ahead": 3},
+    "fast": {"percentile": 90, "blocks_ahead": 6},
+}
+REWARD_PERCENTILES = sorted({preset["percentile"] for preset in FEE_PRESETS.values()})
+MAX_BASE_FEE_CHANGE = 1.125
+# legacy сети (BSC и др.): eth_gasPrice с запасом, normal - прежние eth_gasPrice * 1.25
+LEGACY_GAS_PRICE_MULTIPLIERS = {"slow": 1.1, "normal": 1.25, "fast": 1.5}
+
+
+class FeeOracle:
+    """
+    Комиссии по eth_feeHistory: один запрос на блок (кэш на block_time секунд) для всех клиентов.
+    Для каждого пресета: приоритетная комиссия - медиана по блокам нужного перцентиля,
+    maxFeePerGas - прогноз base fee следующего блока с запасом на рост + приоритетная комиссия.
+    gasPrice для legacy транзакций - по eth_gasPrice, тоже один запрос на блок.
+    """
+
+    def __init__(self, w3, block_count=20, block_time=2.0, min_priority_fee=0, fallback=True):
+        self.w3 = w3
+        # без истории комиссий (узел её не отдаёт) считаем по eth_gasPrice и eth_maxPriorityFeePerGas
+        self.fallback = fallback
+        self.block_count = block_count
+        self.block_time = block_time
+        self.min_priority_fee = min_priority_fee
+        self._lock = asyncio.Lock()
+        self._fetched_at = 0
+        self._next_base_fee = None
+        self._priority_fees = None
+        self._gas_price = None
+        self._gas_price_fetched_at = 0
+
+    async def _refresh_from_gas_price(self):
+        gas_price, max_priority_fee = await asyncio.gather(
+            self.w3.eth.gas_price, self.w3.eth.max_priority_fee
+        )
+        priority_fee = max(max_priority_fee, self.min_priority_fee)
+        self._next_base_fee = max(gas_price - priority_fee, 0)
+        self._priority_fees = {percentile: priority_fee for percentile in REWARD_PERCENTILES}
+        self._fetched_at = time.monotonic()
+
+    async def _refresh(self):
+        try:
+            await self._refresh_from_fee_history()
+        except W3EmptyFeeHistoryError:
+            if not self.fallback:
+                raise
+            await self._refresh_from_gas_price()
+
+    async def _refresh_from_fee_history(self):
+        fee_history = await self.w3.eth.fee_history(self.block_count, 'latest', REWARD_PERCENTILES)
+        base_fees = fee_history.get('baseFeePerGas') if fee_history else None
+        if not base_fees:
+            raise W3EmptyFeeHistoryError("eth_feeHistory вернул пустую историю base fee.")
+        # сети без EIP-1559 (BSC) отдают историю из нулевых base fee
+        if not any(base_fees):
+            raise W3EmptyFeeHistoryError("base fee в eth_feeHistory нулевой: сеть без EIP-1559.")
+
+        rewards = fee_history.get('reward') or []
+        try:
+            priority_fees = {}
+            for index, percentile in enumerate(REWARD_PERCENTILES):
+                values = [block_rewards[index] for block_rewards in rewards if block_rewards]
+                priority_fees[percentile] = max(int(median(values)) if values else 0, self.min_priority_fee)
+        except (IndexError, TypeError) as e:
+            raise W3PriorityFeeError(f"Некорректные данные reward в eth_feeHistory: {e}") from e
+
+        # последний элемент baseFeePerGas - base fee следующего, ещё не созданного блока
+        self._next_base_fee = base_fees[-1]
+        self._priority_fees = priority_fees
+        self._fetched_at = time.monotonic()
+
+    async def _ensure_fresh(self):
+        if time.monotonic() - self._fetched_at < self.block_time:
+            return
+        async with self._lock:
+            # пока ждали блокировку, данные мог обновить другой клиент
+            if time.monotonic() - self._fetched_at >= self.block_time:
+                await self._refresh()
+
+    async def get_fees(self, preset="normal"):
+        """Поля комиссий EIP-1559 для пресета slow/normal/fast."""
+        preset_config = FEE_PRESETS[preset]
+        await self._ensure_fresh()
+        priority_fee = self._priority_fees[preset_config["percentile"]]
+        projected_base_fee = int(self._next_base_fee * MAX_BASE_FEE_CHANGE ** preset_config["blocks_ahead"])
+        return {
+            'maxPriorityFeePerGas': priority_fee,
+            'maxFeePerGas': projected_base_fee + priority_fee,
+            'type': '0x2',
+        }
+
+    async def get_gas_price(self, preset="normal"):
+        """gasPrice для legacy транзакций: eth_gasPrice с запасом пресета."""
+        if time.monotonic() - self._gas_price_fetched_at >= self.block_time:
+            async with self._lock:
+                if time.monotonic() - self._gas_price_fetched_at >= self.block_time:
+                    self._gas_price = await self.w3.eth.gas_price
+                    self._gas_price_fetched_at = time.monotonic()
+        return int(self._gas_price * LEGACY_GAS_PRICE_MULTIPLIERS[preset])
+
+    @property
+    def next_base_fee(self):
+        return self._next_base_fee
+
+
+# цикл событий -> {chain_id: FeeOracle}: блокировка оракула привязана к циклу, в котором используется
+_oracles = weakref.WeakKeyDictionary()
+
+
+def get_fee_oracle(w3, chain_id):
+    """Общий FeeOracle сети: клиенты с разными подключениями к одной сети делят один кэш комиссий."""
+    oracles = _oracles.setdefault(asyncio.get_running_loop(), {})
+    oracle = oracles.get(chain_id)
+    if oracle is None:
+        oracle = oracles[chain_id] = FeeOracle(w3)
+    else:
+        oracle.w3 = w3
+    return oracle
@@ -0,0 +1,131 @@
+import asyncio
+import time
+import weakref
+from collections import OrderedDict
+from rpc_batch import rpc_batch
+
+# L2, где газ транзакции включает плату за данные в L1 и меняется вместе с ценой газа L1 (Arbitrum и др.):
+# оценка устаревает быстрее, поэтому для них прежний запас 1.5
+L2_CHAIN_IDS = {42161, 10, 8453, 59144, 324, 534352}
+L2_MARGIN = 1.5
+
+
+class GasEstimator:
+    """
+    Кэш оценок газа по "форме" транзакции: (тип отправителя, получатель, селектор calldata, chain_id).
+    Все переводы нативного токена на обычные кошельки (EOA) имеют одну форму, поэтому
+    повторные переводы не требуют eth_estimateGas. Для контрактов ключом служит адрес контракта.
+    Запас (margin) применяется к сырой оценке при выдаче, кэш живёт ttl секунд - около одного блока L1.
+    Признак "есть код" хранится для последних code_cache_size адресов (LRU).
+    """
+
+    def __init__(self, w3, margin=1.2, ttl=12, code_cache_size=10_000):
+        self.w3 = w3
+        self.margin = margin
+        self.ttl = ttl
+        self.code_cache_size = code_cache_size
+        self._estimates = {}
+        self._in_flight = {}
+        self._code_cache = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def _remember_code(self, address, code):
+        # eth-tester и middleware отдают bytes, batch запрос к HTTP узлу - hex строку
+        self._code_cache[address] = len(code) > 2 if isinstance(code, str) else len(code) > 0
+        self._code_cache.move_to_end(address)
+        if len(self._code_cache) > self.code_cache_size:
+            self._code_cache.popitem(last=False)
+
+    async def _is_contract(self, address):
+        if address not in self._code_cache:
+            self._remember_code(address, await self.w3.eth.get_code(address))
+        self._code_cache.move_to_end(address)
+        return self._code_cache[address]
+
+    async def prime_code_cache(self, addresses):
+        """
+        Код многих получателей одним batch запросом eth_getCode вместо запроса на каждый адрес
+        при первой оценке. Удобно перед пакетной отправкой.
+        """
+        addresses = [address for address in dict.fromkeys(addresses) if address not in self._code_cache]
+        if not addresses:
+            return
+        codes = await rpc_batch(self.w3, "eth_getCode", [[address, "latest"] for address in addresses])
+        for address, code in zip(addresses, codes):
+            self._remember_code(address, code)
+
+    async def shape_key(self, transaction):
+        recipient = transaction.get('to')
+        data = transaction.get('data') or '0x'
+        if isinstance(data, bytes):
+            data = self.w3.to_hex(data)
+        selector = data[:10] if len(data) >= 10 else None
+        if recipient is None:
+            to_kind = 'create'
+        elif await self._is_contract(recipient):
+            to_kind = recipient
+        else:
+            to_kind = 'eoa'
+        # отправители W3Client - всегда обычные кошельки
+        return 'eoa', to_kind, selector, transaction.get('chainId')
+
+    def _apply_margin(self, raw_gas):
+        return int(raw_gas * self.margin)
+
+    async def _estimate_raw(self, key, estimate_request):
+        try:
+            raw_gas = await self.w3.eth.estimate_gas(estimate_request)
+            self._estimates[key] = (raw_gas, time.monotonic())
+            return raw_gas
+        finally:
+            del self._in_flight[key]
+
+    async def estimate(self, transaction):
+        """Лимит газа с запасом. Повторные транзакции той же формы берутся из кэша без запроса к RPC."""
+        key = await self.shape_key(transaction)
+        cached = self._estimates.get(key)
+        if cached is not None and time.monotonic() - cached[1] < self.ttl:
+            self.hits += 1
+            return self._apply_margin(cached[0])
+
+        # одновременные оценки одной формы ждут один общий запрос
+        future = self._in_flight.get(key)
+        if future is None:
+            self.misses += 1
+            # nonce не влияет на расход газа, а nonce "из будущего" некоторые узлы не оценивают
+            estimate_request = {field: value for field, value in transaction.items() if field != 'nonce'}
+            future = asyncio.ensure_future(self._estimate_raw(key, estimate_request))
+            self._in_flight[key] = future
+        # shield: отмена одного из ожидающих, в том числе первого, не отменяет общий запрос для остальных
+        raw_gas = await asyncio.shield(future)
+        return self._apply_margin(raw_gas)
+
+    def invalidate(self, transaction_key=None, address=None):
+        """Сбросить кэш целиком, одну форму транзакции или всё, что связано с адресом."""
+        if transaction_key is None and address is None:
+            self._estimates.clear()
+            self._code_cache.clear()
+            return
+        if transaction_key is not None:
+            self._estimates.pop(transaction_key, None)
+        if address is not None:
+            self._code_cache.pop(address, None)
+            for key in [key for key in self._estimates if key[1] == address]:
+                del self._estimates[key]
+
+
+# цикл событий -> {chain_id: GasEstimator}: общие запросы оценки привязаны к циклу, в котором созданы
+_estimators = weakref.WeakKeyDictionary()
+
+
+def get_gas_estimator(w3, chain_id):
+    """Общий GasEstimator сети: клиенты с разными подключениями к одной сети делят один кэш оценок."""
+    estimators = _estimators.setdefault(asyncio.get_running_loop(), {})
+    estimator = estimators.get(chain_id)
+    if estimator is None:
+        estimator = GasEstimator(w3, margin=L2_MARGIN) if chain_id in L2_CHAIN_IDS else GasEstimator(w3)
+        estimators[chain_id] = estimator
+    else:
+        estimator.w3 = w3
+    return estimator
@@ -0,0 +1,215 @@
+import json
+import sqlite3
+import time
+from logger import logger
+from rpc_batch import rpc_batch, to_int
+from exceptions import JournalStateError
+
+# Жизненный цикл транзакции
+STATE_PREPARED = "prepared"
+STATE_SIGNED = "signed"
+STATE_BROADCAST = "broadcast"
+STATE_INCLUDED = "included"
+STATE_FINAL = "final"
+# nonce занят другой транзакцией, эта уже не попадёт в сеть - перевод можно подготовить заново
+STATE_DROPPED = "dropped"
+
+PENDING_STATES = (STATE_SIGNED, STATE_BROADCAST, STATE_INCLUDED)
+
+# Разрешённые переходы. signed после broadcast - замена транзакции с тем же nonce,
+# broadcast после included - транзакция выпала из блока при реорганизации.
+TRANSITIONS = {
+    None: {STATE_PREPARED, STATE_SIGNED},
+    STATE_PREPARED: {STATE_PREPARED, STATE_SIGNED, STATE_DROPPED},
+    STATE_SIGNED: {STATE_SIGNED, STATE_BROADCAST, STATE_INCLUDED, STATE_FINAL, STATE_DROPPED},
+    STATE_BROADCAST: {STATE_SIGNED, STATE_BROADCAST, STATE_INCLUDED, STATE_FINAL, STATE_DROPPED},
+    STATE_INCLUDED: {STATE_INCLUDED, STATE_FINAL, STATE_BROADCAST},
+    STATE_FINAL: set(),
+    STATE_DROPPED: {STATE_PREPARED, STATE_SIGNED},
+}
+
+COLUMNS = ("key", "state", "address", "nonce", "tx_hash", "raw_tx", "block", "status", "data", "updated_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS events (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    key TEXT NOT NULL,
+    state TEXT NOT NULL,
+    fields TEXT NOT NULL,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS transactions (
+    key TEXT PRIMARY KEY,
+    state TEXT NOT NULL,
+    address TEXT,
+    nonce INTEGER,
+    tx_hash TEXT,
+    raw_tx TEXT,
+    block INTEGER,
+    status INTEGER,
+    data TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transactions_tx_hash ON transactions (tx_hash);
+CREATE INDEX IF NOT EXISTS transactions_state ON transactions (state);
+"""
+
+
+class TxJournal:
+    """
+    Журнал транзакций в SQLite (WAL): prepared -> signed -> broadcast -> included -> final.
+    Каждый переход дописывается в events и в той же транзакции SQLite обновляет текущее
+    состояние в transactions, поэтому после сбоя журнал восстанавливается целиком.
+    Подписанная транзакция записывается до отправки в сеть: после сбоя переотправляется
+    та же транзакция, а не создаётся новая.
+    synchronous=NORMAL в режиме WAL переживает падение процесса и укладывается в десятки
+    микросекунд на запись; durable=True добавляет fsync на каждую запись (защита от отключения питания).
+    """
+
+    def __init__(self, filename, durable=False):
+        self.filename = filename
+        self._connection = sqlite3.connect(filename, isolation_level=None)
+        self._connection.row_factory = sqlite3.Row
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute(f"PRAGMA synchronous={'FULL' if durable else 'NORMAL'}")
+        self._connection.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    def close(self):
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
+
+    @staticmethod
+    def _to_record(row):
+        record = dict(row)
+        record.update(json.loads(record.pop("data") or "{}"))
+        return record
+
+    def get(self, key):
+        row = self._connection.execute("SELECT * FROM transactions WHERE key = ?", (key,)).fetchone()
+        return self._to_record(row) if row else None
+
+    def find_by_hash(self, tx_hash):
+        row = self._connection.execute(
+            "SELECT * FROM transactions WHERE tx_hash = ?", (tx_hash.lower(),)
+        ).fetchone()
+        return self._to_record(row) if row else None
+
+    def load(self):
+        """Текущее состояние всех записей: {ключ: запись}."""
+        rows = self._connection.execute("SELECT * FROM transactions")
+        return {row["key"]: self._to_record(row) for row in rows}
+
+    def pending(self, address=None):
+        """Записи, судьба которых в сети ещё не известна окончательно, по возрастанию nonce."""
+        query = f"SELECT * FROM transactions WHERE state IN ({', '.join('?' * len(PENDING_STATES))})"
+        params = list(PENDING_STATES)
+        if address is not None:
+            query += " AND address = ?"
+            params.append(address)
+        rows = self._connection.execute(query + " ORDER BY nonce", params)
+        return [self._to_record(row) for row in rows]
+
+    def history(self, key):
+        rows = self._connection.execute(
+            "SELECT state, fields, created_at FROM events WHERE key = ? ORDER BY id", (key,)
+        )
+        return [{"state": row["state"], "created_at": row["created_at"], **json.loads(row["fields"])} for row in rows]
+
+    def tx_hashes(self, key):
+        """Хэши всех версий транзакции key (исходной и замен) в порядке подписи."""
+        hashes = [json.loads(row["fields"]).get("tx_hash") for row in self._connection.execute(
+            "SELECT fields FROM events WHERE key = ? ORDER BY id", (key,)
+        )]
+        return list(dict.fromkeys(tx_hash for tx_hash in hashes if tx_hash))
+
+    def record(self, key, state, **fields):
+        """
+        Переход записи key в состояние state. Поля address, nonce, tx_hash, raw_tx, block, status
+        хранятся в колонках, остальные - в JSON. Недопустимый переход - JournalStateError.
+        """
+        now = time.time()
+        if fields.get("tx_hash"):
+            fields["tx_hash"] = fields["tx_hash"].lower()
+        connection = self._connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            row = connection.execute("SELECT * FROM transactions WHERE key = ?", (key,)).fetchone()
+            current = self._to_record(row) if row else {}
+            previous_state = current.get("state")
+            if state not in TRANSITIONS[previous_state]:
+                raise JournalStateError(f"Недопустимый переход {key}: {previous_state} -> {state}")
+            current.update(fields, key=key, state=state, updated_at=now)
+            data = {name: value for name, value in current.items() if name not in COLUMNS}
+            connection.execute(
+                f"INSERT OR REPLACE INTO transactions ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+                [json.dumps(data) if name == "data" else current.get(name) for name in COLUMNS],
+            )
+            connection.execute(
+                "INSERT INTO events (key, state, fields, created_at) VALUES (?, ?, ?, ?)",
+                (key, state, json.dumps(fields), now),
+            )
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+        return current
+
+    async def reconcile(self, w3, address=None, finality_depth=12, batch_size=100):
+        """
+        Сверка незавершённых записей с сетью после перезапуска: квитанции запрашиваются пачками
+        через JSON-RPC batch. Квитанции проверяются для всех версий транзакции: после замены (replace-by-fee)
+        в блок может попасть и более ранняя версия. Найденные в блоке записи переходят в included
+        (с хэшем попавшей в блок версии), а достаточно глубокие - в final.
+        Записи, ни одной версии которых нет в блоке, с nonce ниже счётчика адреса помечаются dropped.
+        Возвращает записи, которые ещё в пути и требуют переотправки или ожидания.
+        """
+        records = [record for record in self.pending(address) if record.get("tx_hash")]
+        if not records:
+            return []
+        latest_block = await w3.eth.block_number
+        versions = {
+            record["key"]: list(dict.fromkeys(self.tx_hashes(record["key"]) + [record["tx_hash"]]))
+            for record in records
+        }
+        tx_hashes = list(dict.fromkeys(tx_hash for hashes in versions.values() for tx_hash in hashes))
+        # счётчик nonce - до квитанций: транзакция, попавшая в блок между запросами, найдётся по квитанции.
+        # В обратном порядке её квитанции ещё нет, а nonce уже учтён - она была бы помечена dropped
+        addresses = list({record["address"] for record in records if record.get("address")})
+        nonces = dict(zip(addresses, await rpc_batch(
+            w3, "eth_getTransactionCount", [[address, "latest"] for address in addresses], batch_size
+        )))
+        receipts = dict(zip(tx_hashes, await rpc_batch(
+            w3, "eth_getTransactionReceipt", [[tx_hash] for tx_hash in tx_hashes], batch_size
+        )))
+
+        in_flight = []
+        for record in records:
+            mined = [
+                (tx_hash, receipts[tx_hash]) for tx_hash in versions[record["key"]]
+                if receipts[tx_hash] is not None and receipts[tx_hash].get("blockNumber") is not None
+            ]
+            if mined:
+                tx_hash, receipt = mined[0]
+                block = to_int(receipt["blockNumber"])
+                state = STATE_FINAL if latest_block - block >= finality_depth else STATE_INCLUDED
+                self.record(record["key"], state, tx_hash=tx_hash, block=block, status=to_int(receipt["status"]))
+                continue
+            if record["state"] == STATE_INCLUDED:
+                # квитанция пропала - блок откатился, транзакция снова ждёт включения
+                self.record(record["key"], STATE_BROADCAST)
+            if record.get("nonce") is not None and record["nonce"] < to_int(nonces.get(record.get("address"), 0)):
+                self.record(record["key"], STATE_DROPPED)
+            else:
+                in_flight.append(self.get(record["key"]))
+        logger.info(
+            f"ℹ️ Сверка журнала: {len(records) - len(in_flight)} транзакций завершены в сети, "
+            f"{len(in_flight)} ещё в пути."
+        )
+        return in_flight
@@ -0,0 +1,115 @@
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from eth_account import Account
+from logger import logger
+from address_validator import checksum_or_none, to_checksum_address
+
+
+def _decrypt(keyfile_json, password):
+    """Расшифровка в процессе пула: scrypt/PBKDF2 - десятки и сотни миллисекунд процессора на ключ."""
+    return bytes(Account.decrypt(keyfile_json, password))
+
+
+class KeyStore:
+    """
+    Каталог зашифрованных keystore файлов (формат geth / eth_account.Account.encrypt).
+    Индекс адрес -> файл строится по полю address без расшифровки. Ключ расшифровывается
+    при первом обращении, пачка ключей - параллельно в пуле процессов. Расшифрованные ключи
+    хранятся в bytearray и затираются нулями в zeroize/close. Копии, которые успели сделать
+    bytes/str на стороне вызывающего кода, Python затереть не позволяет.
+    """
+
+    def __init__(self, directory, password, workers=None):
+        self.directory = directory
+        self.workers = workers or os.cpu_count() or 1
+        self._password = password
+        self._files = {}
+        self._keys = {}
+        self._in_flight = {}
+        self._executor = None
+
+    def index(self):
+        """Адреса всех keystore файлов каталога. Файлы без поля address пропускаются."""
+        self._files = {}
+        for name in sorted(os.listdir(self.directory)):
+            path = os.path.join(self.directory, name)
+            if not os.path.isfile(path):
+                continue
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    address = checksum_or_none(json.load(file).get("address"))
+            except (OSError, ValueError, AttributeError):
+                address = None
+            if address is None:
+                logger.warning(f"⚠️ {name} не keystore файл или в нём нет адреса, пропускаем.")
+                continue
+            self._files[address] = path
+        logger.info(f"ℹ️ В каталоге {self.directory} найдено {len(self._files)} keystore файлов.")
+        return self.addresses
+
+    @property
+    def addresses(self):
+        return list(self._files)
+
+    def _read(self, address):
+        with open(self._files[address], "r", encoding="utf-8") as file:
+            return json.load(file)
+
+    async def _decrypt_one(self, address):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(self.workers)
+        loop = asyncio.get_running_loop()
+        key = await loop.run_in_executor(self._executor, _decrypt, self._read(address), self._password)
+        self._keys[address] = bytearray(key)
+
+    async def _ensure(self, address):
+        if address in self._keys:
+            return
+        if address not in self._files:
+            raise KeyError(f"Нет keystore файла для адреса {address}")
+        # параллельные запросы одного ключа ждут одну расшифровку
+        if address not in self._in_flight:
+            self._in_flight[address] = asyncio.ensure_future(self._decrypt_one(address))
+        try:
+            await self._in_flight[address]
+        finally:
+            self._in_flight.pop(address, None)
+
+    async def unlock(self, addresses=None):
+        """Расшифровать ключи заранее и параллельно: по умолчанию все ключи каталога."""
+        if not self._files:
+            self.index()
+        addresses = [to_checksum_address(address) for address in (addresses or self.addresses)]
+        await asyncio.gather(*(self._ensure(address) for address in addresses))
+        return addresses
+
+    async def get_private_key(self, address):
+        """Приватный ключ адреса (bytes), расшифровывается при первом обращении."""
+        if not self._files:
+            self.index()
+        address = to_checksum_address(address)
+        await self._ensure(address)
+        return bytes(self._keys[address])
+
+    def zeroize(self, address=None):
+        """Затереть расшифрованные ключи в памяти: один адрес или все."""
+        addresses = [to_checksum_address(address)] if address else list(self._keys)
+        for address in addresses:
+            key = self._keys.pop(address, None)
+            if key is not None:
+                key[:] = bytes(len(key))
+
+    def close(self):
+        self.zeroize()
+        self._password = None
+        if self._executor is not None:
+            self._executor.shutdown(cancel_futures=True)
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
@@ -0,0 +1,126 @@
+import asyncio
+from eth_abi import decode, encode
+from address_validator import to_checksum_address
+
+# Multicall3 развёрнут по одному и тому же адресу практически во всех EVM сетях
+MULTICALL3_ADDRESS = "0xcA11bde05977b3631167028862bE2a173976CA11"
+# Сети, где канонического развёртывания нет: zkSync Era считает адреса CREATE2 по-своему,
+# Multicall3 там собран zksolc и развёрнут отдельно
+MULTICALL3_ADDRESSES = {
+    324: "0xF9cda624FBC7e059355ce98a31693d299FACd963",
+}
+
+AGGREGATE3_SELECTOR = bytes.fromhex("82ad56cb")  # aggregate3((address,bool,bytes)[])
+GET_ETH_BALANCE_SELECTOR = bytes.fromhex("4d2301cc")  # getEthBalance(address)
+BALANCE_OF_SELECTOR = bytes.fromhex("70a08231")  # balanceOf(address)
+
+# Нативный токен сети в парах (адрес, токен)
+NATIVE_TOKEN = None
+
+# Размер одного вызова Call3 в calldata aggregate3: offset + target + bool + offset + length + 36 байт данных
+CALL3_ENCODED_SIZE = 32 * 5 + 64
+# Оценка газа на один вызов с запасом на холодный доступ к слоту хранилища
+NATIVE_BALANCE_CALL_GAS = 5_000
+ERC20_BALANCE_CALL_GAS = 30_000
+
+
+def get_multicall_address(chain_id):
+    """Адрес Multicall3 в сети chain_id: отдельное развёртывание или канонический адрес."""
+    return MULTICALL3_ADDRESSES.get(chain_id, MULTICALL3_ADDRESS)
+
+
+def encode_balance_call(address, token, multicall_address=MULTICALL3_ADDRESS):
+    address_arg = encode(["address"], [address])
+    if token is NATIVE_TOKEN:
+        return multicall_address, GET_ETH_BALANCE_SELECTOR + address_arg
+    return token, BALANCE_OF_SELECTOR + address_arg
+
+
+def decode_balance(success, return_data):
+    if not success or len(return_data) < 32:
+        return None
+    return int.from_bytes(return_data[:32], "big")
+
+
+class MulticallAggregator:
+    """
+    Собирает балансы для множества пар (адрес, токен) через Multicall3.aggregate3.
+    Вызовы разбиваются на пачки по размеру calldata и оценке газа, пачки отправляются параллельно.
+    """
+
+    def __init__(
+        self,
+        w3,
+        multicall_address=MULTICALL3_ADDRESS,
+        max_calldata_bytes=100_000,
+        max_gas_per_call=20_000_000,
+        max_concurrency=4,
+    ):
+        self.w3 = w3
+        self.multicall_address = to_checksum_address(multicall_address)
+        self.max_calldata_bytes = max_calldata_bytes
+        self.max_gas_per_call = max_gas_per_call
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    def _split_into_chunks(self, pairs):
+        chunks = []
+        chunk, chunk_size, chunk_gas = [], 0, 0
+        for address, token in pairs:
+            call_gas = (
+                NATIVE_BALANCE_CALL_GAS if token is NATIVE_TOKEN else ERC20_BALANCE_CALL_GAS
+            )
+            if chunk and (
+                chunk_size + CALL3_ENCODED_SIZE > self.max_calldata_bytes
+                or chunk_gas + call_gas > self.max_gas_per_call
+            ):
+                chunks.append(chunk)
+                chunk, chunk_size, chunk_gas = [], 0, 0
+            chunk.append((address, token))
+            chunk_size += CALL3_ENCODED_SIZE
+            chunk_gas += call_gas
+        if chunk:
+            chunks.append(chunk)
+        return chunks
+
+    async def _aggregate(self, pairs, block_identifier):
+        calls = []
+        for address, token in pairs:
+            target, call_data = encode_balance_call(
+                address, token, self.multicall_address
+            )
+            calls.append((target, True, call_data))
+        data = AGGREGATE3_SELECTOR + encode(["(address,bool,bytes)[]"], [calls])
+
+        async with self._semaphore:
+            raw_result = await self.w3.eth.call(
+                {"to": self.multicall_address, "data": data}, block_identifier
+            )
+        (results,) = decode(["(bool,bytes)[]"], raw_result)
+        return [decode_balance(success, return_data) for success, return_data in results]
+
+    async def get_balances(self, pairs, block_identifier="latest"):
+        """
+        pairs - список (адрес, токен), где токен None означает нативную монету сети.
+        Возвращает словарь {(адрес, токен): баланс в wei}, для неудачных вызовов баланс None.
+        """
+        pairs = [
+            (
+                to_checksum_address(address),
+                token if token is NATIVE_TOKEN else to_checksum_address(token),
+            )
+            for address, token in pairs
+        ]
+        chunks = self._split_into_chunks(pairs)
+        chunk_results = await asyncio.gather(
+            *(self._aggregate(chunk, block_identifier) for chunk in chunks)
+        )
+        balances = {}
+        for chunk, results in zip(chunks, chunk_results):
+            balances.update(zip(chunk, results))
+        return balances
+
+    async def get_native_balances(self, addresses, block_identifier="latest"):
+        balances = await self.get_balances(
+            [(address, NATIVE_TOKEN) for address in addresses], block_identifier
+        )
+        return {address: balance for (address, _), balance in balances.items()}
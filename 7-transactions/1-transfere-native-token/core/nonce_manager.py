@@ -0,0 +1,112 @@
+import asyncio
+import heapq
+from logger import logger
+
+# Узлы принимают замену транзакции с тем же nonce, если комиссии выросли минимум на 10%
+MIN_REPLACEMENT_BUMP = 1.1
+
+
+def bump_transaction_fees(transaction, multiplier=1.125):
+    """
+    Копия транзакции с увеличенными комиссиями для замены (replace-by-fee) с тем же nonce.
+    """
+    if multiplier < MIN_REPLACEMENT_BUMP:
+        multiplier = MIN_REPLACEMENT_BUMP
+    bumped = dict(transaction)
+    for fee_field in ('maxFeePerGas', 'maxPriorityFeePerGas', 'gasPrice'):
+        if fee_field in bumped:
+            # +1 wei, чтобы округление не съело минимальный процент повышения
+            bumped[fee_field] = int(bumped[fee_field] * multiplier) + 1
+    return bumped
+
+
+class NonceManager:
+    """
+    Локальная выдача nonce для одного кошелька.
+    nonce резервируются под asyncio.Lock без запроса к RPC, поэтому несколько транзакций
+    можно готовить и отправлять подряд, не дожидаясь подтверждения предыдущих.
+    При ошибках отправки счётчик пересинхронизируется с количеством pending транзакций,
+    но не опускается ниже nonce, которые уже выданы и ещё готовятся или отправлены.
+    """
+
+    def __init__(self, w3, address):
+        self.w3 = w3
+        self.address = address
+        self._lock = asyncio.Lock()
+        self._next_nonce = None
+        # nonce, которые зарезервировали, но так и не отправили - выдаём их повторно первыми
+        self._released = []
+        # выданы reserve и ещё не отправлены: их нельзя выдавать повторно
+        self._reserved = set()
+        self._sent = set()
+
+    async def _sync(self):
+        pending_nonce = await self.w3.eth.get_transaction_count(self.address, 'pending')
+        self._sent = {nonce for nonce in self._sent if nonce >= pending_nonce}
+        in_flight = self._sent | {nonce for nonce in self._reserved if nonce >= pending_nonce}
+        self._next_nonce = max(pending_nonce, max(in_flight) + 1) if in_flight else pending_nonce
+        # nonce ниже счётчика, которых нет в сети и которые никто не держит, выдаются повторно первыми
+        self._released = [nonce for nonce in range(pending_nonce, self._next_nonce) if nonce not in in_flight]
+        heapq.heapify(self._released)
+        return pending_nonce
+
+    async def reserve(self):
+        async with self._lock:
+            if self._next_nonce is None:
+                await self._sync()
+            if self._released:
+                nonce = heapq.heappop(self._released)
+            else:
+                nonce = self._next_nonce
+                self._next_nonce += 1
+            self._reserved.add(nonce)
+            return nonce
+
+    async def release(self, nonce):
+        """Вернуть nonce, если транзакция с ним не была отправлена."""
+        async with self._lock:
+            self._reserved.discard(nonce)
+            if nonce in self._sent:
+                return
+            if self._next_nonce is not None and nonce == self._next_nonce - 1:
+                self._next_nonce -= 1
+            elif nonce not in self._released:
+                heapq.heappush(self._released, nonce)
+
+    async def skip_to(self, nonce):
+        """Не выдавать nonce меньше указанного, например занятые неотправленными транзакциями из журнала."""
+        async with self._lock:
+            if self._next_nonce is None:
+                await self._sync()
+            self._next_nonce = max(self._next_nonce, nonce)
+            self._released = [released for released in self._released if released >= nonce]
+            heapq.heapify(self._released)
+
+    def mark_sent(self, nonce):
+        self._reserved.discard(nonce)
+        self._sent.add(nonce)
+
+    async def resync(self):
+        async with self._lock:
+            pending_nonce = await self._sync()
+        logger.info(f"ℹ️ nonce кошелька {self.address} синхронизирован с сетью: {pending_nonce}")
+        return pending_nonce
+
+    async def find_gaps(self):
+        """
+        Пропуски - nonce ниже локального счётчика, которые ещё не попали в сеть, не отправлены нами
+        и не зарезервированы транзакцией, которая ещё готовится к отправке.
+        Пока пропуск не закрыт, все транзакции с большим nonce будут висеть в mempool.
+        """
+        async with self._lock:
+            if self._next_nonce is None:
+                return []
+            pending_nonce = await self.w3.eth.get_transaction_count(self.address, 'pending')
+            return [
+                nonce for nonce in range(pending_nonce, self._next_nonce)
+                if nonce not in self._sent and nonce not in self._reserved
+            ]
+
+    @property
+    def next_nonce(self):
+        return self._next_nonce
@@ -0,0 +1,159 @@
+import time
+from logger import logger
+from nonce_manager import bump_transaction_fees, MIN_REPLACEMENT_BUMP
+from journal import STATE_INCLUDED
+from exceptions import W3TransactionSendError, W3TransactionTimeoutError
+
+FEE_FIELDS = ('maxFeePerGas', 'maxPriorityFeePerGas', 'gasPrice')
+
+
+class ReplacementPolicy:
+    """
+    Когда и насколько ускорять зависшую транзакцию.
+    Замена отправляется сразу, если maxFeePerGas ниже прогноза base fee (в блок транзакция не попадёт),
+    и после bump_after секунд ожидания в остальных случаях. Комиссии замены - максимум из старых,
+    повышенных на fee_multiplier, и текущих комиссий пресета market_preset, но не выше max_fee_cap wei.
+    После max_replacements замен транзакция просто ждёт.
+    """
+
+    def __init__(self, bump_after=30, fee_multiplier=1.125, market_preset="fast", max_fee_cap=None,
+                 max_replacements=5):
+        self.bump_after = bump_after
+        self.fee_multiplier = fee_multiplier
+        self.market_preset = market_preset
+        self.max_fee_cap = max_fee_cap
+        self.max_replacements = max_replacements
+
+    def should_replace(self, transfer, next_base_fee, now):
+        if transfer.replacements >= self.max_replacements:
+            return False
+        transaction = transfer.transaction
+        max_fee = transaction.get('maxFeePerGas', transaction.get('gasPrice'))
+        if next_base_fee is not None and max_fee < next_base_fee:
+            return True
+        return now - transfer.sent_at >= self.bump_after
+
+    def replacement(self, transaction, market_fees):
+        """Транзакция-замена или None, если потолок комиссии не даёт поднять её на минимальные 10%."""
+        replacement = bump_transaction_fees(transaction, self.fee_multiplier)
+        for fee_field in FEE_FIELDS:
+            if fee_field in replacement and fee_field in market_fees:
+                replacement[fee_field] = max(replacement[fee_field], market_fees[fee_field])
+        if self.max_fee_cap is not None:
+            for fee_field in FEE_FIELDS:
+                if fee_field in replacement:
+                    replacement[fee_field] = min(replacement[fee_field], self.max_fee_cap)
+        if 'maxFeePerGas' in replacement:
+            replacement['maxFeePerGas'] = max(replacement['maxFeePerGas'], replacement['maxPriorityFeePerGas'])
+        for fee_field in FEE_FIELDS:
+            if fee_field in replacement and replacement[fee_field] < transaction[fee_field] * MIN_REPLACEMENT_BUMP:
+                return None
+        return replacement
+
+
+class PendingTransfer:
+    """Один логический перевод: исходная транзакция и все её замены с тем же nonce."""
+
+    def __init__(self, transaction, tx_hash):
+        self.nonce = transaction['nonce']
+        # последняя отправленная версия транзакции
+        self.transaction = transaction
+        self.tx_hashes = [tx_hash]
+        self.created_at = time.monotonic()
+        self.sent_at = self.created_at
+        self.tx_hash = None
+        self.receipt = None
+
+    @property
+    def replacements(self):
+        return len(self.tx_hashes) - 1
+
+
+class PendingTxManager:
+    """
+    Отправка с ускорением (replace-by-fee): пока перевод не попал в блок, раз в check_interval
+    секунд комиссии транзакции сравниваются с текущим base fee и, по ReplacementPolicy,
+    в сеть уходит замена с тем же nonce и повышенными комиссиями. Квитанция ожидается сразу
+    по всем версиям перевода через общий ReceiptTracker.
+    """
+
+    def __init__(self, client, policy=None, check_interval=5):
+        self.client = client
+        self.policy = policy or ReplacementPolicy()
+        self.check_interval = check_interval
+
+    async def send(self, transaction):
+        """Отправить транзакцию (с оценкой газа, если его нет) и вернуть PendingTransfer."""
+        tx_hash = await self.client.broadcast_tx(transaction, without_gas='gas' in transaction)
+        return self.track(transaction, tx_hash)
+
+    def track(self, transaction, tx_hash):
+        """Взять под наблюдение уже отправленную транзакцию."""
+        return PendingTransfer(transaction, tx_hash)
+
+    async def _maybe_replace(self, transfer):
+        market_fees = await self.client.get_fees(self.policy.market_preset)
+        next_base_fee = (await self.client.get_fee_oracle()).next_base_fee
+        now = time.monotonic()
+        if not self.policy.should_replace(transfer, next_base_fee, now):
+            return
+        replacement = self.policy.replacement(transfer.transaction, market_fees)
+        if replacement is None:
+            logger.warning(f"⚠️ Транзакция с nonce {transfer.nonce}: достигнут потолок комиссии, ждём без замены.")
+            return
+        try:
+            # отказ в замене не означает рассинхронизацию nonce: счётчик не сбрасываем
+            tx_hash = await self.client.broadcast_tx(replacement, without_gas=True, resync_nonce=False)
+        except W3TransactionSendError as e:
+            # nonce too low: одна из версий уже в блоке, её квитанцию найдёт следующая проверка
+            if "nonce too low" not in str(e):
+                logger.warning(f"⚠️ Замена транзакции с nonce {transfer.nonce} не отправлена: {e}")
+            return
+        transfer.transaction = replacement
+        transfer.tx_hashes.append(tx_hash)
+        transfer.sent_at = now
+        fee_field = 'maxFeePerGas' if 'maxFeePerGas' in replacement else 'gasPrice'
+        logger.info(
+            f"⚡ Транзакция с nonce {transfer.nonce} заменена ({transfer.replacements}-я замена), "
+            f"{fee_field} {replacement[fee_field]} wei: {self.client.explorer_url}/tx/{tx_hash}"
+        )
+
+    async def wait(self, transfer, timeout=600):
+        """Квитанция перевода, какая бы из его версий ни попала в блок."""
+        tracker = await self.client.get_receipt_tracker()
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise W3TransactionTimeoutError(
+                    f"Транзакция с nonce {transfer.nonce} не завершена за {timeout} секунд "
+                    f"({transfer.replacements} замен)."
+                )
+            try:
+                transfer.tx_hash, transfer.receipt = await tracker.wait_any(
+                    transfer.tx_hashes, min(self.check_interval, remaining)
+                )
+                break
+            except W3TransactionTimeoutError:
+                pass
+            try:
+                await self._maybe_replace(transfer)
+            except Exception as e:
+                logger.warning(f"⚠️ Не удалось проверить комиссии для замены транзакции: {e}")
+
+        await self.client.note_block(transfer.receipt["blockNumber"])
+        # в журнале все версии перевода - одна запись, в ней остаётся хэш той версии, что попала в блок
+        self.client.journal_record(
+            transfer.transaction, STATE_INCLUDED,
+            tx_hash=transfer.tx_hash, block=transfer.receipt["blockNumber"], status=transfer.receipt["status"],
+        )
+        logger.info(
+            f"ℹ️ Перевод с nonce {transfer.nonce} в блоке {transfer.receipt['blockNumber']} "
+            f"через {time.monotonic() - transfer.created_at:.1f} сек, замен: {transfer.replacements}."
+        )
+        return transfer.receipt
+
+    async def send_and_wait(self, transaction, timeout=600):
+        transfer = await self.send(transaction)
+        await self.wait(transfer, timeout)
+        return transfer
@@ -0,0 +1,158 @@
+import asyncio
+import contextvars
+import weakref
+from web3.exceptions import TransactionNotFound
+from logger import logger
+from exceptions import W3TransactionTimeoutError
+
+
+class ReceiptTracker:
+    """
+    Один наблюдатель за новыми блоками на все ожидаемые транзакции.
+    Опрос номера блока начинается с короткого интервала и замедляется, пока блок не меняется.
+    На каждом новом блоке квитанции всех ожидаемых транзакций запрашиваются за один проход.
+    """
+
+    def __init__(self, w3, min_poll_interval=0.25, max_poll_interval=2, backoff=1.5, max_concurrency=20):
+        # подключения клиентов сети: опрос идёт через первое, закрытое подключение снимается через detach
+        self._connections = [w3]
+        self.min_poll_interval = min_poll_interval
+        self.max_poll_interval = max_poll_interval
+        self.backoff = backoff
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._pending = {}
+        self._new_hashes = set()
+        self._last_block = None
+        self._task = None
+
+    @property
+    def w3(self):
+        return self._connections[0] if self._connections else None
+
+    def attach(self, w3):
+        if not any(connection is w3 for connection in self._connections):
+            self._connections.append(w3)
+
+    def detach(self, w3):
+        self._connections = [connection for connection in self._connections if connection is not w3]
+
+    @property
+    def pending_count(self):
+        return len(self._pending)
+
+    def _register(self, tx_hash):
+        tx_hash = tx_hash.lower() if isinstance(tx_hash, str) else self.w3.to_hex(tx_hash)
+        future = self._pending.get(tx_hash)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            self._pending[tx_hash] = future
+            self._new_hashes.add(tx_hash)
+        if self._task is None or self._task.done():
+            # опрос общий для всех транзакций: не наследуем контекст запустившей его (сегмент RpcRecorder).
+            # Задача копирует текущий контекст, поэтому создаётся внутри пустого (create_task(context=) - с 3.11)
+            self._task = contextvars.Context().run(asyncio.create_task, self._run())
+        return tx_hash, future
+
+    def _forget(self, tx_hash, future):
+        if self._pending.get(tx_hash) is future and not future.done():
+            del self._pending[tx_hash]
+            future.cancel()
+
+    async def wait(self, tx_hash, timeout=120):
+        """Дождаться квитанции транзакции. При превышении timeout - W3TransactionTimeoutError."""
+        tx_hash, future = self._register(tx_hash)
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), timeout)
+        except asyncio.TimeoutError:
+            self._forget(tx_hash, future)
+            raise W3TransactionTimeoutError(f"Транзакция не завершена за {timeout} секунд.")
+
+    async def wait_any(self, tx_hashes, timeout=120):
+        """
+        Квитанция первой попавшей в блок из нескольких транзакций, например замен с одним nonce.
+        Возвращает (хэш, квитанция); остальные хэши снимаются с наблюдения.
+        """
+        registered = dict(self._register(tx_hash) for tx_hash in tx_hashes)
+        await asyncio.wait(
+            [asyncio.shield(future) for future in registered.values()],
+            timeout=timeout, return_when=asyncio.FIRST_COMPLETED,
+        )
+        result = None
+        for tx_hash, future in registered.items():
+            if result is None and future.done() and not future.cancelled():
+                result = (tx_hash, future.result())
+            else:
+                self._forget(tx_hash, future)
+        if result is None:
+            raise W3TransactionTimeoutError(f"Ни одна из транзакций не завершена за {timeout} секунд.")
+        return result
+
+    async def _get_receipt(self, tx_hash):
+        async with self._semaphore:
+            try:
+                return await self.w3.eth.get_transaction_receipt(tx_hash)
+            except TransactionNotFound:
+                return None
+
+    async def _check(self, tx_hashes):
+        receipts = await asyncio.gather(
+            *(self._get_receipt(tx_hash) for tx_hash in tx_hashes), return_exceptions=True
+        )
+        for tx_hash, receipt in zip(tx_hashes, receipts):
+            if isinstance(receipt, Exception):
+                logger.warning(f"⚠️ Ошибка при получении квитанции {tx_hash}: {receipt}")
+                continue
+            future = self._pending.get(tx_hash)
+            if receipt is not None and future is not None:
+                del self._pending[tx_hash]
+                if not future.done():
+                    future.set_result(receipt)
+
+    async def _run(self):
+        poll_interval = self.min_poll_interval
+        while self._pending:
+            try:
+                if self.w3 is None:
+                    raise RuntimeError("нет открытого подключения к сети")
+                block_number = await self.w3.eth.block_number
+                if block_number != self._last_block:
+                    self._last_block = block_number
+                    self._new_hashes.clear()
+                    await self._check(list(self._pending))
+                    poll_interval = self.min_poll_interval
+                else:
+                    if self._new_hashes:
+                        # транзакции, добавленные после последней проверки, могли попасть в уже увиденный блок
+                        new_hashes, self._new_hashes = list(self._new_hashes), set()
+                        await self._check(new_hashes)
+                    poll_interval = min(poll_interval * self.backoff, self.max_poll_interval)
+            except Exception as e:
+                logger.warning(f"⚠️ Ошибка при опросе новых блоков: {e}")
+                poll_interval = self.max_poll_interval
+            if self._pending:
+                await asyncio.sleep(poll_interval)
+
+
+# цикл событий -> {chain_id: ReceiptTracker}: futures и задача опроса привязаны к циклу, в котором созданы
+_trackers = weakref.WeakKeyDictionary()
+
+
+def get_receipt_tracker(w3, chain_id):
+    """
+    Общий ReceiptTracker сети: все клиенты и кошельки одной сети ждут квитанции через один опрос.
+    Опрос идёт через w3 первого клиента и переходит на следующий, только когда тот закрывается.
+    """
+    trackers = _trackers.setdefault(asyncio.get_running_loop(), {})
+    tracker = trackers.get(chain_id)
+    if tracker is None:
+        tracker = trackers[chain_id] = ReceiptTracker(w3)
+    else:
+        tracker.attach(w3)
+    return tracker
+
+
+def release_receipt_tracker(w3, chain_id):
+    """Клиент закрывается: общий опрос сети больше не ходит через его w3."""
+    tracker = _trackers.get(asyncio.get_running_loop(), {}).get(chain_id)
+    if tracker is not None:
+        tracker.detach(w3)
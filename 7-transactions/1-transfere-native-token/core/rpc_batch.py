@@ -0,0 +1,74 @@
+import asyncio
+import json
+import time
+from web3 import AsyncHTTPProvider
+from web3._utils.request import async_make_post_request
+from rpc_recorder import get_attached_recorder
+
+
+def to_int(value):
+    """Число из ответа RPC: HTTP узлы отдают hex строки, eth-tester - уже числа."""
+    if value is None or isinstance(value, int):
+        return value
+    return int(value, 16)
+
+
+async def _single_requests(w3, calls):
+    """По одному запросу через middleware web3: ответы приводятся к тому же виду, что у HTTP узла."""
+    return list(await asyncio.gather(
+        *(w3.manager.coro_request(method, params) for method, params in calls)
+    ))
+
+
+async def _http_batch(w3, calls):
+    provider = w3.provider
+    started = time.monotonic()
+    payload = [
+        {"jsonrpc": "2.0", "id": request_id, "method": method, "params": params}
+        for request_id, (method, params) in enumerate(calls)
+    ]
+    raw_response = await async_make_post_request(
+        provider.endpoint_uri, json.dumps(payload).encode(), **provider.get_request_kwargs()
+    )
+    responses = json.loads(raw_response)
+    if not isinstance(responses, list):
+        # узел не поддерживает batch и вернул одну ошибку на весь запрос
+        return None
+    responses.sort(key=lambda response: response.get("id", 0))
+    # batch идёт мимо middleware web3: вызовы записываются в RpcRecorder по одному
+    recorder = get_attached_recorder(w3)
+    if recorder is not None:
+        for (method, params), response in zip(calls, responses):
+            recorder.record(method, params, response, started)
+    return responses
+
+
+async def rpc_batch_calls(w3, calls, batch_size=100):
+    """
+    Список вызовов (method, params), в том числе разных методов: по batch_size вызовов в одном
+    HTTP запросе (JSON-RPC batch). Для провайдеров без batch (eth-tester, пул RPC) и узлов,
+    которые его не принимают, вызовы отправляются параллельно по одному.
+    Возвращает result в порядке calls.
+    """
+    calls = list(calls)
+    chunks = [calls[start:start + batch_size] for start in range(0, len(calls), batch_size)]
+
+    async def fetch(chunk):
+        if isinstance(w3.provider, AsyncHTTPProvider):
+            responses = await _http_batch(w3, chunk)
+            if responses is not None:
+                for response in responses:
+                    if "error" in response:
+                        raise ValueError(response["error"])
+                return [response["result"] for response in responses]
+        return await _single_requests(w3, chunk)
+
+    results = []
+    for chunk_results in await asyncio.gather(*(fetch(chunk) for chunk in chunks)):
+        results.extend(chunk_results)
+    return results
+
+
+async def rpc_batch(w3, method, params_list, batch_size=100):
+    """Один RPC метод для списка параметров, см. rpc_batch_calls."""
+    return await rpc_batch_calls(w3, [(method, params) for params in params_list], batch_size)
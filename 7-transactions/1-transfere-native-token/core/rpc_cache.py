@@ -0,0 +1,114 @@
+import asyncio
+import json
+import time
+
+# Ответ не меняется, пока жив провайдер
+CHAIN_CONSTANT_METHODS = ("eth_chainId", "net_version")
+# Ответ меняется только с новым блоком
+BLOCK_SCOPED_METHODS = ("eth_gasPrice", "eth_maxPriorityFeePerGas", "eth_feeHistory", "eth_blockNumber")
+# Одинаковые одновременные запросы этих методов нельзя объединять: у них побочные эффекты
+NON_IDEMPOTENT_METHODS = ("eth_sendRawTransaction", "eth_sendTransaction")
+
+
+def _to_int(value):
+    return value if isinstance(value, int) else int(value, 16)
+
+
+class RpcCacheMiddleware:
+    """
+    Middleware AsyncWeb3: одинаковые одновременные запросы (метод + параметры) уходят в RPC один раз,
+    ответы eth_chainId/net_version кэшируются навсегда, а eth_gasPrice, eth_maxPriorityFeePerGas,
+    eth_feeHistory - до нового блока, но не дольше block_time секунд.
+    Новый блок замечается по ответам eth_blockNumber и квитанциям из более позднего блока.
+    eth_blockNumber кэшируется на block_number_ttl секунд: этого хватает, чтобы объединить
+    всплеск запросов, и не задерживает обнаружение блока опросом ReceiptTracker.
+    Подключение: w3.middleware_onion.inject(RpcCacheMiddleware(), "rpc_cache", layer=0).
+    """
+
+    def __init__(self, block_time=2.0, block_number_ttl=0.2):
+        self.block_time = block_time
+        self.block_number_ttl = block_number_ttl
+        self._constant = {}
+        self._block_scoped = {}
+        self._in_flight = {}
+        self._block = None
+        self.hits = 0
+        self.deduplicated = 0
+        self.requests = 0
+
+    def stats(self):
+        return {"requests": self.requests, "hits": self.hits, "deduplicated": self.deduplicated}
+
+    def clear(self):
+        self._constant.clear()
+        self._block_scoped.clear()
+        self._block = None
+
+    def _observe_block(self, block_number):
+        if self._block is None or block_number > self._block:
+            # новый блок (или первый известный): записи, полученные до него, устарели, включая
+            # eth_blockNumber - иначе блок, замеченный по квитанции, до конца ttl отдавался бы старым номером.
+            # Ответ eth_blockNumber с этим блоком сохраняется уже после очистки
+            self._block_scoped = {}
+            self._block = block_number
+
+    def _observe(self, method, response):
+        result = response.get("result") if isinstance(response, dict) else None
+        if result is None:
+            return
+        try:
+            if method == "eth_blockNumber":
+                self._observe_block(_to_int(result))
+            elif method == "eth_getTransactionReceipt":
+                self._observe_block(_to_int(result["blockNumber"]))
+        except (KeyError, TypeError, ValueError):
+            pass
+
+    def _cached(self, method, key):
+        if method in CHAIN_CONSTANT_METHODS:
+            return self._constant.get(key)
+        if method in BLOCK_SCOPED_METHODS:
+            entry = self._block_scoped.get(key)
+            ttl = self.block_number_ttl if method == "eth_blockNumber" else self.block_time
+            if entry is not None and time.monotonic() - entry[0] < ttl:
+                return entry[1]
+        return None
+
+    def _store(self, method, key, response):
+        if not isinstance(response, dict) or "error" in response:
+            return
+        if method in CHAIN_CONSTANT_METHODS:
+            self._constant[key] = response
+        elif method in BLOCK_SCOPED_METHODS:
+            self._block_scoped[key] = (time.monotonic(), response)
+
+    async def _request(self, make_request, method, params, key):
+        self.requests += 1
+        response = await make_request(method, params)
+        # номер блока из ответа проверяется до сохранения: новый блок очищает старые записи
+        self._observe(method, response)
+        self._store(method, key, response)
+        return response
+
+    async def __call__(self, make_request, w3):
+        async def cached_request(method, params):
+            if method in NON_IDEMPOTENT_METHODS:
+                return await make_request(method, params)
+            key = (method, json.dumps(params, sort_keys=True, default=str))
+            response = self._cached(method, key)
+            if response is not None:
+                self.hits += 1
+                return dict(response)
+            future = self._in_flight.get(key)
+            if future is not None:
+                self.deduplicated += 1
+                return dict(await asyncio.shield(future))
+            future = asyncio.ensure_future(self._request(make_request, method, params, key))
+            self._in_flight[key] = future
+            try:
+                # shield: отмена одного из ожидающих не отменяет общий запрос для остальных
+                return dict(await asyncio.shield(future))
+            finally:
+                if self._in_flight.get(key) is future:
+                    del self._in_flight[key]
+        return cached_request
@@ -0,0 +1,196 @@
+import asyncio
+import time
+from web3 import AsyncHTTPProvider
+from web3.providers.async_base import AsyncJSONBaseProvider
+from logger import logger
+
+# Методы, которые безопасно отправлять на несколько узлов одновременно
+BROADCAST_METHODS = ("eth_sendRawTransaction",)
+# Методы с побочными эффектами: их нельзя дублировать хеджированием
+NON_IDEMPOTENT_METHODS = BROADCAST_METHODS + ("eth_sendTransaction",)
+
+
+def is_node_error(method, error):
+    """
+    Ошибка JSON-RPC по вине узла (лимит запросов, нет блока, внутренняя ошибка), а не запроса.
+    Откат исполнения (code 3, "execution reverted") и "already known" при рассылке транзакции
+    на несколько узлов - нормальные ответы здорового узла.
+    """
+    code = error.get("code") if isinstance(error, dict) else None
+    message = str(error.get("message", "") if isinstance(error, dict) else error).lower()
+    if code == 3 or "revert" in message:
+        return False
+    return not (method in BROADCAST_METHODS and "already known" in message)
+
+
+class RpcEndpointStats:
+    """Задержка (EWMA) и ошибки одного RPC. После серии ошибок узел уходит на паузу."""
+
+    def __init__(self, url, request_kwargs=None, latency_alpha=0.3, max_consecutive_errors=3, cooldown=30):
+        self.url = url
+        self.provider = AsyncHTTPProvider(url, request_kwargs=request_kwargs)
+        self.latency = None
+        self.requests = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.cooldown_until = 0
+        self._latency_alpha = latency_alpha
+        self._max_consecutive_errors = max_consecutive_errors
+        self._cooldown = cooldown
+
+    @property
+    def healthy(self):
+        return time.monotonic() >= self.cooldown_until
+
+    @property
+    def error_rate(self):
+        return self.errors / self.requests if self.requests else 0.0
+
+    def score(self):
+        # неизмеренный узел пробуем первым, чтобы узнать его задержку
+        if self.latency is None:
+            return 0.0
+        return self.latency * (1 + 10 * self.error_rate)
+
+    def record_success(self, latency):
+        self.requests += 1
+        self.consecutive_errors = 0
+        if self.latency is None:
+            self.latency = latency
+        else:
+            self.latency += self._latency_alpha * (latency - self.latency)
+
+    def record_error(self):
+        self.requests += 1
+        self.errors += 1
+        self.consecutive_errors += 1
+        if self.consecutive_errors >= self._max_consecutive_errors:
+            self.cooldown_until = time.monotonic() + self._cooldown
+            logger.warning(f"⚠️ RPC {self.url} недоступен, пауза {self._cooldown} секунд.")
+
+    async def request(self, method, params):
+        start_time = time.monotonic()
+        try:
+            response = await self.provider.make_request(method, params)
+        except Exception:
+            self.record_error()
+            raise
+        error = response.get("error") if isinstance(response, dict) else None
+        if error is not None and is_node_error(method, error):
+            self.record_error()
+        else:
+            self.record_success(time.monotonic() - start_time)
+        return response
+
+
+class PooledAsyncHTTPProvider(AsyncJSONBaseProvider):
+    """
+    Провайдер для AsyncWeb3 поверх нескольких RPC.
+    Чтения идут на самый быстрый здоровый узел; если он не ответил за hedge_factor * его обычной задержки,
+    параллельно отправляется запрос на следующий узел и берётся первый ответ. При ошибке - переход к следующему.
+    eth_sendRawTransaction при broadcast=True рассылается на все здоровые узлы сразу.
+    """
+
+    def __init__(self, endpoint_urls, request_kwargs=None, hedge_factor=2.0, min_hedge_delay=0.05,
+                 broadcast=True):
+        super().__init__()
+        if not endpoint_urls:
+            raise ValueError("Нужен хотя бы один RPC.")
+        self.endpoints = [RpcEndpointStats(url, request_kwargs) for url in endpoint_urls]
+        self.hedge_factor = hedge_factor
+        self.min_hedge_delay = min_hedge_delay
+        self.broadcast = broadcast
+
+    def __str__(self):
+        return f"RPC pool {[endpoint.url for endpoint in self.endpoints]}"
+
+    def ranked_endpoints(self):
+        healthy = sorted((e for e in self.endpoints if e.healthy), key=lambda e: e.score())
+        # узлы на паузе - в конце списка: лучше медленный ответ, чем никакого
+        resting = sorted((e for e in self.endpoints if not e.healthy), key=lambda e: e.cooldown_until)
+        return healthy + resting
+
+    async def cache_async_session(self, session):
+        for endpoint in self.endpoints:
+            await endpoint.provider.cache_async_session(session)
+        return session
+
+    def _hedge_delay(self, endpoint):
+        if endpoint.latency is None:
+            return None
+        return max(endpoint.latency * self.hedge_factor, self.min_hedge_delay)
+
+    async def _request_with_hedging(self, method, params, candidates):
+        hedging_allowed = method not in NON_IDEMPOTENT_METHODS
+        remaining = list(candidates)
+        tasks = {}
+        last_error = None
+        last_error_response = None
+
+        def launch():
+            endpoint = remaining.pop(0)
+            tasks[asyncio.ensure_future(endpoint.request(method, params))] = endpoint
+            return endpoint
+
+        current = launch()
+        try:
+            while tasks:
+                hedge_delay = self._hedge_delay(current) if hedging_allowed and remaining else None
+                done, _ = await asyncio.wait(tasks, timeout=hedge_delay, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    # узел отвечает медленнее обычного - дублируем запрос на следующий
+                    current = launch()
+                    continue
+                for task in done:
+                    endpoint = tasks.pop(task)
+                    if task.exception() is not None:
+                        last_error = task.exception()
+                        logger.warning(f"⚠️ RPC {endpoint.url} вернул ошибку на {method}: {last_error}")
+                        continue
+                    response = task.result()
+                    error = response.get("error") if isinstance(response, dict) else None
+                    if error is None or not is_node_error(method, error):
+                        return response
+                    # лимит запросов, нет блока и т.п. - как исключение: пробуем следующий узел,
+                    # а ответ с ошибкой возвращаем, только если узлов не осталось
+                    last_error_response = response
+                    logger.warning(f"⚠️ RPC {endpoint.url} вернул ошибку на {method}: {error}")
+                if not tasks and remaining:
+                    current = launch()
+            if last_error_response is not None:
+                return last_error_response
+            raise last_error
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _broadcast(self, method, params, candidates):
+        results = await asyncio.gather(
+            *(endpoint.request(method, params) for endpoint in candidates), return_exceptions=True
+        )
+        responses = [result for result in results if not isinstance(result, Exception)]
+        # узлы, уже знающие транзакцию, отвечают ошибкой "already known" - берём успешный ответ, если он есть
+        for response in responses:
+            if "error" not in response:
+                return response
+        if responses:
+            return responses[0]
+        raise results[0]
+
+    async def make_request(self, method, params):
+        candidates = self.ranked_endpoints()
+        if self.broadcast and method in BROADCAST_METHODS:
+            return await self._broadcast(method, params, [e for e in candidates if e.healthy] or candidates)
+        return await self._request_with_hedging(method, params, candidates)
+
+    def stats(self):
+        return [
+            {
+                "url": endpoint.url,
+                "latency": endpoint.latency,
+                "requests": endpoint.requests,
+                "errors": endpoint.errors,
+                "healthy": endpoint.healthy,
+            }
+            for endpoint in self.endpoints
+        ]
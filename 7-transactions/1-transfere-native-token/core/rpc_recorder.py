@@ -0,0 +1,216 @@
+import asyncio
+import contextvars
+import gzip
+import json
+import time
+import weakref
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from web3.providers.async_base import AsyncJSONBaseProvider
+
+# Повторы этих вызовов - ожидаемый опрос, а не лишние запросы
+POLLING_METHODS = ("eth_getTransactionReceipt",)
+
+_segment = contextvars.ContextVar("rpc_recorder_segment", default=None)
+_attached = weakref.WeakKeyDictionary()
+
+
+def _to_json(value):
+    """json default: HexBytes/bytes и AttributeDict из ответов провайдеров без HTTP (eth-tester)."""
+    if isinstance(value, (bytes, bytearray)):
+        return "0x" + bytes(value).hex()
+    if hasattr(value, "items"):
+        return dict(value.items())
+    return str(value)
+
+
+def _params_key(params):
+    return json.dumps(params, sort_keys=True, default=_to_json, separators=(",", ":"))
+
+
+class RpcRecorder:
+    """
+    Запись JSON-RPC запросов и ответов с задержками. Подключается к AsyncWeb3 через attach(w3):
+    middleware на внутреннем слое видит запросы так, как они уходят в провайдер, после кэшей
+    и форматтеров, а вызовы из JSON-RPC batch (rpc_batch) записываются по одному.
+    Файл - gzip JSON Lines, по строке на вызов. Без filename записи хранятся только в памяти.
+    Вызовы внутри with recorder.segment("tx:1") помечаются сегментом, в том числе в порождённых задачах.
+    """
+
+    def __init__(self, filename=None):
+        self.filename = filename
+        self.records = []
+        self._file = gzip.open(filename, "wt", encoding="utf-8") if filename else None
+        self._started = time.monotonic()
+
+    @contextmanager
+    def segment(self, name):
+        token = _segment.set(name)
+        try:
+            yield
+        finally:
+            _segment.reset(token)
+
+    def attach(self, w3):
+        w3.middleware_onion.inject(self.middleware, "rpc_recorder", layer=0)
+        _attached[w3] = self
+        return w3
+
+    def record(self, method, params, response, started, error=None):
+        """Записать вызов; started - time.monotonic() перед запросом."""
+        record = {
+            "t": round(started - self._started, 6),
+            "ms": round((time.monotonic() - started) * 1000, 3),
+            "method": method,
+            "params": params,
+            "segment": _segment.get(),
+        }
+        if error is not None:
+            record["exception"] = f"{type(error).__name__}: {error}"
+        else:
+            record["response"] = response
+        line = json.dumps(record, default=_to_json, separators=(",", ":"))
+        # в памяти - та же JSON форма, что в файле: отчёт по записи и по файлу совпадает
+        self.records.append(json.loads(line))
+        if self._file is not None:
+            self._file.write(line + "\n")
+
+    async def middleware(self, make_request, w3):
+        async def record_request(method, params):
+            started = time.monotonic()
+            try:
+                response = await make_request(method, params)
+            except Exception as e:
+                self.record(method, params, None, started, e)
+                raise
+            self.record(method, params, response, started)
+            return response
+        return record_request
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+def get_attached_recorder(w3):
+    return _attached.get(w3)
+
+
+def load_recording(filename):
+    with gzip.open(filename, "rt", encoding="utf-8") as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def method_counts(records):
+    return Counter(record["method"] for record in records)
+
+
+def redundant_calls(records, ignore=POLLING_METHODS):
+    """
+    Повторные вызовы с теми же параметрами в пределах одного сегмента (например, одной транзакции).
+    Возвращает {метод: лишних вызовов} по всем сегментам, записи без сегмента считаются одним сегментом.
+    """
+    calls = Counter(
+        (record["segment"], record["method"], _params_key(record["params"]))
+        for record in records if record["method"] not in ignore
+    )
+    redundant = Counter()
+    for (segment, method, params), count in calls.items():
+        if count > 1:
+            redundant[method] += count - 1
+    return redundant
+
+
+def redundancy_report(records, ignore=POLLING_METHODS):
+    """
+    Сводка по записи: вызовы и лишние вызовы на сегмент по методам, от самых частых повторов.
+    [{method, calls_per_segment, redundant_per_segment}]
+    """
+    segments = len({record["segment"] for record in records}) or 1
+    calls = method_counts(records)
+    redundant = redundant_calls(records, ignore)
+    return [
+        {
+            "method": method,
+            "calls_per_segment": calls[method] / segments,
+            "redundant_per_segment": redundant[method] / segments,
+        }
+        for method in sorted(calls, key=lambda method: (-redundant[method], -calls[method]))
+    ]
+
+
+class ReplayProvider(AsyncJSONBaseProvider):
+    """
+    Провайдер для AsyncWeb3, отвечающий из записи RpcRecorder без сети.
+    Ответ ищется по методу и параметрам; если таких параметров в записи нет (другой nonce, подпись),
+    берётся следующий записанный ответ того же метода. Каждая запись выдаётся один раз, при любом
+    способе поиска, поэтому повтор детерминирован. Повторные запросы получают ответы в порядке записи,
+    когда записи исчерпаны - повторяется последний ответ. latency="original" - ждать записанную задержку (делённую на speed),
+    None - отвечать сразу. strict=True - без подбора по методу, ошибка на любой незаписанный запрос.
+    """
+
+    def __init__(self, recording, latency=None, speed=1.0, strict=False):
+        super().__init__()
+        records = load_recording(recording) if isinstance(recording, str) else list(recording)
+        self.latency = latency
+        self.speed = speed
+        self.strict = strict
+        self._records = records
+        # общий для обоих способов поиска признак "запись выдана"
+        self._used = [False] * len(records)
+        self._exact = defaultdict(list)
+        self._by_method = defaultdict(list)
+        for index, record in enumerate(records):
+            self._exact[(record["method"], _params_key(record["params"]))].append(index)
+            self._by_method[record["method"]].append(index)
+        # позиция первой, возможно, не выданной записи в каждом списке
+        self._cursors = {}
+        self.hits = 0
+        self.misses = 0
+
+    def __str__(self):
+        return f"Replay of {len(self._records)} RPC calls"
+
+    async def cache_async_session(self, session):
+        return session
+
+    def _next(self, queue_key, indices):
+        position = self._cursors.get(queue_key, 0)
+        while position < len(indices) and self._used[indices[position]]:
+            position += 1
+        self._cursors[queue_key] = position
+        if position == len(indices):
+            return self._records[indices[-1]]
+        self._used[indices[position]] = True
+        return self._records[indices[position]]
+
+    def _find(self, method, params):
+        key = (method, _params_key(params))
+        exact = self._exact.get(key)
+        if exact:
+            self.hits += 1
+            return self._next(key, exact)
+        self.misses += 1
+        if not self.strict and self._by_method.get(method):
+            return self._next(method, self._by_method[method])
+        return None
+
+    async def make_request(self, method, params):
+        record = self._find(method, params)
+        if record is None:
+            if method == "web3_clientVersion":
+                return {"jsonrpc": "2.0", "id": 0, "result": "ReplayProvider/v1"}
+            raise ValueError(f"В записи нет ответа на {method} {params}")
+        if self.latency == "original":
+            await asyncio.sleep(record["ms"] / 1000 / self.speed)
+        if "exception" in record:
+            # записанный сбой сети воспроизводится как ошибка соединения: её обрабатывает retry
+            raise ConnectionError(record["exception"])
+        return record["response"]
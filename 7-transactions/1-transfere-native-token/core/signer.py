@@ -0,0 +1,111 @@
+import asyncio
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from eth_account import Account
+from logger import logger
+
+# Аккаунт процесса-воркера, задаётся инициализатором пула
+_worker_account = None
+
+
+def _init_worker(private_key):
+    """Инициализатор процесса пула: ключ загружается в воркер один раз, а не передаётся с каждой задачей."""
+    global _worker_account
+    _worker_account = Account.from_key(private_key)
+
+
+def _ping():
+    return os.getpid()
+
+
+def _sign_chunk(transactions):
+    return [_worker_account.sign_transaction(transaction) for transaction in transactions]
+
+
+class SigningService:
+    """
+    Подпись транзакций в пуле процессов или потоков.
+    Подпись (эллиптическая кривая и RLP) - чистая работа процессора: на event loop она останавливает
+    весь сетевой ввод-вывод. Здесь транзакции подписываются пачками по chunk_size вне event loop,
+    а iter_signed отдаёт готовые подписи по порядку, пока остальные пачки ещё считаются,
+    поэтому отправку можно начинать сразу.
+    В режиме процессов ключ передаётся только инициализатору воркеров и не хранится в сервисе.
+    """
+
+    def __init__(self, private_key, workers=None, use_processes=True, chunk_size=32):
+        self.workers = workers or os.cpu_count() or 1
+        self.use_processes = use_processes
+        self.chunk_size = chunk_size
+        self._private_key = private_key
+        self._account = None
+        self._executor = None
+
+    async def start(self):
+        if self._executor is not None:
+            return self
+        if self.use_processes:
+            self._executor = ProcessPoolExecutor(
+                self.workers, initializer=_init_worker, initargs=(self._private_key,)
+            )
+            self._private_key = None
+            # запускаем все процессы заранее, чтобы первая пачка не ждала их старта
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(
+                loop.run_in_executor(self._executor, _ping) for _ in range(self.workers)
+            ))
+        else:
+            self._account = Account.from_key(self._private_key)
+            self._private_key = None
+            self._executor = ThreadPoolExecutor(self.workers)
+        logger.info(
+            f"ℹ️ Сервис подписи запущен: {self.workers} "
+            f"{'процессов' if self.use_processes else 'потоков'}."
+        )
+        return self
+
+    async def close(self):
+        if self._executor is not None:
+            await asyncio.to_thread(self._executor.shutdown)
+            self._executor = None
+        self._account = None
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        await self.close()
+
+    def _submit(self, transactions):
+        loop = asyncio.get_running_loop()
+        if self.use_processes:
+            return loop.run_in_executor(self._executor, _sign_chunk, transactions)
+        return loop.run_in_executor(
+            self._executor,
+            lambda: [self._account.sign_transaction(transaction) for transaction in transactions],
+        )
+
+    async def iter_signed(self, transactions):
+        """Подписанные транзакции в исходном порядке, по мере готовности пачек."""
+        if self._executor is None:
+            await self.start()
+        transactions = list(transactions)
+        futures = [
+            self._submit(transactions[start:start + self.chunk_size])
+            for start in range(0, len(transactions), self.chunk_size)
+        ]
+        try:
+            for future in futures:
+                for signed in await future:
+                    yield signed
+        finally:
+            for future in futures:
+                future.cancel()
+
+    async def sign_many(self, transactions):
+        return [signed async for signed in self.iter_signed(transactions)]
+
+    async def sign(self, transaction):
+        if self._executor is None:
+            await self.start()
+        signed, = await self._submit([transaction])
+        return signed
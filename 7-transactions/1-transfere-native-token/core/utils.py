@@ -1,25 +1,29 @@
 import sys
 from loguru import logger
-from eth_account import Account
 from exceptions import ERC20AddressIncorrect, W3NetworkConnectionError, W3ServerTimeoutError, W3UnknownError
 from decorators import w3_error_handler, retry
+from address_validator import is_address
 
 
-def is_private_key_valid(private_key: str) -> bool:
+# порядок группы secp256k1: ключ - число от 1 до SECP256K1_N - 1
+SECP256K1_N = 0xFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFFEBAAEDCE6AF48A03BBFD25E8CD0364141
+
+
+def is_private_key_valid(private_key: str | bytes) -> bool:
+    """Проверка формата и диапазона ключа без вычисления публичного ключа и адреса."""
     try:
-        Account.from_key(private_key)
-        return True
-    except ValueError:
+        if isinstance(private_key, (bytes, bytearray)):
+            key = bytes(private_key)
+        else:
+            key = bytes.fromhex(private_key[2:] if private_key[:2] in ("0x", "0X") else private_key)
+    except (ValueError, TypeError):
         return False
+    return len(key) == 32 and 0 < int.from_bytes(key, "big") < SECP256K1_N
 
 
 def is_erc20_address_valid(w3_client, address) -> bool:
-    try:
-        address = w3_client.to_checksum_address(address)
-        if w3_client.is_address(address):
-            return True
-    except ValueError:
-        return False
+    # checksum из кэша address_validator: повторная проверка адреса не считает keccak заново
+    return is_address(address)
 
 def is_value_valid(value: str) -> bool:
     try:
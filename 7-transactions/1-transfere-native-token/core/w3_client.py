@@ -1,10 +1,21 @@
 import asyncio
-from aiohttp import ClientSession
+from aiohttp import ClientSession, ClientTimeout, TCPConnector
 from logger import logger
 from web3 import AsyncWeb3, AsyncHTTPProvider
-from web3.exceptions import TransactionNotFound
+from web3.providers.async_base import AsyncBaseProvider
 from decorators import retry, w3_error_handler
 from utils import is_erc20_address_valid, is_private_key_valid
+from address_validator import to_checksum_address
+from multicall import MulticallAggregator, NATIVE_TOKEN, get_multicall_address
+from nonce_manager import NonceManager, bump_transaction_fees
+from receipt_tracker import get_receipt_tracker, release_receipt_tracker
+from fee_oracle import get_fee_oracle
+from gas_estimator import get_gas_estimator
+from wallet_state import get_wallet_state_cache
+from rpc_pool import PooledAsyncHTTPProvider
+from rpc_cache import RpcCacheMiddleware
+from signer import SigningService
+from journal import STATE_PREPARED, STATE_SIGNED, STATE_BROADCAST, STATE_INCLUDED
 
 from exceptions import (
     W3UnknownError,
@@ -22,41 +33,96 @@ from exceptions import (
     W3TransactionSendError,
     W3TransactionReceiptError,
     W3TransactionTimeoutError,
+    JournalStateError,
 )
 
 
+def create_rpc_session(connection_limit=100, timeout=30):
+    """
+    HTTP сессия для RPC: пул keep-alive соединений и кэш DNS, чтобы не открывать соединение на каждый запрос.
+    """
+    connector = TCPConnector(limit=connection_limit, ttl_dns_cache=300, keepalive_timeout=60)
+    return ClientSession(connector=connector, timeout=ClientTimeout(total=timeout), raise_for_status=True)
+
+
 class W3Client:
-    def __init__(self, base_url, explorer_url, proxy, client_name="Default", eip_1559=True):
+    def __init__(self, base_url, explorer_url, proxy, client_name="Default", eip_1559=True, session=None,
+                 fee_preset="normal", journal=None, rpc_cache=True):
         self.base_url = base_url
         self.explorer_url = explorer_url
         self.proxy = proxy
         self.client_name = client_name
-        self._session = None
+        # Общая сессия передаётся снаружи и не закрывается клиентом
+        self._session = session
+        self._owns_session = False
         self.eip_1559 = eip_1559
+        # slow / normal / fast, см. fee_oracle.FEE_PRESETS
+        self.fee_preset = fee_preset
+        # TxJournal: жизненный цикл отправленных транзакций переживает перезапуск процесса
+        self.journal = journal
+        # RpcCacheMiddleware: общие одновременные запросы и кэш chain_id / комиссий до нового блока
+        self.rpc_cache = rpc_cache
 
         self.address = None
         self._private_key = None
         self.w3 = None
+        self.nonce_manager = None
+        self._chain_id = None
+        self._multicall = None
+        self.signer = None
 
 
     @w3_error_handler
-    @retry(max_retries=3, retry_delay=2)
     async def connect(self):
-        self._session = ClientSession()
+        return await self.open_connection()
+
+
+    @retry(max_retries=3, retry_delay=2)
+    async def open_connection(self):
+        """
+        Подключение без w3_error_handler: ошибка соединения поднимается исключением, а не
+        завершает программу. Нужно, когда недоступность одного RPC не должна останавливать остальные.
+        """
+        if self._session is None:
+            self._session = create_rpc_session()
+            self._owns_session = True
 
         request_kwargs = {'proxy': f'http://{self.proxy}'} if self.proxy else {}
-        self.w3 = AsyncWeb3(
-            AsyncHTTPProvider(self.base_url, request_kwargs=request_kwargs)
-        )
-        if await self.is_connect():
+        if isinstance(self.base_url, AsyncBaseProvider):
+            # готовый провайдер, например ReplayProvider для работы по записи RPC без сети
+            provider = self.base_url
+        elif isinstance(self.base_url, (list, tuple)):
+            # несколько RPC: маршрутизация по задержке, хеджирование и переключение при ошибках
+            provider = PooledAsyncHTTPProvider(self.base_url, request_kwargs=request_kwargs)
+        else:
+            provider = AsyncHTTPProvider(self.base_url, request_kwargs=request_kwargs)
+        # web3 держит одну сессию на RPC url: если она уже есть, используем её, а свою закрываем
+        cached_session = await provider.cache_async_session(self._session)
+        if cached_session is not self._session:
+            if self._owns_session:
+                await self._session.close()
+            self._session = cached_session
+            self._owns_session = False
+        self.w3 = AsyncWeb3(provider)
+        if self.rpc_cache:
+            self.enable_rpc_cache()
+
+        # напрямую, без is_connect: его w3_error_handler завершает программу при ошибке одного RPC
+        if await self.w3.is_connected():
             logger.success(f"✅ Клиент {self.client_name} успешно подключился к RPC.")
             return self
         else:
             logger.error(f"⚠️ Клиент {self.client_name}. Ошибка соединения. Закрываем сессию.")
-            await self._session.close()
+            await self.close_session()
             raise W3NetworkConnectionError
 
 
+    def enable_rpc_cache(self, block_time=2.0):
+        """Подключить RpcCacheMiddleware к self.w3 (повторный вызов ничего не меняет)."""
+        if "rpc_cache" not in self.w3.middleware_onion:
+            self.w3.middleware_onion.inject(RpcCacheMiddleware(block_time), "rpc_cache", layer=0)
+
+
     async def __aenter__(self):
         """
         Сессия будет автоматически открываться и закрываться в рамках асинхронного контекстного менеджера.
@@ -68,10 +134,14 @@ class W3Client:
         """
         Закрытие сессии Web3 клиента.
         """
-        if self._session:
-            await self._session.close()
+        await self.stop_signer()
+        if self.w3 is not None and self._chain_id is not None:
+            release_receipt_tracker(self.w3, self._chain_id)
+        await self.close_session()
         self.w3 = None
-        self._session = None
+        self.nonce_manager = None
+        self._chain_id = None
+        self._multicall = None
 
 
     @w3_error_handler
@@ -81,10 +151,12 @@ class W3Client:
 
 
     async def close_session(self):
-        """Принудительно закрыть сессию Web3."""
-        if self.w3 and self.w3.provider:
-            await self.w3.provider.session.close()
+        """Закрыть сессию Web3, если она принадлежит клиенту. Общую сессию закрывает её владелец."""
+        if self._session and self._owns_session:
+            await self._session.close()
             logger.info("Web3 session closed.")
+            self._session = None
+        self._owns_session = False
 
 
     @w3_error_handler
@@ -99,7 +171,8 @@ class W3Client:
     def set_address(self, address):
         if self._private_key is None:
             if is_erc20_address_valid(self.w3, address):
-                self.address = self.w3.to_checksum_address(address)
+                self.address = to_checksum_address(address)
+                self.nonce_manager = NonceManager(self.w3, self.address)
                 return True
             else:
                 raise ERC20AddressIncorrect
@@ -115,42 +188,121 @@ class W3Client:
             raise PrivateKeyIncorrect
 
 
+    async def get_balance(self):
+        """
+        Баланс на последнем блоке из общего кэша сети: повторные чтения в пределах блока без запросов к RPC.
+        Повторы и обработка ошибок - в get_wallet_state, второй слой retry умножил бы число попыток.
+        """
+        return (await self.get_wallet_state()).balance
+
+
     @w3_error_handler
     @retry(max_retries=3, retry_delay=2)
-    async def get_balance(self):
-        return await self.w3.eth.get_balance(self.address)
+    async def get_wallet_state(self, address=None):
+        """Баланс и nonce адреса (по умолчанию своего) на последнем блоке, см. WalletStateCache."""
+        cache = get_wallet_state_cache(await self.get_chain_id())
+        return await cache.get(self.w3, address or self.address)
 
 
     @w3_error_handler
-    async def prepare_tx(self, recipient: str,  value: int | float = 0):
-        try:
-            transaction = {
-                'chainId': await self.w3.eth.chain_id,
-                'nonce': await self.w3.eth.get_transaction_count(self.address),
-                'from': self.address,
-                'to': self.w3.to_checksum_address(recipient),
-                'value': self.w3.to_wei(value, 'ether'),
-                'gasPrice': int((await self.w3.eth.gas_price) * 1.25)
-            }
+    @retry(max_retries=3, retry_delay=2)
+    async def get_wallet_states(self, addresses):
+        """Балансы и nonce нескольких адресов одним пакетом запросов: {checksum адрес: WalletState}."""
+        cache = get_wallet_state_cache(await self.get_chain_id())
+        return await cache.get_many(self.w3, addresses)
 
-            if self.eip_1559:
-                del transaction['gasPrice']
 
-                base_fee = await self.w3.eth.gas_price
-                max_priority_fee_per_gas = await self.w3.eth.max_priority_fee
+    async def note_block(self, block_number):
+        """Сообщить кэшу состояний о новом блоке, чтобы следующее чтение баланса его увидело."""
+        get_wallet_state_cache(await self.get_chain_id()).note_block(block_number)
 
-                if max_priority_fee_per_gas == 0:
-                    #logger.info("️ℹ️Приоритетная комиссия равна 0, используем базовую комиссию.")
-                    max_priority_fee_per_gas = base_fee
 
-                try:
-                    max_fee_per_gas = int(base_fee * 1.25 + max_priority_fee_per_gas)
-                except Exception as e:
-                    raise W3PriorityFeeCalculationError(f"Ошибка при расчете приоритетной комиссии: {e}")
+    @w3_error_handler
+    @retry(max_retries=3, retry_delay=2)
+    async def get_balances(self, addresses=None, tokens=(NATIVE_TOKEN,)):
+        """
+        Балансы нескольких адресов по нескольким токенам за несколько eth_call через Multicall3.
+        Токен None - нативная монета сети. Возвращает {(адрес, токен): баланс в wei}.
+        """
+        if self._multicall is None:
+            self._multicall = MulticallAggregator(self.w3, get_multicall_address(await self.get_chain_id()))
+        addresses = addresses or [self.address]
+        pairs = [(address, token) for address in addresses for token in tokens]
+        return await self._multicall.get_balances(pairs)
+
+
+    async def get_chain_id(self):
+        """
+        chain_id не меняется за время жизни клиента, поэтому запрашиваем его один раз.
+        """
+        if self._chain_id is None:
+            self._chain_id = await self.w3.eth.chain_id
+        return self._chain_id
+
+
+    async def get_receipt_tracker(self):
+        """Общий ReceiptTracker сети клиента."""
+        return get_receipt_tracker(self.w3, await self.get_chain_id())
+
+
+    async def get_fee_oracle(self):
+        """Общий FeeOracle сети клиента."""
+        return get_fee_oracle(self.w3, await self.get_chain_id())
+
+
+    async def get_gas_estimator(self):
+        """Общий GasEstimator сети клиента."""
+        return get_gas_estimator(self.w3, await self.get_chain_id())
+
+
+    async def get_fees(self, preset=None):
+        """
+        Поля комиссий для транзакции: gasPrice или maxFeePerGas/maxPriorityFeePerGas для EIP-1559.
+        Берутся из общего FeeOracle, поэтому не требуют отдельных запросов на каждую транзакцию.
+        """
+        oracle = await self.get_fee_oracle()
+        preset = preset or self.fee_preset
+        if not self.eip_1559:
+            return {'gasPrice': await oracle.get_gas_price(preset)}
+        try:
+            return await oracle.get_fees(preset)
+        except (W3EmptyFeeHistoryError, W3PriorityFeeError):
+            raise
+        except Exception as e:
+            raise W3PriorityFeeCalculationError(f"Ошибка при расчете приоритетной комиссии: {e}")
+
+
+    def build_tx(self, recipient, value, nonce, chain_id, fees):
+        transaction = {
+            'chainId': chain_id,
+            'nonce': nonce,
+            'from': self.address,
+            'to': to_checksum_address(recipient),
+            'value': self.w3.to_wei(value, 'ether'),
+        }
+        transaction.update(fees)
+        return transaction
+
 
-                transaction['maxPriorityFeePerGas'] = max_priority_fee_per_gas
-                transaction['maxFeePerGas'] = max_fee_per_gas
-                transaction['type'] = '0x2'
+    @w3_error_handler
+    async def prepare_tx(self, recipient: str,  value: int | float = 0):
+        try:
+            # Независимые запросы отправляем параллельно: подготовка занимает один round-trip
+            results = await asyncio.gather(
+                self.get_chain_id(),
+                self.nonce_manager.reserve(),
+                self.get_fees(),
+                return_exceptions=True,
+            )
+            errors = [result for result in results if isinstance(result, Exception)]
+            if errors:
+                # nonce уже зарезервирован, а транзакция не будет отправлена - возвращаем его
+                if isinstance(results[1], int):
+                    await self.nonce_manager.release(results[1])
+                raise errors[0]
+            chain_id, nonce, fees = results
+            transaction = self.build_tx(recipient, value, nonce, chain_id, fees)
+            self.journal_record(transaction, STATE_PREPARED, to=transaction['to'], value=transaction['value'])
 
             logger.success("✅ Транзакция успешно подготовлена.")
             return transaction
@@ -161,59 +313,189 @@ class W3Client:
             raise W3TransactionPreparationError(f"⚠️Неизвестная ошибка при подготовке транзакции: {e}") from e
 
 
+    async def estimate_gas(self, transaction):
+        """Лимит газа с запасом из общего кэша оценок: одинаковые переводы не оцениваются повторно."""
+        estimator = await self.get_gas_estimator()
+        return await estimator.estimate(transaction)
+
+
+    def sign_tx(self, transaction):
+        """
+        Подписать транзакцию без отправки. Возвращает подписанную транзакцию (rawTransaction, hash).
+        """
+        try:
+            return self.w3.eth.account.sign_transaction(transaction, self._private_key)
+        except Exception as e:
+            raise W3TransactionSignError(f"Ошибка при подписании транзакции: {e}")
+
+
+    async def start_signer(self, workers=None, use_processes=True):
+        """
+        Запустить пул подписи с ключом клиента: дальше транзакции подписываются вне event loop.
+        """
+        if self._private_key is None:
+            raise PrivateKeyIncorrect
+        self.signer = await SigningService(self._private_key, workers, use_processes).start()
+        return self.signer
+
+
+    async def stop_signer(self):
+        if self.signer is not None:
+            await self.signer.close()
+            self.signer = None
+
+
+    async def sign_tx_async(self, transaction):
+        """
+        Подписать транзакцию, не останавливая event loop: в пуле подписи, если он запущен, иначе в потоке.
+        """
+        try:
+            if self.signer is not None:
+                return await self.signer.sign(transaction)
+            return await asyncio.to_thread(self.w3.eth.account.sign_transaction, transaction, self._private_key)
+        except Exception as e:
+            raise W3TransactionSignError(f"Ошибка при подписании транзакции: {e}")
+
+
+    async def iter_signed_txs(self, transactions):
+        """Подписанные транзакции по порядку, по мере готовности: отправку можно начинать до конца подписи."""
+        if self.signer is None:
+            for transaction in transactions:
+                yield await self.sign_tx_async(transaction)
+            return
+        try:
+            async for signed in self.signer.iter_signed(transactions):
+                yield signed
+        except Exception as e:
+            raise W3TransactionSignError(f"Ошибка при подписании транзакции: {e}")
+
+
+    async def send_signed_tx(self, signed_raw_tx, nonce, resync_nonce=True):
+        """
+        resync_nonce=False - для замен с уже выданным nonce: отказ узла принять замену
+        не говорит о рассинхронизации счётчика nonce.
+        """
+        try:
+            tx_hash_bytes = await self.w3.eth.send_raw_transaction(signed_raw_tx)
+            self.nonce_manager.mark_sent(nonce)
+            logger.success(
+                f"✅ Транзакция транслирована в блокчейн. Ждём подтверждения: {self.explorer_url}/tx/{tx_hash_bytes.hex()}")
+        except Exception as e:
+            if resync_nonce:
+                await self.nonce_manager.resync()
+            raise W3TransactionSendError(f"Ошибка при отправке транзакции : {e}")
+        return self.w3.to_hex(tx_hash_bytes)
+
+
     @w3_error_handler
     @retry(max_retries=3, retry_delay=2)
-    async def sign_and_send_tx(self, transaction, without_gas=False):
+    async def sign_and_send_tx(self, transaction, without_gas=False, resync_nonce=True):
+        return await self.broadcast_tx(transaction, without_gas, resync_nonce)
+
+
+    async def broadcast_tx(self, transaction, without_gas=False, resync_nonce=True):
+        """
+        Подпись, запись в журнал и отправка транзакции без w3_error_handler: ошибка отправки
+        возвращается вызывающему коду как W3TransactionSendError, а не завершает программу.
+        Замены транзакций (тот же nonce) отправляются с resync_nonce=False.
+        """
         try:
             if not without_gas:
                 try:
-                    transaction['gas'] = int((await self.w3.eth.estimate_gas(transaction)) * 1.5)
+                    transaction['gas'] = await self.estimate_gas(transaction)
                 except Exception as e:
                     raise W3TransactionSignError(f"Ошибка при оценке газа: {e}")
 
+            signed = await self.sign_tx_async(transaction)
+            # подписанная транзакция попадает в журнал до отправки: после сбоя её можно найти и переотправить
+            self.journal_record(
+                transaction, STATE_SIGNED,
+                tx_hash=self.w3.to_hex(signed.hash), raw_tx=self.w3.to_hex(signed.rawTransaction),
+            )
             try:
-                signed_raw_tx = self.w3.eth.account.sign_transaction(transaction, self._private_key).rawTransaction
-            except Exception as e:
-                raise W3TransactionSignError(f"Ошибка при подписании транзакции: {e}")
+                tx_hash = await self.send_signed_tx(signed.rawTransaction, transaction['nonce'], resync_nonce)
+                self.journal_record(transaction, STATE_BROADCAST)
+                return tx_hash
+            except W3TransactionSendError as e:
+                if 'gas' in str(e).lower():
+                    # закэшированная оценка могла устареть - следующая транзакция этой формы оценится заново
+                    estimator = await self.get_gas_estimator()
+                    estimator.invalidate(await estimator.shape_key(transaction))
+                raise
+
+        except Exception as e:
+            raise W3TransactionSendError(f"Неизвестная ошибка при отправке транзакции: {e}") from e
+
+
+    def journal_record(self, transaction, state, **fields):
+        """
+        Запись перехода в журнал по ключу chain_id:адрес:nonce, общему для транзакции и её замен.
+        Ошибка журнала не должна останавливать отправку.
+        """
+        if self.journal is None:
+            return
+        key = transaction.get('key') or f"{transaction['chainId']}:{self.address}:{transaction['nonce']}"
+        try:
+            self.journal.record(key, state, address=self.address, nonce=transaction['nonce'], **fields)
+        except JournalStateError as e:
+            logger.warning(f"⚠️ {e}")
+
 
+    async def recover_pending(self):
+        """
+        После перезапуска: сверка журнала с сетью и переотправка транзакций, которые ещё в пути.
+        Возвращает их хэши, чтобы дождаться подтверждения через wait_tx.
+        """
+        if self.journal is None:
+            return []
+        in_flight = await self.journal.reconcile(self.w3, self.address)
+        for record in in_flight:
             try:
-                tx_hash_bytes = await self.w3.eth.send_raw_transaction(signed_raw_tx)
-                logger.success(
-                    f"✅ Транзакция транслирована в блокчейн. Ждём подтверждения: {self.explorer_url}/tx/{tx_hash_bytes.hex()}")
+                await self.w3.eth.send_raw_transaction(record['raw_tx'])
             except Exception as e:
-                raise W3TransactionSendError(f"Ошибка при отправке транзакции : {e}")
+                if "already known" not in str(e) and "nonce too low" not in str(e):
+                    logger.warning(f"⚠️ Транзакция {record['tx_hash']} из журнала не переотправлена: {e}")
+        if in_flight:
+            await self.nonce_manager.skip_to(max(record['nonce'] for record in in_flight) + 1)
+            logger.info(f"ℹ️ В журнале {len(in_flight)} транзакций в пути, ждём их подтверждения.")
+        return [record['tx_hash'] for record in in_flight]
 
-            return self.w3.to_hex(tx_hash_bytes)
 
-        except Exception as e:
-            raise W3TransactionSendError(f"Неизвестная ошибка при отправке транзакции: {e}") from e
+    async def replace_tx(self, transaction, fee_multiplier=1.125):
+        """
+        Переотправить транзакцию с тем же nonce и повышенными комиссиями.
+        """
+        replacement = bump_transaction_fees(transaction, fee_multiplier)
+        return await self.sign_and_send_tx(replacement, without_gas='gas' in replacement, resync_nonce=False)
+
+
+    async def cancel_tx(self, transaction, fee_multiplier=1.125):
+        """
+        Отменить зависшую транзакцию: перевод 0 на свой адрес с тем же nonce и повышенными комиссиями.
+        """
+        cancellation = bump_transaction_fees(transaction, fee_multiplier)
+        cancellation.update({'to': self.address, 'value': 0, 'gas': 21000})
+        cancellation.pop('data', None)
+        return await self.sign_and_send_tx(cancellation, without_gas=True, resync_nonce=False)
 
 
     @w3_error_handler
     @retry(max_retries=3, retry_delay=2)
-    async def wait_tx(self, tx_hash):
+    async def wait_tx(self, tx_hash, timeout=120):
         try:
-            total_time = 0
-            timeout = 120
-            poll_latency = 10
-
-            while True:
-                try:
-                    receipts = await self.w3.eth.get_transaction_receipt(tx_hash)
-                    status = receipts.get("status")
-                    if status == 1:
-                        logger.success(f"✅ Транзакция успешно завершена: {self.explorer_url}/tx/{tx_hash}")
-                        return True
-                    elif status is None:
-                        await asyncio.sleep(poll_latency)
-                    else:
-                        logger.error(f"❌ Транзакция не удалась: {self.explorer_url}/tx/{tx_hash}")
-                        return False
-                except TransactionNotFound:
-                    if total_time > timeout:
-                        raise W3TransactionTimeoutError(f"Транзакция не завершена за {timeout} секунд.")
-                    total_time += poll_latency
-                    await asyncio.sleep(poll_latency)
+            tracker = await self.get_receipt_tracker()
+            receipt = await tracker.wait(tx_hash, timeout)
+            await self.note_block(receipt["blockNumber"])
+            record = self.journal.find_by_hash(tx_hash) if self.journal else None
+            if record:
+                self.journal_record(
+                    record, STATE_INCLUDED, block=receipt["blockNumber"], status=receipt["status"]
+                )
+            if receipt.get("status") == 1:
+                logger.success(f"✅ Транзакция успешно завершена: {self.explorer_url}/tx/{tx_hash}")
+                return True
+            logger.error(f"❌ Транзакция не удалась: {self.explorer_url}/tx/{tx_hash}")
+            return False
 
         except Exception as e:
             raise W3TransactionReceiptError(f"Ошибка при получении данных о транзакции: {e}") from e
\ No newline at end of file
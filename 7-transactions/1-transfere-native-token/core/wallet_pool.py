@@ -0,0 +1,137 @@
+import asyncio
+import time
+from eth_account import Account
+from logger import logger
+from w3_client import W3Client, create_rpc_session
+
+
+class PoolWallet:
+    """Кошелёк пула: свой W3Client со своим NonceManager и свой лимит параллельно готовящихся транзакций."""
+
+    def __init__(self, client, max_concurrency):
+        self.client = client
+        self.semaphore = asyncio.Semaphore(max_concurrency)
+        self.send_lock = asyncio.Lock()
+        self.sent = 0
+        self.errors = 0
+
+
+class WalletPool:
+    """
+    Параллельная отправка с множества кошельков через одну настроенную HTTP сессию.
+    Ошибка одного кошелька не останавливает остальные: отправка идёт без w3_error_handler,
+    ошибки собираются в результат.
+    """
+
+    def __init__(
+        self,
+        base_url,
+        explorer_url,
+        proxy=None,
+        eip_1559=True,
+        per_wallet_concurrency=4,
+        connection_limit=100,
+    ):
+        self.base_url = base_url
+        self.explorer_url = explorer_url
+        self.proxy = proxy
+        self.eip_1559 = eip_1559
+        self.per_wallet_concurrency = per_wallet_concurrency
+        self.connection_limit = connection_limit
+        self.wallets = []
+        self._session = None
+
+    async def __aenter__(self):
+        self._session = create_rpc_session(self.connection_limit)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        for wallet in self.wallets:
+            await wallet.client.__aexit__(exc_type, exc_val, exc_tb)
+        self.wallets = []
+        if self._session:
+            await self._session.close()
+            self._session = None
+
+    async def add_wallet(self, private_key, client_name=None, address=None):
+        """address можно передать, если он уже известен (например, из KeyStore): адрес не вычисляется из ключа."""
+        client_name = client_name or f"Wallet-{len(self.wallets) + 1}"
+        client = W3Client(
+            self.base_url, self.explorer_url, self.proxy, client_name, self.eip_1559,
+            session=self._session,
+        )
+        await client.connect()
+        client.set_address(address or Account.from_key(private_key).address)
+        client.set_private_key(private_key)
+        wallet = PoolWallet(client, self.per_wallet_concurrency)
+        self.wallets.append(wallet)
+        return wallet
+
+    async def add_wallets(self, private_keys):
+        return [await self.add_wallet(private_key) for private_key in private_keys]
+
+    async def add_keystore(self, keystore, addresses=None):
+        """
+        Кошельки из KeyStore: ключи расшифровываются параллельно в пуле процессов,
+        затем кошельки подключаются по одному к общей сессии.
+        """
+        addresses = await keystore.unlock(addresses)
+        return [
+            await self.add_wallet(await keystore.get_private_key(address), address=address)
+            for address in addresses
+        ]
+
+    async def _send_one(self, wallet, recipient, amount, chain_id, fees):
+        client = wallet.client
+        async with wallet.semaphore:
+            transaction = client.build_tx(recipient, amount, None, chain_id, fees)
+            try:
+                transaction['gas'] = await client.estimate_gas(transaction)
+            except Exception as e:
+                wallet.errors += 1
+                logger.error(f"❌ {client.client_name}: транзакция на {recipient} не подготовлена: {e}")
+                return e
+            # nonce выдаётся и транзакция уходит в сеть под замком кошелька: узлы получают nonce строго по порядку
+            async with wallet.send_lock:
+                transaction['nonce'] = await client.nonce_manager.reserve()
+                try:
+                    signed = await client.sign_tx_async(transaction)
+                except Exception as e:
+                    await client.nonce_manager.release(transaction['nonce'])
+                    wallet.errors += 1
+                    logger.error(f"❌ {client.client_name}: транзакция на {recipient} не подписана: {e}")
+                    return e
+                try:
+                    tx_hash = await client.send_signed_tx(signed.rawTransaction, transaction['nonce'])
+                except Exception as e:
+                    wallet.errors += 1
+                    logger.error(f"❌ {client.client_name}: транзакция на {recipient} не отправлена: {e}")
+                    return e
+            wallet.sent += 1
+            return tx_hash
+
+    async def send(self, transfers):
+        """
+        transfers - список (получатель, сумма в eth). Переводы распределяются по кошелькам по кругу,
+        каждый кошелёк отправляет не больше per_wallet_concurrency транзакций одновременно.
+        Возвращает (список хэшей или ошибок в порядке transfers, транзакций в секунду).
+        """
+        if not self.wallets:
+            raise ValueError("В пуле нет кошельков.")
+        # chain_id и комиссии общие для всех кошельков: запрашиваем один раз на всю пачку
+        chain_id, fees = await asyncio.gather(
+            self.wallets[0].client.get_chain_id(), self.wallets[0].client.get_fees()
+        )
+        start_time = time.perf_counter()
+        results = await asyncio.gather(*(
+            self._send_one(self.wallets[index % len(self.wallets)], recipient, amount, chain_id, fees)
+            for index, (recipient, amount) in enumerate(transfers)
+        ))
+        elapsed = time.perf_counter() - start_time
+        sent = sum(1 for result in results if isinstance(result, str))
+        tx_per_second = sent / elapsed if elapsed else 0.0
+        logger.info(
+            f"ℹ️ Отправлено {sent} из {len(transfers)} транзакций с {len(self.wallets)} кошельков, "
+            f"{tx_per_second:.1f} tx/сек"
+        )
+        return results, tx_per_second
@@ -0,0 +1,139 @@
+import asyncio
+import time
+from collections import OrderedDict
+from address_validator import to_checksum_address
+from rpc_batch import rpc_batch_calls, to_int
+
+
+class WalletState:
+    """Баланс (wei) и nonce адреса на блоке block."""
+
+    __slots__ = ("address", "balance", "nonce", "block")
+
+    def __init__(self, address, balance, nonce, block):
+        self.address = address
+        self.balance = balance
+        self.nonce = nonce
+        self.block = block
+
+    def __repr__(self):
+        return f"WalletState({self.address}, balance={self.balance}, nonce={self.nonce}, block={self.block})"
+
+
+class WalletStateCache:
+    """
+    Кэш балансов и nonce по (сеть, адрес, блок), общий для всех клиентов одной сети.
+    Номер блока проверяется не чаще раза в block_time секунд, а с новым блоком запрошенные
+    адреса вместе с недавно читавшимися (за watch_ttl секунд) обновляются одним пакетом
+    eth_getBalance + eth_getTransactionCount на этот блок. Повторные чтения в пределах блока
+    обходятся без запросов к RPC. Отслеживается не больше max_watched последних адресов (LRU).
+    """
+
+    def __init__(self, chain_id, block_time=1.0, batch_size=100, watch_ttl=60, max_watched=10_000):
+        self.chain_id = chain_id
+        self.block_time = block_time
+        self.batch_size = batch_size
+        self.watch_ttl = watch_ttl
+        self.max_watched = max_watched
+        self._states = {}
+        # адрес -> время последнего чтения, от давних к недавним
+        self._watched = OrderedDict()
+        self._block = None
+        self._block_checked_at = 0
+        self._block_lock = asyncio.Lock()
+        self._refresh_lock = asyncio.Lock()
+        self.requests = 0
+
+    def note_block(self, block_number):
+        """
+        Известно о блоке новее кэша (например, из квитанции): блок кэша сдвигается на него,
+        и следующее чтение запросит номер блока.
+        """
+        if self._block is None or block_number > self._block:
+            self._block = block_number
+            self._block_checked_at = 0
+
+    async def _current_block(self, w3):
+        if time.monotonic() - self._block_checked_at < self.block_time:
+            return self._block
+        async with self._block_lock:
+            # пока ждали блокировку, номер блока мог обновить другой клиент
+            if time.monotonic() - self._block_checked_at >= self.block_time:
+                self.requests += 1
+                block = to_int(await w3.manager.coro_request("eth_blockNumber", []))
+                # узлы за балансировщиком могут ответить блоком старше уже виденного
+                self._block = block if self._block is None else max(self._block, block)
+                self._block_checked_at = time.monotonic()
+        return self._block
+
+    def _watch(self, addresses):
+        now = time.monotonic()
+        for address in addresses:
+            self._watched[address] = now
+            self._watched.move_to_end(address)
+        # адреса текущего запроса не вытесняются, даже если их больше max_watched
+        while len(self._watched) > max(self.max_watched, len(addresses)):
+            address, _ = self._watched.popitem(last=False)
+            self._states.pop(address, None)
+
+    def _recent(self):
+        cutoff = time.monotonic() - self.watch_ttl
+        recent = []
+        for address, watched_at in reversed(self._watched.items()):
+            if watched_at < cutoff:
+                break
+            recent.append(address)
+        return recent
+
+    def _stale(self, addresses, block):
+        return [address for address in addresses if address not in self._states or self._states[address].block < block]
+
+    async def _refresh(self, w3, block, addresses):
+        # один проход цикла событий: параллельные чтения успевают добавить свои адреса в пакет
+        await asyncio.sleep(0)
+        async with self._refresh_lock:
+            # запрошенные и недавно читавшиеся адреса: параллельные чтения попадут в один пакет,
+            # а давно не нужные адреса не утяжеляют каждый новый блок
+            stale = self._stale(dict.fromkeys(addresses + self._recent()), block)
+            if not stale:
+                return
+            block_id = hex(block)
+            calls = []
+            for address in stale:
+                calls.append(("eth_getBalance", [address, block_id]))
+                calls.append(("eth_getTransactionCount", [address, block_id]))
+            self.requests += 1
+            results = await rpc_batch_calls(w3, calls, self.batch_size)
+            for index, address in enumerate(stale):
+                self._states[address] = WalletState(
+                    address, to_int(results[2 * index]), to_int(results[2 * index + 1]), block
+                )
+
+    async def get_many(self, w3, addresses):
+        """Состояния адресов на последнем известном блоке: {checksum адрес: WalletState}."""
+        addresses = list(dict.fromkeys(to_checksum_address(address) for address in addresses))
+        self._watch(addresses)
+        block = await self._current_block(w3)
+        if self._stale(addresses, block):
+            await self._refresh(w3, block, addresses)
+        return {address: self._states[address] for address in addresses}
+
+    async def get(self, w3, address):
+        address = to_checksum_address(address)
+        return (await self.get_many(w3, [address]))[address]
+
+    def unwatch(self, address):
+        address = to_checksum_address(address)
+        self._watched.pop(address, None)
+        self._states.pop(address, None)
+
+
+_caches = {}
+
+
+def get_wallet_state_cache(chain_id):
+    """Общий WalletStateCache сети: клиенты с разными подключениями к одной сети делят один кэш."""
+    cache = _caches.get(chain_id)
+    if cache is None:
+        cache = _caches[chain_id] = WalletStateCache(chain_id)
+    return cache
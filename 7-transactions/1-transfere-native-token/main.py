@@ -6,11 +6,12 @@ from web3 import Web3
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'core')))
 import asyncio
-from core import W3Client, logger, is_value_valid, wait_until_confirm
+from core import W3Client, TxJournal, PendingTxManager, logger, is_value_valid, wait_until_confirm
 from core import (
     ERC20AddressIncorrect,
     ERC20AddressAlreadySet,
     PrivateKeyIncorrect,
+    W3TransactionTimeoutError,
     )
 
 
@@ -63,17 +64,24 @@ def get_amount_to_send(message):
             sys.exit(130)
 
 
-async def update_balance(w3_client):
-    balance_wei = await w3_client.get_balance()
-    balance_eth = w3_client.w3.from_wei(balance_wei, 'ether')
-    return balance_wei, balance_eth
+async def update_balances(sender, recipient):
+    """
+    Балансы отправителя и получателя одним пакетом запросов на текущий блок.
+    Повторный вызов в том же блоке берёт значения из кэша без обращения к RPC.
+    """
+    states = await sender.get_wallet_states([sender.address, recipient.address])
+    sender_balance_wei = states[sender.address].balance
+    recipient_balance_wei = states[recipient.address].balance
+    return sender_balance_wei, sender.w3.from_wei(sender_balance_wei, 'ether'), \
+        recipient_balance_wei, sender.w3.from_wei(recipient_balance_wei, 'ether')
 
-async def quantity_check(w3_client, transaction):
+async def quantity_check(w3_client, transaction, balance_wei):
     """
     Эта функция поможет нам понять - не превышает ли (сумму перевода + gas), баланс отправителя.
+    Лимит газа записывается в транзакцию, поэтому при отправке газ повторно не оценивается.
     """
     try:
-        check = int((await w3_client.w3.eth.estimate_gas(transaction)) * 1.5)
+        gas = await w3_client.estimate_gas(transaction)
     except ValueError as e:
         if "insufficient funds" in str(e):
             logger.error("❌ Недостаточно средств для выполнения транзакции. Пополните баланс или уменьшите сумму перевода.")
@@ -81,7 +89,13 @@ async def quantity_check(w3_client, transaction):
         else:
             logger.error(f"❌ Ошибка оценки: {str(e)}")
             return False
-    return check
+
+    fee_per_gas = transaction['maxFeePerGas'] if 'maxFeePerGas' in transaction else transaction['gasPrice']
+    if transaction['value'] + gas * fee_per_gas > balance_wei:
+        logger.error("❌ Недостаточно средств для выполнения транзакции. Пополните баланс или уменьшите сумму перевода.")
+        return False
+    transaction['gas'] = gas
+    return gas
 
 
 async def main():
@@ -89,19 +103,29 @@ async def main():
     explorer_url = "https://arbiscan.io"
     proxy = None
     eip_1559 = True
+    # журнал отправленных транзакций: после сбоя незавершённые транзакции будут найдены и дождёмся их
+    journal_file = "transactions.sqlite"
 
 
     logger.warning("⚠️ Для запуска желательно использовать терминал, вместо консоли IDE, в этом случае ввод приватного ключа будет скрыт.")
-    async with W3Client(base_url, explorer_url, proxy, "Sender", eip_1559) as sender, \
+    with TxJournal(journal_file) as journal:
+        await send_native_token(base_url, explorer_url, proxy, eip_1559, journal)
+
+
+async def send_native_token(base_url, explorer_url, proxy, eip_1559, journal):
+    async with W3Client(base_url, explorer_url, proxy, "Sender", eip_1559, journal=journal) as sender, \
                W3Client(base_url, explorer_url, proxy, "Recipient", eip_1559) as recipient:
 
         set_client_address(sender, "📢 Введите адрес отправителя :")
         set_client_private_key(sender, "📢 Введите приватный ключ отправителя (⚠️ ввод будет скрыт, после ввода нажмите Enter) :")
+        for tx_hash in await sender.recover_pending():
+            await sender.wait_tx(tx_hash)
+
         set_client_address(recipient, "📢 Введите адрес получателя :")
 
         while True:
-            sender_balance_wei, sender_balance_eth = await update_balance(sender)
-            recipient_balance_wei, recipient_balance_eth = await update_balance(recipient)
+            sender_balance_wei, sender_balance_eth, recipient_balance_wei, recipient_balance_eth = \
+                await update_balances(sender, recipient)
 
             logger.info(f"💰 Баланс отправителя: {sender_balance_eth:.5f} eth")
             logger.info(f"💰 Баланс получателя: {recipient_balance_eth:.5f} eth")
@@ -111,9 +135,10 @@ async def main():
 
             transaction = await sender.prepare_tx(recipient.address, amount_eth)
 
-            gas = await quantity_check(sender, transaction)
+            gas = await quantity_check(sender, transaction, sender_balance_wei)
 
             if not gas:
+                await sender.nonce_manager.release(transaction['nonce'])
                 continue
             break
 
@@ -128,11 +153,21 @@ async def main():
         logger.info(f"ℹ️ {gas_cost_eth:.20f} eth плата за газ. ✅ Средств на кошельке достаточно для отправки. ✅ Средств достаточно для покрытия платы за газ.")
 
         if wait_until_confirm("📢 Подтвердите отправку средств (y/n): "):
-            tx_hash = await sender.sign_and_send_tx(transaction)
-            await sender.wait_tx(tx_hash)
-
-            sender_balance_wei, sender_balance_eth = await update_balance(sender)
-            recipient_balance_wei, recipient_balance_eth = await update_balance(recipient)
+            tx_hash = await sender.sign_and_send_tx(transaction, without_gas=True)
+            # если комиссии вырастут, транзакция будет заменена такой же с повышенной комиссией
+            pending = PendingTxManager(sender)
+            transfer = pending.track(transaction, tx_hash)
+            try:
+                receipt = await pending.wait(transfer)
+            except W3TransactionTimeoutError as e:
+                logger.error(f"❌ {e}")
+                return
+            if receipt["status"] != 1:
+                logger.error(f"❌ Транзакция не удалась: {sender.explorer_url}/tx/{transfer.tx_hash}")
+                return
+
+            sender_balance_wei, sender_balance_eth, recipient_balance_wei, recipient_balance_eth = \
+                await update_balances(sender, recipient)
 
             logger.info(f"💰 Баланс отправителя: {sender_balance_eth:.5f} eth")
             logger.info(f"💰 Баланс получателя: {recipient_balance_eth:.5f} eth")
@@ -0,0 +1,50 @@
+import sys
+import os
+import asyncio
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), 'core')))
+from core import ChainClientManager, validate_addresses, logger
+
+
+async def main():
+    # None - все сети из core/chains.py
+    chains = None
+    proxy = None
+    # адреса кошельков через запятую
+    addresses = input("📢 Введите адреса кошельков через запятую :").split(",")
+
+    checksums = validate_addresses(address.strip() for address in addresses)
+    if None in checksums:
+        logger.error("❌ Среди адресов есть некорректные.")
+        return
+    addresses = list(dict.fromkeys(checksums))
+
+    started = time.perf_counter()
+    async with ChainClientManager(chains, proxy) as manager:
+        logger.info(f"ℹ️ Подключение к сетям: {time.perf_counter() - started:.2f} сек")
+
+        started = time.perf_counter()
+        balances, blocks = await asyncio.gather(manager.get_balances(addresses), manager.get_block_info())
+        logger.info(f"ℹ️ Балансы и блоки во всех сетях: {time.perf_counter() - started:.2f} сек")
+
+        for chain in manager.chains:
+            if chain.name not in manager.clients:
+                continue
+            chain_balances, block = balances[chain.name], blocks[chain.name]
+            if isinstance(block, Exception):
+                logger.warning(f"⚠️ {chain.name}: не удалось получить блок: {block!r}")
+            else:
+                block_time = datetime.fromtimestamp(block['timestamp'], timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+                logger.info(f"🧱 {chain.name}: блок {block['number']} от {block_time}, транзакций {block['transactions']}")
+            if isinstance(chain_balances, Exception):
+                logger.warning(f"⚠️ {chain.name}: не удалось получить балансы: {chain_balances!r}")
+                continue
+            for address, balance in chain_balances.items():
+                if balance:
+                    logger.info(f"💰 {chain.name} {address}: {balance / 10**18:.6f} {chain.symbol}")
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,6 @@
+import os
+import sys
+
+LESSON_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+sys.path.append(os.path.join(LESSON_DIR, "core"))
+sys.path.append(LESSON_DIR)
@@ -0,0 +1,115 @@
+"""
+Контракты для проверок на локальной сети (anvil / eth-tester из bench_send.LocalNode).
+solc в окружении проверок нет, поэтому runtime байткод берётся готовым и разворачивается
+через минимальный init code, который копирует runtime в память и возвращает его.
+"""
+from eth_account import Account
+
+# Runtime байткод Multicall3 как в каноническом развёртывании 0xcA11bde05977b3631167028862bE2a173976CA11
+# (solc 0.8.12): проверяется настоящий контракт, а не его упрощённая копия
+MULTICALL3_RUNTIME = bytes.fromhex(
+    "6080604052600436106100f35760003560e01c80634d2301cc1161008a578063a8b0574e11610059578063a8b0574e146102"
+    "5a578063bce38bd714610275578063c3077fa914610288578063ee82ac5e1461029b57600080fd5b80634d2301cc146101ec"
+    "57806372425d9d1461022157806382ad56cb1461023457806386d516e81461024757600080fd5b80633408e470116100c657"
+    "80633408e47014610191578063399542e9146101a45780633e64a696146101c657806342cbb15c146101d957600080fd5b80"
+    "630f28c97d146100f8578063174dea711461011a578063252dba421461013a57806327e86d6e1461015b575b600080fd5b34"
+    "801561010457600080fd5b50425b6040519081526020015b60405180910390f35b61012d610128366004610a85565b6102ba"
+    "565b6040516101119190610bbe565b61014d610148366004610a85565b6104ef565b604051610111929190610bd8565b3480"
+    "1561016757600080fd5b50437fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffff0140610107"
+    "565b34801561019d57600080fd5b5046610107565b6101b76101b2366004610c60565b610690565b60405161011193929190"
+    "610cba565b3480156101d257600080fd5b5048610107565b3480156101e557600080fd5b5043610107565b3480156101f857"
+    "600080fd5b50610107610207366004610ce2565b73ffffffffffffffffffffffffffffffffffffffff163190565b34801561"
+    "022d57600080fd5b5044610107565b61012d610242366004610a85565b6106ab565b34801561025357600080fd5b50456101"
+    "07565b34801561026657600080fd5b50604051418152602001610111565b61012d610283366004610c60565b61085a565b61"
+    "01b7610296366004610a85565b610a1a565b3480156102a757600080fd5b506101076102b6366004610d18565b4090565b60"
+    "606000828067ffffffffffffffff8111156102d8576102d8610d31565b604051908082528060200260200182016040528015"
+    "61031e57816020015b6040805180820190915260008152606060208201528152602001906001900390816102f65790505b50"
+    "92503660005b8281101561047757600085828151811061034157610341610d60565b60200260200101519050878783818110"
+    "61035d5761035d610d60565b905060200281019061036f9190610d8f565b6040810135958601959093506103886020850185"
+    "610ce2565b73ffffffffffffffffffffffffffffffffffffffff16816103ac6060870187610dcd565b6040516103ba929190"
+    "610e32565b60006040518083038185875af1925050503d80600081146103f7576040519150601f19603f3d01168201604052"
+    "3d82523d6000602084013e6103fc565b606091505b50602080850191909152901515808452908501351761046d577f08c379"
+    "a000000000000000000000000000000000000000000000000000000000600052602060045260176024527f4d756c74696361"
+    "6c6c333a2063616c6c206661696c656400000000000000000060445260846000fd5b5050600101610325565b508234146104"
+    "e6576040517f08c379a000000000000000000000000000000000000000000000000000000000815260206004820152601a60"
+    "248201527f4d756c746963616c6c333a2076616c7565206d69736d6174636800000000000060448201526064015b60405180"
+    "910390fd5b50505092915050565b436060828067ffffffffffffffff81111561050c5761050c610d31565b60405190808252"
+    "806020026020018201604052801561053f57816020015b606081526020019060019003908161052a5790505b509150366000"
+    "5b8281101561068657600087878381811061056257610562610d60565b90506020028101906105749190610e42565b925061"
+    "05836020840184610ce2565b73ffffffffffffffffffffffffffffffffffffffff166105a66020850185610dcd565b604051"
+    "6105b4929190610e32565b6000604051808303816000865af19150503d80600081146105f1576040519150601f19603f3d01"
+    "1682016040523d82523d6000602084013e6105f6565b606091505b5086848151811061060957610609610d60565b60209081"
+    "0291909101015290508061067d576040517f08c379a000000000000000000000000000000000000000000000000000000000"
+    "815260206004820152601760248201527f4d756c746963616c6c333a2063616c6c206661696c656400000000000000000060"
+    "448201526064016104dd565b50600101610546565b5050509250929050565b43804060606106a086868661085a565b905093"
+    "509350939050565b6060818067ffffffffffffffff8111156106c7576106c7610d31565b6040519080825280602002602001"
+    "8201604052801561070d57816020015b60408051808201909152600081526060602082015281526020019060019003908161"
+    "06e55790505b5091503660005b828110156104e657600084828151811061073057610730610d60565b602002602001015190"
+    "5086868381811061074c5761074c610d60565b905060200281019061075e9190610e76565b925061076d6020840184610ce2"
+    "565b73ffffffffffffffffffffffffffffffffffffffff166107906040850185610dcd565b60405161079e929190610e3256"
+    "5b6000604051808303816000865af19150503d80600081146107db576040519150601f19603f3d011682016040523d82523d"
+    "6000602084013e6107e0565b606091505b506020808401919091529015158083529084013517610851577f08c379a0000000"
+    "00000000000000000000000000000000000000000000000000600052602060045260176024527f4d756c746963616c6c333a"
+    "2063616c6c206661696c656400000000000000000060445260646000fd5b50600101610714565b6060818067ffffffffffff"
+    "ffff81111561087657610876610d31565b6040519080825280602002602001820160405280156108bc57816020015b604080"
+    "5180820190915260008152606060208201528152602001906001900390816108945790505b5091503660005b82811015610a"
+    "105760008482815181106108df576108df610d60565b602002602001015190508686838181106108fb576108fb610d60565b"
+    "905060200281019061090d9190610e42565b925061091c6020840184610ce2565b73ffffffffffffffffffffffffffffffff"
+    "ffffffff1661093f6020850185610dcd565b60405161094d929190610e32565b6000604051808303816000865af19150503d"
+    "806000811461098a576040519150601f19603f3d011682016040523d82523d6000602084013e61098f565b606091505b5060"
+    "20830152151581528715610a07578051610a07576040517f08c379a000000000000000000000000000000000000000000000"
+    "000000000000815260206004820152601760248201527f4d756c746963616c6c333a2063616c6c206661696c656400000000"
+    "000000000060448201526064016104dd565b506001016108c3565b5050509392505050565b6000806060610a2b6001868661"
+    "0690565b919790965090945092505050565b60008083601f840112610a4b57600080fd5b50813567ffffffffffffffff8111"
+    "15610a6357600080fd5b6020830191508360208260051b8501011115610a7e57600080fd5b9250929050565b600080602083"
+    "85031215610a9857600080fd5b823567ffffffffffffffff811115610aaf57600080fd5b610abb85828601610a39565b9096"
+    "9095509350505050565b6000815180845260005b81811015610aed57602081850181015186830182015201610ad1565b8181"
+    "1115610aff576000602083870101525b50601f017fffffffffffffffffffffffffffffffffffffffffffffffffffffffffff"
+    "ffffe0169290920160200192915050565b600082825180855260208086019550808260051b84010181860160005b84811015"
+    "610bb1578583037fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffe001895281518051151584"
+    "528401516040858501819052610b9d81860183610ac7565b9a86019a9450505090830190600101610b4f565b509097965050"
+    "5050505050565b602081526000610bd16020830184610b32565b9392505050565b6000604082018483526020604081850152"
+    "81855180845260608601915060608160051b870101935082870160005b82811015610c52577fffffffffffffffffffffffff"
+    "ffffffffffffffffffffffffffffffffffffffa0888703018452610c40868351610ac7565b95509284019290840190600101"
+    "610c06565b509398975050505050505050565b600080600060408486031215610c7557600080fd5b83358015158114610c85"
+    "57600080fd5b9250602084013567ffffffffffffffff811115610ca157600080fd5b610cad86828701610a39565b94979096"
+    "50939450505050565b838152826020820152606060408201526000610cd96060830184610b32565b95945050505050565b60"
+    "0060208284031215610cf457600080fd5b813573ffffffffffffffffffffffffffffffffffffffff81168114610bd1576000"
+    "80fd5b600060208284031215610d2a57600080fd5b5035919050565b7f4e487b710000000000000000000000000000000000"
+    "0000000000000000000000600052604160045260246000fd5b7f4e487b710000000000000000000000000000000000000000"
+    "0000000000000000600052603260045260246000fd5b600082357fffffffffffffffffffffffffffffffffffffffffffffff"
+    "ffffffffffffffff81833603018112610dc357600080fd5b9190910192915050565b60008083357fffffffffffffffffffff"
+    "ffffffffffffffffffffffffffffffffffffffffffe1843603018112610e0257600080fd5b83018035915067ffffffffffff"
+    "ffff821115610e1d57600080fd5b602001915036819003821315610a7e57600080fd5b818382376000910190815291905056"
+    "5b600082357fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffc1833603018112610dc3576000"
+    "80fd5b600082357fffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffffa1833603018112610dc357"
+    "600080fdfea2646970667358221220bb2b5c71a328032f97c676ae39a1ec2148d3e5d6f73d95e9b17910152d61f16264736f"
+    "6c634300080c0033"
+)
+
+# ERC-20 заглушка: balanceOf(address) на любой селектор возвращает адрес по модулю 1000
+# PUSH1 4 CALLDATALOAD PUSH2 1000 SWAP1 MOD PUSH1 0 MSTORE PUSH1 32 PUSH1 0 RETURN
+TOKEN_RUNTIME = bytes.fromhex("6004356103e8900660005260206000f3")
+TOKEN_BALANCE_MODULO = 1000
+
+
+def init_code(runtime):
+    """PUSH2 len DUP1 PUSH2 13 PUSH1 0 CODECOPY PUSH1 0 RETURN + runtime."""
+    return b"\x61" + len(runtime).to_bytes(2, "big") + bytes.fromhex("8061000d6000396000f3") + runtime
+
+
+async def deploy(w3, private_key, runtime):
+    account = Account.from_key(private_key)
+    transaction = {
+        "chainId": await w3.eth.chain_id,
+        "nonce": await w3.eth.get_transaction_count(account.address),
+        "gas": 2_000_000,
+        "gasPrice": await w3.eth.gas_price * 2,
+        "data": init_code(runtime),
+        "value": 0,
+    }
+    tx_hash = await w3.eth.send_raw_transaction(account.sign_transaction(transaction).rawTransaction)
+    receipt = await w3.eth.wait_for_transaction_receipt(tx_hash)
+    assert receipt["status"] == 1
+    assert await w3.eth.get_code(receipt["contractAddress"]) == runtime
+    return receipt["contractAddress"]
@@ -0,0 +1,30 @@
+from eth_account import Account
+from eth_utils import is_checksum_address, to_checksum_address as eth_utils_checksum
+from address_validator import checksum_or_none, is_address, to_checksum_address, validate_addresses
+
+CHECKSUM = "0x5aAeb6053F3E94C9b9A09f33669435E7Ef1BeAed"
+
+
+def test_checksum_matches_eth_utils():
+    addresses = [Account.create().address for _ in range(200)]
+    for address in addresses:
+        assert to_checksum_address(address.lower()) == eth_utils_checksum(address)
+    assert validate_addresses(address.upper().replace("0X", "0x") for address in addresses) == addresses
+
+
+def test_mixed_case_with_wrong_checksum_is_rejected():
+    typo = CHECKSUM[:-1] + CHECKSUM[-1].swapcase()
+    assert not is_checksum_address(typo)
+    assert not is_address(typo)
+    assert validate_addresses([CHECKSUM, typo, CHECKSUM.lower()]) == [CHECKSUM, None, CHECKSUM]
+
+
+def test_invalid_addresses():
+    for address in ("0x123", "0x" + "g" * 40, None, 123, "0x" + "ф" * 40):
+        assert not is_address(address)
+
+
+def test_unhashable_input_is_invalid_not_type_error():
+    assert checksum_or_none(["0x" + "1" * 40]) is None
+    assert not is_address({"address": CHECKSUM})
+    assert validate_addresses([CHECKSUM, [CHECKSUM], {}, bytearray(20), 1]) == [CHECKSUM, None, None, None, None]
@@ -0,0 +1,36 @@
+import asyncio
+import aiohttp
+from web3.providers.async_base import AsyncJSONBaseProvider
+from web3.providers.eth_tester import AsyncEthereumTesterProvider
+import chains
+from chains import Chain, ChainClientManager
+
+
+class RateLimitedProvider(AsyncJSONBaseProvider):
+    async def make_request(self, method, params):
+        raise aiohttp.ClientResponseError(None, (), status=429, message="Too Many Requests")
+
+
+def test_unavailable_and_mismatched_chains_are_skipped_and_closed(monkeypatch):
+    closed = []
+
+    class TrackedClient(chains.W3Client):
+        async def __aexit__(self, exc_type, exc_val, exc_tb):
+            closed.append(self.client_name)
+            await super().__aexit__(exc_type, exc_val, exc_tb)
+
+    monkeypatch.setattr(chains, "W3Client", TrackedClient)
+
+    async def main():
+        manager = ChainClientManager(
+            [
+                Chain("limited", 1, [RateLimitedProvider()], "http://explorer"),
+                Chain("wrong-id", 1, [AsyncEthereumTesterProvider()], "http://explorer"),
+            ],
+            timeout=0.5,
+        )
+        async with manager:
+            assert manager.clients == {}
+        assert sorted(closed) == ["limited", "wrong-id"]
+
+    asyncio.run(main())
@@ -0,0 +1,32 @@
+import asyncio
+import time
+import pytest
+from decorators import retry, RetryBudget
+
+
+def test_hung_attempt_is_interrupted_and_retried():
+    calls = []
+
+    @retry(max_retries=3, retry_delay=0.01, deadline=1, attempt_timeout=0.2, budget=RetryBudget())
+    async def request():
+        calls.append(time.monotonic())
+        if len(calls) == 1:
+            # первая попытка зависает: прерывается по attempt_timeout и повторяется
+            await asyncio.sleep(10)
+        return "ok"
+
+    started = time.monotonic()
+    assert asyncio.run(request()) == "ok"
+    assert len(calls) == 2
+    assert time.monotonic() - started < 0.6
+
+
+def test_deadline_caps_total_time_of_hung_calls():
+    @retry(max_retries=5, retry_delay=0.01, deadline=0.3, classifier=lambda error: False, budget=RetryBudget())
+    async def request():
+        await asyncio.sleep(10)
+
+    started = time.monotonic()
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(request())
+    assert time.monotonic() - started < 1
@@ -0,0 +1,57 @@
+import asyncio
+from types import SimpleNamespace
+from fee_oracle import FeeOracle, get_fee_oracle
+
+
+class FakeEth:
+    def __init__(self, base_fees, gas_price=1_000, max_priority_fee=100):
+        self.base_fees = base_fees
+        self._gas_price = gas_price
+        self._max_priority_fee = max_priority_fee
+        self.calls = []
+
+    async def _value(self, method, value):
+        self.calls.append(method)
+        return value
+
+    @property
+    def gas_price(self):
+        return self._value("eth_gasPrice", self._gas_price)
+
+    @property
+    def max_priority_fee(self):
+        return self._value("eth_maxPriorityFeePerGas", self._max_priority_fee)
+
+    async def fee_history(self, block_count, newest_block, percentiles):
+        self.calls.append("eth_feeHistory")
+        return {"baseFeePerGas": self.base_fees, "reward": [[1, 5, 9]] * (len(self.base_fees) - 1)}
+
+
+def test_legacy_gas_price_from_eth_gas_price():
+    async def main():
+        eth = FakeEth([0, 0, 0], gas_price=3_000_000_000)
+        oracle = FeeOracle(SimpleNamespace(eth=eth))
+        prices = await asyncio.gather(*(oracle.get_gas_price() for _ in range(10)))
+        assert prices == [3_750_000_000] * 10
+        assert eth.calls == ["eth_gasPrice"]
+
+    asyncio.run(main())
+
+
+def test_zero_base_fee_history_falls_back_to_gas_price():
+    async def main():
+        eth = FakeEth([0, 0, 0], gas_price=1_000, max_priority_fee=100)
+        fees = await FeeOracle(SimpleNamespace(eth=eth)).get_fees("slow")
+        assert fees["maxPriorityFeePerGas"] == 100
+        assert fees["maxFeePerGas"] == int(900 * 1.125) + 100
+
+    asyncio.run(main())
+
+
+def test_oracle_shared_per_chain():
+    async def main():
+        first, second = SimpleNamespace(eth=FakeEth([1])), SimpleNamespace(eth=FakeEth([1]))
+        assert get_fee_oracle(first, 56) is get_fee_oracle(second, 56)
+        assert get_fee_oracle(first, 56) is not get_fee_oracle(first, 1)
+
+    asyncio.run(main())
@@ -0,0 +1,77 @@
+import asyncio
+from types import SimpleNamespace
+from gas_estimator import GasEstimator, get_gas_estimator, L2_MARGIN
+
+TRANSFER = {"to": "0x0000000000000000000000000000000000000002", "value": 1, "chainId": 1, "nonce": 0}
+
+
+def make_w3(estimate_delay=0.05):
+    calls = []
+
+    async def estimate_gas(transaction):
+        calls.append(transaction)
+        await asyncio.sleep(estimate_delay)
+        return 21_000
+
+    async def get_code(address):
+        return b""
+
+    return SimpleNamespace(eth=SimpleNamespace(estimate_gas=estimate_gas, get_code=get_code)), calls
+
+
+def test_cancelled_first_caller_does_not_cancel_shared_estimate():
+    async def main():
+        w3, calls = make_w3()
+        estimator = GasEstimator(w3)
+        first = asyncio.create_task(estimator.estimate(dict(TRANSFER)))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(estimator.estimate(dict(TRANSFER)))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        assert await second == int(21_000 * 1.2)
+        assert len(calls) == 1
+        # результат общего запроса попал в кэш, несмотря на отмену первого
+        assert await estimator.estimate(dict(TRANSFER)) == int(21_000 * 1.2)
+        assert len(calls) == 1
+
+    asyncio.run(main())
+
+
+def test_estimator_shared_per_chain_with_l2_margin():
+    async def main():
+        first, _ = make_w3()
+        second, _ = make_w3()
+        assert get_gas_estimator(first, 1) is get_gas_estimator(second, 1)
+        assert get_gas_estimator(first, 42161).margin == L2_MARGIN
+
+    asyncio.run(main())
+
+
+def test_code_cache_is_bounded_and_primed_in_one_batch():
+    async def main():
+        requests = []
+
+        async def coro_request(method, params):
+            requests.append((method, params))
+            return "0x6000" if params[0].endswith("c") else "0x"
+
+        async def get_code(address):
+            requests.append(("eth_getCode", [address]))
+            return b""
+
+        w3 = SimpleNamespace(
+            provider=None,
+            manager=SimpleNamespace(coro_request=coro_request),
+            eth=SimpleNamespace(get_code=get_code),
+        )
+        estimator = GasEstimator(w3, code_cache_size=3)
+        recipients = [f"0x{index:039x}a" for index in range(3)] + ["0x" + "0" * 39 + "c"]
+        await estimator.prime_code_cache(recipients + recipients)
+        assert [params[0] for _, params in requests] == recipients
+        # LRU: в кэше остаются 3 последних адреса, первый вытеснен
+        assert list(estimator._code_cache) == recipients[1:]
+        assert await estimator._is_contract(recipients[-1]) is True
+        assert await estimator._is_contract(recipients[1]) is False
+        assert len(requests) == len(recipients)
+
+    asyncio.run(main())
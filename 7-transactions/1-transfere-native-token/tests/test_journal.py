@@ -0,0 +1,66 @@
+import asyncio
+from eth_account import Account
+from web3 import AsyncWeb3
+from web3.providers.eth_tester import AsyncEthereumTesterProvider
+import journal as journal_module
+from journal import TxJournal, STATE_SIGNED, STATE_BROADCAST, STATE_INCLUDED, STATE_FINAL
+from nonce_manager import bump_transaction_fees
+
+
+def test_reconcile_finds_mined_earlier_version_after_replacement(tmp_path):
+    async def main():
+        w3 = AsyncWeb3(AsyncEthereumTesterProvider())
+        account = Account.from_key(w3.provider.ethereum_tester.backend.account_keys[0].to_hex())
+        transaction = {
+            "chainId": await w3.eth.chain_id, "nonce": 0, "to": Account.create().address, "value": 1,
+            "gas": 21000, "gasPrice": await w3.eth.gas_price * 2,
+        }
+        original = account.sign_transaction(transaction)
+        replacement = account.sign_transaction(bump_transaction_fees(transaction))
+        key = f"{transaction['chainId']}:{account.address}:0"
+
+        with TxJournal(str(tmp_path / "journal.sqlite")) as journal:
+            journal.record(key, STATE_SIGNED, address=account.address, nonce=0, tx_hash=original.hash.hex())
+            journal.record(key, STATE_BROADCAST)
+            await w3.eth.send_raw_transaction(original.rawTransaction)
+            # замена подписана, но в блок уже попала исходная версия
+            journal.record(key, STATE_SIGNED, tx_hash=replacement.hash.hex())
+
+            assert await journal.reconcile(w3, account.address, finality_depth=0) == []
+            record = journal.get(key)
+            assert record["state"] == STATE_FINAL
+            assert record["tx_hash"] == w3.to_hex(original.hash)
+
+    asyncio.run(main())
+
+
+def test_reconcile_does_not_drop_tx_mined_between_nonce_and_receipt_queries(tmp_path, monkeypatch):
+    async def main():
+        w3 = AsyncWeb3(AsyncEthereumTesterProvider())
+        account = Account.from_key(w3.provider.ethereum_tester.backend.account_keys[0].to_hex())
+        transaction = {
+            "chainId": await w3.eth.chain_id, "nonce": 0, "to": Account.create().address, "value": 1,
+            "gas": 21000, "gasPrice": await w3.eth.gas_price * 2,
+        }
+        signed = account.sign_transaction(transaction)
+        key = f"{transaction['chainId']}:{account.address}:0"
+        rpc_batch = journal_module.rpc_batch
+
+        async def mine_after_first_batch(w3, method, params_list, batch_size=100):
+            result = await rpc_batch(w3, method, params_list, batch_size)
+            if not sent:
+                # транзакция попадает в блок между двумя запросами сверки
+                sent.append(await w3.eth.send_raw_transaction(signed.rawTransaction))
+            return result
+
+        sent = []
+        monkeypatch.setattr(journal_module, "rpc_batch", mine_after_first_batch)
+        with TxJournal(str(tmp_path / "journal.sqlite")) as journal:
+            journal.record(key, STATE_SIGNED, address=account.address, nonce=0, tx_hash=signed.hash.hex())
+            journal.record(key, STATE_BROADCAST)
+
+            assert await journal.reconcile(w3, account.address, finality_depth=0) == []
+            # блок новее прочитанного в начале сверки latest - included, а не dropped
+            assert journal.get(key)["state"] == STATE_INCLUDED
+
+    asyncio.run(main())
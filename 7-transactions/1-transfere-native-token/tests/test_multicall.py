@@ -0,0 +1,65 @@
+import asyncio
+from eth_account import Account
+from bench_send import LocalNode
+from w3_client import W3Client
+from multicall import MulticallAggregator, NATIVE_TOKEN, MULTICALL3_ADDRESS, get_multicall_address
+from dev_contracts import deploy, MULTICALL3_RUNTIME, TOKEN_RUNTIME, TOKEN_BALANCE_MODULO
+
+
+def run_on_dev_chain(check):
+    async def main():
+        with LocalNode(accounts=3) as node:
+            client = W3Client(node.url, "http://localhost", None, "multicall-test", True)
+            await node.connect(client)
+            try:
+                await check(client.w3, node.keys)
+            finally:
+                await client.close_session()
+    asyncio.run(main())
+
+
+def test_native_and_token_balances_match_direct_calls():
+    async def check(w3, keys):
+        multicall_address = await deploy(w3, keys[0], MULTICALL3_RUNTIME)
+        token = await deploy(w3, keys[0], TOKEN_RUNTIME)
+        funded = [Account.from_key(key).address for key in keys[:3]]
+        empty = [Account.create().address for _ in range(3)]
+        addresses = funded + empty
+
+        aggregator = MulticallAggregator(w3, multicall_address)
+        block = await w3.eth.block_number
+        balances = await aggregator.get_balances(
+            [(address, token_address) for address in addresses for token_address in (NATIVE_TOKEN, token)], block
+        )
+
+        for address in addresses:
+            # eth-tester списывает стоимость газа eth_call с отправителя по умолчанию (первый аккаунт) внутри вызова
+            if address != funded[0]:
+                assert balances[(address, NATIVE_TOKEN)] == await w3.eth.get_balance(address, block)
+            assert balances[(address, token)] == int(address, 16) % TOKEN_BALANCE_MODULO
+
+    run_on_dev_chain(check)
+
+
+def test_chunked_calls_and_failed_call():
+    async def check(w3, keys):
+        multicall_address = await deploy(w3, keys[0], MULTICALL3_RUNTIME)
+        # маленький лимит calldata: пары уходят несколькими aggregate3 параллельно
+        aggregator = MulticallAggregator(w3, multicall_address, max_calldata_bytes=1_000)
+        addresses = [Account.create().address for _ in range(25)]
+        balances = await aggregator.get_native_balances(addresses)
+        assert balances == {address: 0 for address in addresses}
+
+        # у "токена" без кода пустой ответ: баланс None, остальные вызовы не страдают
+        no_code = Account.create().address
+        result = await aggregator.get_balances([(addresses[0], no_code), (addresses[1], NATIVE_TOKEN)])
+        assert result == {(addresses[0], no_code): None, (addresses[1], NATIVE_TOKEN): 0}
+
+    run_on_dev_chain(check)
+
+
+def test_multicall_address_per_chain():
+    assert get_multicall_address(1) == MULTICALL3_ADDRESS
+    assert get_multicall_address(8453) == MULTICALL3_ADDRESS
+    # в zkSync Era канонического адреса нет
+    assert get_multicall_address(324) != MULTICALL3_ADDRESS
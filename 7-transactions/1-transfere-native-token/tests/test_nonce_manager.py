@@ -0,0 +1,46 @@
+import asyncio
+from types import SimpleNamespace
+from nonce_manager import NonceManager
+
+
+def make_manager(pending):
+    state = {"pending": pending}
+
+    async def get_transaction_count(address, block_identifier):
+        return state["pending"]
+
+    w3 = SimpleNamespace(eth=SimpleNamespace(get_transaction_count=get_transaction_count))
+    return NonceManager(w3, "0x0000000000000000000000000000000000000001"), state
+
+
+def test_resync_keeps_reserved_and_sent_nonces():
+    async def main():
+        manager, state = make_manager(5)
+        nonces = [await manager.reserve() for _ in range(4)]
+        assert nonces == [5, 6, 7, 8]
+        manager.mark_sent(5)
+        manager.mark_sent(6)
+        # отправка 7 не удалась, 8 ещё готовится, узел видит только 5
+        state["pending"] = 6
+        await manager.resync()
+        assert await manager.reserve() == 9
+        assert await manager.find_gaps() == []
+
+    asyncio.run(main())
+
+
+def test_resync_reissues_released_gap_first():
+    async def main():
+        manager, state = make_manager(0)
+        for _ in range(3):
+            await manager.reserve()
+        manager.mark_sent(0)
+        manager.mark_sent(2)
+        await manager.release(1)
+        await manager.resync()
+        assert await manager.find_gaps() == [1]
+        assert await manager.reserve() == 1
+        assert await manager.find_gaps() == []
+        assert await manager.reserve() == 3
+
+    asyncio.run(main())
@@ -0,0 +1,36 @@
+import asyncio
+import pytest
+from eth_account import Account
+from bench_send import LocalNode
+from w3_client import W3Client
+from nonce_manager import bump_transaction_fees
+from exceptions import W3TransactionSendError
+
+
+def test_rejected_replacement_does_not_resync_nonce():
+    async def main():
+        with LocalNode(accounts=1) as node:
+            client = W3Client(node.url, "http://localhost", None, "pending-test", True)
+            await node.connect(client)
+            client.set_address(Account.from_key(node.keys[0]).address)
+            client.set_private_key(node.keys[0])
+            try:
+                transaction = await client.prepare_tx(Account.create().address, 0.0001)
+                await client.sign_and_send_tx(transaction)
+                resyncs = []
+
+                async def resync():
+                    resyncs.append(True)
+
+                client.nonce_manager.resync = resync
+                # исходная версия уже в блоке: узел отклоняет замену с nonce too low
+                with pytest.raises(W3TransactionSendError):
+                    await client.broadcast_tx(bump_transaction_fees(transaction), without_gas=True, resync_nonce=False)
+                assert resyncs == []
+                with pytest.raises(W3TransactionSendError):
+                    await client.broadcast_tx(bump_transaction_fees(transaction), without_gas=True)
+                assert resyncs == [True]
+            finally:
+                await client.close_session()
+
+    asyncio.run(main())
@@ -0,0 +1,50 @@
+import asyncio
+from receipt_tracker import get_receipt_tracker, release_receipt_tracker
+
+TX_HASH = "0x" + "ab" * 32
+
+
+class FakeEth:
+    def __init__(self, receipts):
+        self.receipts = receipts
+        self.closed = False
+        self.calls = 0
+
+    @property
+    async def block_number(self):
+        if self.closed:
+            raise RuntimeError("Session is closed")
+        self.calls += 1
+        return self.calls
+
+    async def get_transaction_receipt(self, tx_hash):
+        if self.closed:
+            raise RuntimeError("Session is closed")
+        return self.receipts.get(tx_hash)
+
+
+class FakeW3:
+    def __init__(self, receipts):
+        self.eth = FakeEth(receipts)
+
+
+def test_tracker_keeps_first_client_until_it_closes():
+    async def main():
+        receipts = {}
+        first, second = FakeW3(receipts), FakeW3(receipts)
+        tracker = get_receipt_tracker(first, 1)
+        assert get_receipt_tracker(second, 1) is tracker
+        # новый клиент не перехватывает опрос
+        assert tracker.w3 is first
+
+        waiter = asyncio.create_task(tracker.wait(TX_HASH, timeout=5))
+        await asyncio.sleep(0.05)
+        first.eth.closed = True
+        release_receipt_tracker(first, 1)
+        assert tracker.w3 is second
+
+        receipts[TX_HASH] = {"status": 1}
+        assert await waiter == {"status": 1}
+        assert second.eth.calls > 0
+
+    asyncio.run(main())
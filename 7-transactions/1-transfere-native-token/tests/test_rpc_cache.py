@@ -0,0 +1,27 @@
+import asyncio
+from rpc_cache import RpcCacheMiddleware
+
+
+def test_block_seen_in_receipt_invalidates_cached_block_number():
+    async def main():
+        calls = []
+        block = [0x10]
+
+        async def make_request(method, params):
+            calls.append(method)
+            if method == "eth_blockNumber":
+                return {"jsonrpc": "2.0", "id": 0, "result": hex(block[0])}
+            return {"jsonrpc": "2.0", "id": 0, "result": {"blockNumber": hex(block[0]), "status": "0x1"}}
+
+        request = await RpcCacheMiddleware(block_number_ttl=60)(make_request, None)
+        assert (await request("eth_blockNumber", []))["result"] == "0x10"
+        assert (await request("eth_blockNumber", []))["result"] == "0x10"
+        assert calls == ["eth_blockNumber"]
+
+        block[0] = 0x11
+        await request("eth_getTransactionReceipt", ["0xab"])
+        # квитанция из нового блока: закэшированный номер блока устарел, несмотря на ttl
+        assert (await request("eth_blockNumber", []))["result"] == "0x11"
+        assert calls.count("eth_blockNumber") == 2
+
+    asyncio.run(main())
@@ -0,0 +1,123 @@
+import asyncio
+import time
+import pytest
+from rpc_pool import RpcEndpointStats, PooledAsyncHTTPProvider
+
+RATE_LIMITED = {"jsonrpc": "2.0", "id": 1, "error": {"code": -32005, "message": "rate limit exceeded"}}
+
+
+class FakeProvider:
+    """Узел пула с заданной задержкой: отвечает response или поднимает исключение error."""
+
+    def __init__(self, response, latency=0.0, error=None):
+        self.response = response
+        self.latency = latency
+        self.error = error
+        self.calls = 0
+
+    async def make_request(self, method, params):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        if self.error is not None:
+            raise self.error
+        return self.response
+
+
+def make_pool(*providers):
+    pool = PooledAsyncHTTPProvider([f"http://127.0.0.1:{port}" for port in range(1, len(providers) + 1)])
+    for endpoint, provider in zip(pool.endpoints, providers):
+        endpoint.provider = provider
+    return pool
+
+
+def answer(name):
+    return {"jsonrpc": "2.0", "id": 1, "result": name}
+
+
+def request(response, method="eth_call"):
+    endpoint = RpcEndpointStats("http://127.0.0.1:1")
+    endpoint.provider = FakeProvider(response)
+    asyncio.run(endpoint.request(method, []))
+    return endpoint
+
+
+def test_json_rpc_error_counts_as_endpoint_error():
+    endpoint = request({"jsonrpc": "2.0", "id": 1, "error": {"code": -32005, "message": "rate limit exceeded"}})
+    assert (endpoint.requests, endpoint.errors, endpoint.latency) == (1, 1, None)
+
+
+def test_execution_revert_is_not_endpoint_error():
+    endpoint = request({"jsonrpc": "2.0", "id": 1, "error": {"code": 3, "message": "execution reverted"}})
+    assert endpoint.errors == 0
+    endpoint = request({"jsonrpc": "2.0", "id": 1, "error": {"code": -32000, "message": "execution reverted: ERC20"}})
+    assert endpoint.errors == 0
+
+
+def test_already_known_broadcast_is_not_endpoint_error():
+    response = {"jsonrpc": "2.0", "id": 1, "error": {"code": -32000, "message": "already known"}}
+    assert request(response, "eth_sendRawTransaction").errors == 0
+    assert request({"jsonrpc": "2.0", "id": 1, "result": "0x1"}).errors == 0
+
+
+def test_reads_go_to_fastest_endpoint():
+    async def main():
+        fast, medium, slow = FakeProvider(answer("fast"), 0.01), FakeProvider(answer("medium"), 0.03), \
+            FakeProvider(answer("slow"), 0.06)
+        pool = make_pool(slow, medium, fast)
+        # неизмеренные узлы пробуются по одному разу
+        for _ in range(3):
+            await pool.make_request("eth_blockNumber", [])
+        assert (fast.calls, medium.calls, slow.calls) == (1, 1, 1)
+        for _ in range(10):
+            assert (await pool.make_request("eth_blockNumber", []))["result"] == "fast"
+        assert (fast.calls, medium.calls, slow.calls) == (11, 1, 1)
+
+    asyncio.run(main())
+
+
+def test_slow_endpoint_triggers_hedge():
+    async def main():
+        first, second = FakeProvider(answer("first"), 0.01), FakeProvider(answer("second"), 0.02)
+        pool = make_pool(first, second)
+        for _ in range(2):
+            await pool.make_request("eth_blockNumber", [])
+        # первый узел "завис": через hedge delay запрос дублируется на второй
+        first.latency = 2
+        started = time.monotonic()
+        assert (await pool.make_request("eth_blockNumber", []))["result"] == "second"
+        assert time.monotonic() - started < 1
+        # запись транзакции не дублируется
+        second.calls = 0
+        first.latency = 0.3
+        assert (await pool.make_request("eth_sendTransaction", []))["result"] == "first"
+        assert second.calls == 0
+
+    asyncio.run(main())
+
+
+def test_erroring_endpoints_are_skipped():
+    async def main():
+        limited = FakeProvider(RATE_LIMITED)
+        broken = FakeProvider(None, error=ConnectionError("connection reset"))
+        healthy = FakeProvider(answer("healthy"), 0.01)
+        pool = make_pool(limited, broken, healthy)
+        assert (await pool.make_request("eth_blockNumber", []))["result"] == "healthy"
+        assert (limited.calls, broken.calls, healthy.calls) == (1, 1, 1)
+        assert [endpoint["errors"] for endpoint in pool.stats()] == [1, 1, 0]
+        # откат исполнения - ответ здорового узла, на другой узел не переходим
+        reverted = FakeProvider({"jsonrpc": "2.0", "id": 1, "error": {"code": 3, "message": "execution reverted"}})
+        pool = make_pool(reverted, FakeProvider(answer("other")))
+        assert "error" in await pool.make_request("eth_call", [])
+
+    asyncio.run(main())
+
+
+def test_error_response_returned_when_no_endpoints_remain():
+    async def main():
+        pool = make_pool(FakeProvider(RATE_LIMITED), FakeProvider(RATE_LIMITED))
+        assert await pool.make_request("eth_blockNumber", []) == RATE_LIMITED
+        pool = make_pool(FakeProvider(None, error=ConnectionError("down")))
+        with pytest.raises(ConnectionError):
+            await pool.make_request("eth_blockNumber", [])
+
+    asyncio.run(main())
@@ -0,0 +1,39 @@
+import asyncio
+from rpc_recorder import RpcRecorder, ReplayProvider, _segment
+from receipt_tracker import ReceiptTracker
+
+
+def record(params, result):
+    return {"t": 0, "ms": 1, "method": "eth_getBalance", "params": params, "segment": None,
+            "response": {"jsonrpc": "2.0", "id": 0, "result": result}}
+
+
+def test_replay_serves_each_record_once_across_lookups():
+    async def main():
+        provider = ReplayProvider([record(["0x1"], "0x1"), record(["0x2"], "0x2"), record(["0x3"], "0x3")])
+        results = [
+            (await provider.make_request("eth_getBalance", params))["result"]
+            for params in (["0x2"], ["0xa"], ["0xb"], ["0xc"], ["0x1"])
+        ]
+        # точное совпадение забирает запись и из общего списка метода: подбор по методу её не повторит
+        assert results == ["0x2", "0x1", "0x3", "0x3", "0x1"]
+
+    asyncio.run(main())
+
+
+def test_receipt_poller_does_not_inherit_segment():
+    async def main():
+        seen = []
+
+        class Tracker(ReceiptTracker):
+            async def _run(self):
+                seen.append(_segment.get())
+                self._pending.clear()
+
+        tracker = Tracker(w3=None)
+        with RpcRecorder().segment("tx:1"):
+            tracker._register("0xab")
+            await tracker._task
+        assert seen == [None]
+
+    asyncio.run(main())
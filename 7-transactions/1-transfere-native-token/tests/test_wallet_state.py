@@ -0,0 +1,63 @@
+import asyncio
+from types import SimpleNamespace
+from wallet_state import WalletStateCache
+
+ADDRESS = "0x0000000000000000000000000000000000000001"
+
+
+def test_note_block_moves_cache_forward_past_lagging_node():
+    async def main():
+        calls = []
+
+        async def coro_request(method, params):
+            calls.append((method, params))
+            # узел за балансировщиком отстаёт: номер блока меньше, чем в уже полученной квитанции
+            return {"eth_blockNumber": "0x5", "eth_getBalance": "0x64", "eth_getTransactionCount": "0x2"}[method]
+
+        w3 = SimpleNamespace(provider=None, manager=SimpleNamespace(coro_request=coro_request))
+        cache = WalletStateCache(chain_id=1)
+        assert (await cache.get(w3, ADDRESS)).block == 5
+        cache.note_block(10)
+        state = await cache.get(w3, ADDRESS)
+        assert (state.block, state.balance, state.nonce) == (10, 100, 2)
+        assert ("eth_getBalance", [ADDRESS, hex(10)]) in calls
+
+    asyncio.run(main())
+
+
+def test_refresh_covers_requested_and_recent_addresses_only():
+    async def main():
+        block = {"number": 1}
+        balance_requests = []
+
+        async def coro_request(method, params):
+            if method == "eth_blockNumber":
+                return hex(block["number"])
+            if method == "eth_getBalance":
+                balance_requests.append(params[0])
+            return "0x1"
+
+        w3 = SimpleNamespace(provider=None, manager=SimpleNamespace(coro_request=coro_request))
+        cache = WalletStateCache(chain_id=1, block_time=0, max_watched=2)
+        addresses = [f"0x{index:040x}" for index in range(1, 4)]
+        for address in addresses:
+            await cache.get(w3, address)
+        # LRU: первый адрес вытеснен вместе с состоянием
+        assert list(cache._watched) == addresses[1:]
+        assert addresses[0] not in cache._states
+
+        # новый блок: обновляется запрошенный адрес и недавно читавшийся, но не вытесненный
+        balance_requests.clear()
+        block["number"] = 2
+        await cache.get(w3, addresses[2])
+        assert sorted(balance_requests) == addresses[1:]
+
+        # за пределами watch_ttl обновляется только запрошенный адрес
+        balance_requests.clear()
+        block["number"] = 3
+        cache.watch_ttl = 0
+        await asyncio.sleep(0.01)
+        await cache.get(w3, addresses[2])
+        assert balance_requests == [addresses[2]]
+
+    asyncio.run(main())